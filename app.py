@@ -1,12 +1,29 @@
 import streamlit as st
 import pandas as pd
-import requests
-import ta.momentum as ta_momentum
-import ta.trend as ta_trend
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
+import os
+import threading
 import time
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from radar import metricas
+from radar.analise import analisar_candles
+from radar.armazenamento import ArmazemCandles
+from radar.cache import CacheLimitado
+from radar.coleta import buscar_concorrente, MAX_WORKERS
+from radar.cotacoes import Cotacoes, aplicar_cotacoes, tabela_rapida
+from radar.dados import (MOEDAS_PADRAO, baixar_cotacoes, baixar_fear_greed, baixar_top_moedas, baixar_universo,
+                         carregar_candles, extrair_simbolo, get_timeframe_endpoint)
+from radar.indicadores import CacheIndicadores
+from radar.metricas import cronometrar
+from radar.paralelo import PROCESSOS, PoolScreener
+from radar.reamostragem import CacheReamostragem, preparar_candles
+from radar.reducao import LIMITE_WEBGL, reduzir_candles, reduzir_linha
+from radar.planejador import filtrar_com_plano
+from radar.transporte import cliente_padrao
+from radar.worker import ATIVO as TRABALHADOR_ATIVO, TrabalhadorScreener
+
+CAMINHO_CSS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "estilo.css")
 
 # Configuração da página
 st.set_page_config(
@@ -17,376 +34,111 @@ st.set_page_config(
 )
 
 # --- CSS Personalizado para um Layout Profissional ---
-st.markdown("""
-<style>
-/* Variáveis de Cores */
-:root {
-    --primary-color: #4f46e5; /* Indigo */
-    --secondary-color: #06b6d4; /* Cyan */
-    --text-dark: #1e293b; /* Dark Slate */
-    --text-light: #f8fafc; /* Light Gray */
-    --bg-light: #f1f5f9; /* Light Blue-Gray */
-    --bg-card: #ffffff; /* White */
-    --border-color: #e2e8f0; /* Light Grayish Blue */
-    --success-color: #10b981; /* Emerald */
-    --warning-color: #f59e0b; /* Amber */
-    --danger-color: #ef4444; /* Red */
-}
-
-/* Layout Principal */
-.main .block-container {
-    max-width: 1200px;
-    padding: 2rem 3rem;
-}
-
-/* Cabeçalhos */
-h1 {
-    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-    font-weight: 800;
-    color: var(--text-dark);
-    text-align: center;
-    margin-bottom: 0.5rem;
-    font-size: 2.5em;
-}
-h2 {
-    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-    color: var(--primary-color);
-    border-bottom: 2px solid var(--primary-color);
-    padding-bottom: 0.5rem;
-    margin-top: 2.5rem;
-    font-size: 1.8em;
-}
-h3 {
-    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-    color: var(--text-dark);
-    font-weight: 600;
-    font-size: 1.4em;
-}
-h4 {
-    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-    color: var(--text-dark);
-    font-weight: 600;
-    font-size: 1.1em;
-    margin-top: 1em;
-    margin-bottom: 0.5em;
-}
-
-/* Cards e Contêineres */
-.card {
-    border-radius: 12px;
-    box-shadow: 0 4px 12px rgba(0,0,0,0.08);
-    padding: 1.5rem;
-    margin-bottom: 1.5rem;
-    background: var(--bg-card);
-    transition: transform 0.2s, box-shadow 0.2s;
-    border: 1px solid var(--border-color);
-}
-.card:hover {
-    transform: translateY(-3px);
-    box-shadow: 0 6px 16px rgba(0,0,0,0.12);
-}
-
-/* Seção de Seleção/Filtro */
-.selection-section {
-    background: var(--bg-light);
-    border-radius: 12px;
-    padding: 1.5rem;
-    margin-bottom: 2rem;
-    box-shadow: inset 0 1px 3px rgba(0,0,0,0.05);
-}
-.filter-grid {
-    display: grid;
-    grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-    gap: 1.5rem;
-}
-
-/* Métricas */
-.stMetric {
-    border-radius: 10px;
-    box-shadow: 0 2px 6px rgba(0,0,0,0.05);
-    background: var(--bg-card);
-    padding: 15px 20px;
-    margin-bottom: 15px;
-    border: 1px solid var(--border-color);
-}
-
-/* Card de Recomendação */
-.recommendation-card {
-    border-radius: 16px;
-    padding: 15px 20px; /* Reduzido o padding */
-    font-weight: 700;
-    font-size: 24px; /* Reduzido o font-size */
-    max-width: 550px;
-    margin: 20px auto; /* Reduzido a margem */
-    box-shadow: 0 8px 25px rgba(0,0,0,0.15);
-    text-align: center;
-    color: var(--text-light);
-    background-image: linear-gradient(45deg, var(--primary-color), #6d28d9); /* Gradient */
-    border: none;
-}
-.recommendation-card .main-text {
-    font-size: 1em; /* Ajustado para ser relativo ao font-size do card */
-    margin-bottom: 0.5em;
-}
-.recommendation-card .sub-text {
-    font-size: 0.7em; /* Ajustado para ser menor que o main-text */
-    font-weight: 400;
-    opacity: 0.9;
-    line-height: 1.3;
-}
-.rec-compra { background-color: var(--success-color); }
-.rec-acumular { background-color: var(--warning-color); color: var(--text-dark); }
-.rec-agardar { background-color: #fd7e14; } /* Orange */
-.rec-venda { background-color: var(--danger-color); }
-.rec-observar { background-color: #007bff; } /* Blue */
-.rec-espera { background-color: #6c757d; } /* Gray */
-.rec-vendaparcial { background-color: #6f42c1; } /* Purple */
-
-/* Detalhes da Análise (Corrigida e Profissional) */
-.analysis-details-section {
-    background: var(--bg-card);
-    padding: 20px 25px;
-    border-radius: 12px;
-    box-shadow: 0 3px 8px rgba(0,0,0,0.08);
-    margin-top: 15px;
-    border: 1px solid var(--border-color);
-}
-.analysis-details-item {
-    margin-bottom: 1.2em;
-    line-height: 1.5;
-}
-.analysis-details-item h4 {
-    margin-top: 0;
-    margin-bottom: 0.3em;
-    color: var(--primary-color);
-    font-size: 1.1em;
-}
-.analysis-details-item p {
-    margin: 0.2em 0;
-    font-size: 0.95em;
-    color: #475569; /* Slate 700 */
-}
-.analysis-details-item strong {
-    color: var(--text-dark);
-}
-
-/* Botões */
-.stButton>button {
-    border-radius: 8px !important;
-    padding: 0.6rem 1.5rem !important;
-    font-weight: 600 !important;
-    transition: all 0.2s ease-in-out;
-}
-.stButton>button.primary {
-    background-color: var(--primary-color) !important;
-    color: var(--text-light) !important;
-    border: none !important;
-}
-.stButton>button.primary:hover {
-    background-color: #6d28d9 !important; /* Darker Indigo */
-    transform: translateY(-1px);
-}
-
-/* Abas */
-.stTabs [role="tablist"] {
-    gap: 0.5rem !important;
-}
-.stTabs [role="tab"] {
-    border-radius: 8px !important;
-    padding: 0.75rem 1.5rem !important;
-    font-weight: 500 !important;
-    background: var(--bg-light) !important;
-    color: var(--text-dark) !important;
-    transition: all 0.2s ease-in-out;
-}
-.stTabs [aria-selected="true"] {
-    background: var(--primary-color) !important;
-    color: var(--text-light) !important;
-    box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-}
-.stTabs [role="tab"]:hover {
-    background: #e2e8f0 !important;
-}
-
-/* Rodapé */
-.footer {
-    text-align: center;
-    color: #64748b;
-    margin-top: 3rem;
-    padding-top: 1.5rem;
-    border-top: 1px solid var(--border-color);
-}
-.footer small {
-    font-size: 0.85em;
-}
-
-/* Responsividade */
-@media (max-width: 768px) {
-    .main .block-container {
-        padding: 1rem;
-    }
-    h1 {
-        font-size: 2em;
-    }
-    h2 {
-        font-size: 1.5em;
-    }
-    .filter-grid {
-        grid-template-columns: 1fr;
-    }
-    .recommendation-card {
-        font-size: 20px; /* Ainda menor em mobile */
-        padding: 15px;
-    }
-    .recommendation-card .main-text {
-        font-size: 1em;
-    }
-    .recommendation-card .sub-text {
-        font-size: 0.6em;
-    }
-}
-</style>
-""", unsafe_allow_html=True)
+@st.cache_resource
+def get_css():
+    """Folha de estilo (static/estilo.css), lida do disco uma vez por processo"""
+    with open(CAMINHO_CSS, encoding="utf-8") as f:
+        return f"<style>\n{f.read()}</style>"
+
+st.markdown(get_css(), unsafe_allow_html=True)
 
 # --- Funções Auxiliares ---
 @st.cache_data(ttl=3600)
-def get_top_100_cryptos():
-    """Busca as 100 principais criptomoedas"""
-    url = "https://min-api.cryptocompare.com/data/top/mktcapfull?limit=100&tsym=USD"
+def get_universo():
+    """Principais criptomoedas (RADAR_UNIVERSO, padrão 100) e as cotações do mesmo payload"""
     try:
-        res = requests.get(url)
-        res.raise_for_status()
-        data = res.json()["Data"]
-        # Ordena a lista de criptomoedas alfabeticamente
-        return sorted([f"{c['CoinInfo']['FullName']} ({c['CoinInfo']['Name']})" for c in data])
+        return baixar_universo()
     except Exception as e:
         st.error(f"Erro ao buscar lista de criptomoedas: {e}")
-        return ["Bitcoin (BTC)", "Ethereum (ETH)", "Binance Coin (BNB)"]
-
-def extrair_simbolo(moeda_str):
-    """Extrai o símbolo da criptomoeda"""
-    return moeda_str.split("(")[-1].replace(")", "").strip()
-
-@st.cache_data(ttl=600)
-def get_timeframe_endpoint(timeframe):
-    """Mapeia timeframe para endpoint da API"""
-    if timeframe == "1h":
-        return "histohour", 2000
-    elif timeframe == "4h":
-        return "histohour", 2000
-    elif timeframe in ["1d", "1w", "1M"]:
-        return "histoday", 730
-    else:
-        return "histoday", 730
+        return MOEDAS_PADRAO, Cotacoes([], [], [], [])
 
-@st.cache_data(ttl=600)
-def get_crypto_data(symbol, endpoint="histoday", limit=200):
-    """Busca dados históricos de criptomoedas"""
-    url = f"https://min-api.cryptocompare.com/data/v2/{endpoint}?fsym={symbol}&tsym=USD&limit={limit}"
+def get_top_100_cryptos():
+    """Busca as principais criptomoedas"""
+    return get_universo()[0]
+
+@st.cache_data(ttl=60)
+def get_cotacoes():
+    """Preço e variação de 24h do universo, renovados com chamadas em lote"""
+    moedas, cotacoes = get_universo()
+    if time.time() - cotacoes.gerado_em < 60:
+        return cotacoes
     try:
-        r = requests.get(url)
-        r.raise_for_status()
-        data = r.json()["Data"]["Data"]
-        df = pd.DataFrame(data)
-        df["time"] = pd.to_datetime(df["time"], unit='s')
-        df = df.set_index("time")
-        for col in ['open', 'high', 'low', 'close', 'volumefrom', 'volumeto']:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce') # Converte para numérico, erros como NaN
-        df = df.rename(columns={'volumeto': 'volume'}).dropna() # Remove linhas com NaN após conversão
+        return cotacoes.combinar(baixar_cotacoes([extrair_simbolo(m) for m in moedas]))
+    except Exception as e:
+        st.warning(f"Erro ao atualizar cotações: {e}")
+        return cotacoes
+
+@st.cache_resource
+def get_armazem_candles():
+    """Armazém local de candles compartilhado pelo processo"""
+    return ArmazemCandles()
+
+@st.cache_resource
+def get_cache_candles():
+    """Candles do processo com orçamento de memória (RADAR_MEMORIA_MB) e contadores"""
+    return CacheLimitado()
+
+def get_crypto_data(symbol, endpoint="histoday", limit=200):
+    """Busca dados históricos de criptomoedas (apenas candles novos vão à rede)"""
+    # Camada local curta: validade e revalidação ficam no cache compartilhado
+    cache, chave = get_cache_candles(), (symbol, endpoint, limit)
+    df = cache.obter(chave)
+    if df is not None:
         return df
+    try:
+        df = carregar_candles(symbol, endpoint, limit, get_armazem_candles())
     except Exception as e:
         st.error(f"Erro ao buscar dados de {symbol}: {e}")
         return pd.DataFrame()
+    return cache.gravar(chave, df, ttl=60)
+
+@st.cache_resource
+def get_cache_indicadores():
+    """Indicadores por (moeda, timeframe, último candle) compartilhados entre reruns"""
+    return CacheIndicadores()
+
+@st.cache_resource
+def get_cache_reamostragem():
+    """Timeframes derivados (4h, 1w, 1M) atualizados só no último bucket"""
+    return CacheReamostragem()
+
+@st.cache_resource
+def get_pool_screener():
+    """Pool de processos do screener (None se RADAR_PROCESSOS não estiver definido)"""
+    return PoolScreener(PROCESSOS) if PROCESSOS > 0 else None
+
+@st.cache_resource
+def get_trabalhador_screener():
+    """Trabalhador que mantém snapshots do screener (None com RADAR_TRABALHADOR=0).
+
+    Só é criado aqui; quem o inicia é `iniciar_trabalhador`, na abertura do app.
+    """
+    if not TRABALHADOR_ATIVO:
+        return None
+    armazem = get_armazem_candles()
+    return TrabalhadorScreener(
+        listar_moedas=baixar_top_moedas,
+        buscar_candles=lambda simbolo, endpoint, limit: carregar_candles(simbolo, endpoint, limit, armazem),
+        cache_indicadores=get_cache_indicadores(),
+        reamostragem=get_cache_reamostragem(),
+        pool=get_pool_screener(),
+    )
+
+def iniciar_trabalhador():
+    """Inicia o trabalhador em segundo plano, se habilitado (sem efeito se já estiver rodando)"""
+    trabalhador = get_trabalhador_screener()
+    if trabalhador is not None:
+        trabalhador.iniciar()
 
 @st.cache_data(ttl=1800)
 def get_fear_greed_index():
     """Obtém o índice de Medo e Ganância"""
-    url = "https://api.alternative.me/fng/?limit=1"
     try:
-        r = requests.get(url)
-        r.raise_for_status()
-        return int(r.json()["data"][0]["value"])
+        return baixar_fear_greed()
     except Exception as e:
         st.warning(f"Erro ao buscar índice: {e}")
         return None
 
-def agrupar_4h_otimizado(df_horas):
-    """Agrupa dados de 1h em 4h"""
-    if df_horas.empty:
-        return pd.DataFrame()
-    # Usar 'start_day' para alinhar o agrupamento com o início do dia UTC
-    return df_horas.resample('4H', origin='start_day').agg({
-        'open': 'first',
-        'high': 'max',
-        'low': 'min',
-        'close': 'last',
-        'volume': 'sum'
-    }).dropna()
-
-def classificar_rsi(rsi):
-    """Classifica o valor do RSI"""
-    if rsi < 30: return "Sobrevendido"
-    elif rsi > 70: return "Sobrecomprado"
-    else: return "Neutro"
-
-def classificar_tendencia(ema_fast, ema_medium, ema_slow, ema_long):
-    """Classifica a tendência com base nas EMAs"""
-    # Verifica se todas as EMAs são válidas (não None)
-    if any(ema is None for ema in [ema_fast, ema_medium, ema_slow, ema_long]):
-        return "Dados insuficientes"
-    
-    if ema_fast > ema_medium > ema_slow > ema_long:
-        return "Alta consolidada"
-    elif ema_fast < ema_medium < ema_slow < ema_long:
-        return "Baixa consolidada"
-    return "Neutra/Transição"
-
-def classificar_volume(v_atual, v_medio):
-    """Compara volume atual com médio"""
-    if v_medio == 0: # Evita divisão por zero
-        return "Indefinido"
-    if v_atual >= v_medio * 1.2: # 20% acima da média
-        return "Subindo (Alto)"
-    elif v_atual <= v_medio * 0.8: # 20% abaixo da média
-        return "Caindo (Baixo)"
-    else:
-        return "Normal"
-
-def obter_recomendacao(tendencia, rsi_class, volume_class, macd_signal):
-    """Gera recomendação com base nos indicadores"""
-    rec_principal = "Aguardar"
-    rec_detalhe = "Condições atuais não indicam um ponto claro de entrada ou saída. Observe o mercado."
-
-    if tendencia == "Alta consolidada":
-        if rsi_class == "Sobrevendido" and "Subindo" in volume_class and macd_signal == "Compra":
-            rec_principal = "Compra Forte"
-            rec_detalhe = "Forte tendência de alta, ativo sobrevendido com volume crescente e sinal de compra MACD. Excelente oportunidade."
-        elif rsi_class == "Neutro" and "Subindo" in volume_class and macd_signal == "Compra":
-            rec_principal = "Compra"
-            rec_detalhe = "Tendência de alta confirmada, RSI neutro e sinal de compra MACD. Bom ponto de entrada."
-        elif rsi_class == "Sobrecomprado":
-            rec_principal = "Aguardar correção"
-            rec_detalhe = "Ativo sobrecomprado em tendência de alta. Risco de correção iminente. Aguarde um recuo para nova entrada."
-    elif tendencia == "Baixa consolidada":
-        if rsi_class == "Sobrevendido" and macd_signal == "Compra":
-            rec_principal = "Observar reversão"
-            rec_detalhe = "Ativo sobrevendido em tendência de baixa, com possível sinal de reversão. Monitore de perto para confirmação."
-        elif "Caindo" in volume_class or macd_signal == "Venda":
-            rec_principal = "Venda / Evitar"
-            rec_detalhe = "Tendência de baixa confirmada, volume em queda ou sinal de venda MACD. Evite posições ou considere vender."
-    
-    # Casos para "Aguardar" mais específicos
-    if rec_principal == "Aguardar":
-        if tendencia == "Neutra/Transição":
-            rec_detalhe = "O ativo está em fase de consolidação ou transição de tendência. Aguarde uma definição clara."
-        elif rsi_class == "Neutro" and "Normal" in volume_class and macd_signal == "Venda":
-            rec_detalhe = "RSI neutro, volume normal e sinal de venda MACD. Não há clareza para compra, aguarde."
-        elif rsi_class == "Neutro" and "Normal" in volume_class and macd_signal == "Compra":
-            rec_detalhe = "RSI neutro, volume normal e sinal de compra MACD. Aguarde mais confirmações para uma entrada segura."
-
-    return rec_principal, rec_detalhe
-
 def style_recomendacao_card(text, detail_text):
     """Estiliza o card de recomendação"""
     styles = {
@@ -400,6 +152,33 @@ def style_recomendacao_card(text, detail_text):
     main_text, class_name = styles.get(text, (text, "rec-espera")) # Default para "Aguardar"
     return main_text, detail_text, class_name
 
+def linha_grafico(serie, resolucao_total=False, **kwargs):
+    """Trace de linha reduzido ao orçamento de pontos (WebGL para séries longas)"""
+    import plotly.graph_objects as go # Importação tardia: já carregado por quem desenha o gráfico
+    if not resolucao_total:
+        serie = reduzir_linha(serie)
+    trace = go.Scattergl if len(serie) > LIMITE_WEBGL else go.Scatter
+    return trace(x=serie.index, y=serie, **kwargs)
+
+# Chave do dicionário de filtros -> chave do multiselect na sessão
+WIDGETS_FILTRO = {'trend': "filter_trend_main", 'rsi': "filter_rsi_main",
+                  'volume': "filter_volume_main", 'recommendation': "filter_recommendation_main"}
+
+def contagens_filtros(timeframe):
+    """Moedas por categoria no último snapshot, considerando o que já está marcado nos outros filtros"""
+    trabalhador = get_trabalhador_screener()
+    indice = None if trabalhador is None else trabalhador.indice(timeframe)
+    if indice is None:
+        return {}
+    return indice.contagens({chave: st.session_state.get(widget, []) for chave, widget in WIDGETS_FILTRO.items()})
+
+def rotulo_com_contagem(contagens, chave):
+    """format_func dos multiselects: "Sobrevendido (12)" quando há índice para o timeframe"""
+    por_valor = contagens.get(chave)
+    if por_valor is None:
+        return str
+    return lambda valor: f"{valor} ({por_valor.get(valor, 0)})"
+
 # --- Seção de Filtragem (Ajustada) ---
 def mostrar_filtros():
     """Exibe os controles de filtragem"""
@@ -412,17 +191,25 @@ def mostrar_filtros():
             
             with col1:
                 timeframe_filter = st.selectbox("Timeframe", ["1h", "4h", "1d", "1w"], index=2, key="filter_timeframe_main")
-                trend_filter = st.multiselect("Tendência", ["Alta consolidada", "Baixa consolidada", "Neutra/Transição"], key="filter_trend_main")
+                quick_scan = st.toggle("⚡ Varredura rápida", key="filter_quick_scan",
+                                       help="Só preço e variação de 24h, sem baixar o histórico das moedas")
+                # Contagens do índice do snapshot; o rerun de cada widget as recalcula
+                contagens = contagens_filtros(timeframe_filter)
+                trend_filter = st.multiselect("Tendência", ["Alta consolidada", "Baixa consolidada", "Neutra/Transição"], key="filter_trend_main",
+                                              format_func=rotulo_com_contagem(contagens, 'trend'))
                 
             with col2:
-                rsi_filter = st.multiselect("RSI", ["Sobrevendido", "Neutro", "Sobrecomprado"], key="filter_rsi_main")
-                volume_filter = st.multiselect("Volume", ["Subindo (Alto)", "Normal", "Caindo (Baixo)"], key="filter_volume_main")
+                rsi_filter = st.multiselect("RSI", ["Sobrevendido", "Neutro", "Sobrecomprado"], key="filter_rsi_main",
+                                            format_func=rotulo_com_contagem(contagens, 'rsi'))
+                volume_filter = st.multiselect("Volume", ["Subindo (Alto)", "Normal", "Caindo (Baixo)"], key="filter_volume_main",
+                                               format_func=rotulo_com_contagem(contagens, 'volume'))
             
             with col3: # Nova coluna para o filtro de recomendação
                 recommendation_filter = st.multiselect(
                     "Recomendação", 
                     ["Compra Forte", "Compra", "Aguardar correção", "Venda / Evitar", "Observar reversão", "Aguardar"], 
-                    key="filter_recommendation_main"
+                    key="filter_recommendation_main",
+                    format_func=rotulo_com_contagem(contagens, 'recommendation')
                 )
             
             st.markdown('</div>', unsafe_allow_html=True) # Fecha a div filter-grid
@@ -434,87 +221,121 @@ def mostrar_filtros():
                 'rsi': rsi_filter,
                 'volume': volume_filter,
                 'recommendation': recommendation_filter, # Adicionado ao dicionário de filtros
+                'quick_scan': quick_scan,
             }
     return None
 
 def filtrar_moedas(filters):
     """Filtra as moedas com base nos critérios"""
-    st.subheader("Resultados da Filtragem")
-    with st.spinner(f"Processando {len(get_top_100_cryptos())} moedas..."):
-        resultados = []
+    cotacoes = get_cotacoes()
+    if filters.get('quick_scan'):
+        # Só cotações em lote: os filtros de indicadores não se aplicam
+        st.caption(f"Cotações de {datetime.fromtimestamp(cotacoes.gerado_em):%H:%M:%S} (indicadores não calculados)")
+        return tabela_rapida(get_top_100_cryptos(), cotacoes, filters['timeframe'])
+
+    # Caminho rápido: consulta o índice do snapshot pré-calculado em segundo plano
+    # (tabela e índice vêm do mesmo snapshot, publicado de uma vez)
+    trabalhador = get_trabalhador_screener()
+    snapshot = None if trabalhador is None else trabalhador.snapshot(filters['timeframe'])
+    if snapshot is not None and snapshot.indice is not None:
+        st.caption(f"Dados calculados às {datetime.fromtimestamp(snapshot.gerado_em):%H:%M:%S}")
+        return aplicar_cotacoes(snapshot.indice.selecionar(filters), cotacoes)
+
+    moedas = get_top_100_cryptos()
+    with st.spinner(f"Processando {len(moedas)} moedas..."):
         progress_bar = st.progress(0)
-        
-        for i, moeda in enumerate(get_top_100_cryptos()):
-            simbolo = extrair_simbolo(moeda)
-            endpoint, limit = get_timeframe_endpoint(filters['timeframe'])
-            df = get_crypto_data(simbolo, endpoint, limit)
-            
-            if df.empty or len(df) < 50:  # Mínimo de dados para indicadores
-                progress_bar.progress((i + 1) / len(get_top_100_cryptos()))
-                continue
-                
-            if filters['timeframe'] == "4h":
-                df = agrupar_4h_otimizado(df)
-                if df.empty or len(df) < 50: # Verifica novamente após agrupamento
-                    progress_bar.progress((i + 1) / len(get_top_100_cryptos()))
-                    continue
-                
-            # Calcular indicadores
-            preco = df['close'].iloc[-1]
-            variacao = (df['close'].iloc[-1] - df['close'].iloc[-2]) / df['close'].iloc[-2] * 100 if len(df) > 1 else 0
-            volume_atual = df['volume'].iloc[-1]
-            volume_medio = df['volume'].mean()
-            rsi = ta_momentum.RSIIndicator(df['close'], 14).rsi().iloc[-1]
-            rsi_class = classificar_rsi(rsi)
-            
-            macd = ta_trend.MACD(df['close'])
-            macd_line = macd.macd().iloc[-1]
-            macd_signal_line = macd.macd_signal().iloc[-1]
-            macd_signal = "Compra" if macd_line > macd_signal_line else "Venda"
-            
-            # EMAs para tendência
-            ema_fast = ta_trend.EMAIndicator(df['close'], 8).ema_indicator().iloc[-1] if len(df) >= 8 else None
-            ema_medium = ta_trend.EMAIndicator(df['close'], 21).ema_indicator().iloc[-1] if len(df) >= 21 else None
-            ema_slow = ta_trend.EMAIndicator(df['close'], 50).ema_indicator().iloc[-1] if len(df) >= 50 else None
-            ema_long = ta_trend.EMAIndicator(df['close'], 200).ema_indicator().iloc[-1] if len(df) >= 200 else None
-            
-            tendencia = classificar_tendencia(ema_fast, ema_medium, ema_slow, ema_long)
-            volume_class = classificar_volume(volume_atual, volume_medio)
+        endpoint, limit = get_timeframe_endpoint(filters['timeframe'])
+
+        # Busca concorrente: cada thread herda o contexto da sessão para que
+        # st.cache_data e as mensagens de erro continuem funcionando
+        ctx = get_script_run_ctx()
+        def buscar(moeda):
+            add_script_run_ctx(threading.current_thread(), ctx)
+            return get_crypto_data(extrair_simbolo(moeda), endpoint, limit)
+
+        dados = buscar_concorrente(
+            moedas, buscar, max_workers=MAX_WORKERS,
+            ao_progredir=lambda feitos, total: progress_bar.progress(feitos / total)
+        )
 
-            # Gerar recomendação para a moeda atual
-            rec_principal, _ = obter_recomendacao(tendencia, rsi_class, volume_class, macd_signal)
-            
-            # Aplicar filtros
-            conditions_met = True
-            if filters['trend'] and tendencia not in filters['trend']:
-                conditions_met = False
-            if filters['rsi'] and rsi_class not in filters['rsi']:
-                conditions_met = False
-            if filters['volume'] and volume_class not in filters['volume']:
-                conditions_met = False
-            if filters['recommendation'] and rec_principal not in filters['recommendation']: # Novo filtro de recomendação
-                conditions_met = False
-            
-            if conditions_met:
-                resultados.append({
-                    'Moeda': moeda,
-                    'Símbolo': simbolo,
-                    'Preço': preco,
-                    'Variação': variacao,
-                    'RSI': rsi,
-                    'Tendência': tendencia,
-                    'Volume': volume_class,
-                    'Recomendação': rec_principal, # Adicionado ao resultado
-                    'Data': df # Mantém o DataFrame para análise posterior se necessário
-                })
-            
-            progress_bar.progress((i + 1) / len(get_top_100_cryptos()))
+        candidatos = {}
+        for moeda, df in zip(moedas, dados):
+            df = preparar_candles(df, filters['timeframe'], simbolo=extrair_simbolo(moeda), reamostragem=get_cache_reamostragem())
+            if df is not None:
+                candidatos[moeda] = df
+
+        pool = get_pool_screener()
+        if pool is not None:
+            # Universos grandes: classificação dividida entre os processos
+            resultados = pool.classificar(candidatos, filters['timeframe']).filtrar(filters)
+        else:
+            # Predicados baratos descartam moedas antes dos indicadores mais caros
+            resultados = filtrar_com_plano(candidatos, filters['timeframe'], filters, get_cache_indicadores())
         
         progress_bar.empty()
-        return resultados
+        return aplicar_cotacoes(resultados, cotacoes)
+
+def carregar_candles_timeframe(simbolo, timeframe):
+    """Candles de uma moeda já agrupados no timeframe"""
+    endpoint, limit = get_timeframe_endpoint(timeframe)
+    return preparar_candles(get_crypto_data(simbolo, endpoint, limit), timeframe, minimo=1,
+                            simbolo=simbolo, reamostragem=get_cache_reamostragem())
+
+def formatar_resultados(tabela):
+    """Formata a tabela de resultados apenas na hora de exibir"""
+    return pd.DataFrame({
+        'Moeda': tabela['Moeda'],
+        # Ajuste na formatação do preço
+        'Preço': [f"${p:.8f}" if p < 1 else f"${p:,.2f}" for p in tabela['Preço']],
+        'Variação': [f"{v:+.2f}%" for v in tabela['Variação']],
+        'RSI': [f"{r:.1f}" if r == r else "—" for r in tabela['RSI']], # NaN na varredura rápida
+        'Tendência': tabela['Tendência'],
+        'Volume': tabela['Volume'],
+        'Recomendação': tabela['Recomendação'] # Exibir a recomendação na tabela
+    })
+
+def mostrar_candles_resultado(tabela):
+    """Carrega os candles de uma moeda filtrada só quando ela é aberta"""
+    with st.expander("🕯️ Ver candles de uma moeda filtrada", expanded=False):
+        i = st.selectbox("Moeda", range(len(tabela)), index=None, format_func=lambda i: tabela['Moeda'][i],
+                         key="drilldown_resultado")
+        if i is not None:
+            df = tabela.candles(i, carregar_candles_timeframe).carregar()
+            if df is None:
+                st.warning("Dados insuficientes para esta moeda")
+            else:
+                st.line_chart(df['close'])
+
+def alternar_metricas():
+    """Liga/desliga a coleta só quando o toggle muda (a coleta vale para o processo todo)"""
+    metricas.ativar(st.session_state["debug_metricas"])
+
+
+def mostrar_depuracao():
+    """Painel recolhível na barra lateral com tempos por etapa e contadores"""
+    with st.sidebar.expander("🐞 Depuração", expanded=False):
+        st.toggle("Coletar métricas", value=metricas.ATIVAS, key="debug_metricas", on_change=alternar_metricas)
+        dados = metricas.resumo()
+        if dados["etapas"]:
+            st.dataframe(pd.DataFrame(dados["etapas"]).T.round(2), use_container_width=True)
+        else:
+            st.caption("Nenhuma etapa medida ainda")
+        if dados["contadores"]:
+            st.json(dados["contadores"])
+        st.caption("Cache de candles do processo")
+        st.json(get_cache_candles().estatisticas())
+        st.caption("Requisições HTTP por endpoint")
+        st.json(cliente_padrao().estatisticas())
+        col1, col2 = st.columns(2)
+        col1.download_button("Prometheus", metricas.exportar_prometheus(), "radar.prom", key="debug_prom")
+        col2.download_button("JSON lines", metricas.exportar_jsonl(), "radar.jsonl", key="debug_jsonl")
+        if st.button("Zerar métricas", key="debug_limpar"):
+            metricas.limpar()
 
 # --- Interface Principal ---
 def main():
+    # Snapshots pré-calculados começam a ser montados já na abertura, não no primeiro filtro
+    iniciar_trabalhador()
     st.title("📊 Análise Técnica de Criptomoedas")
     st.markdown("""
     <p style='text-align: center; color: #64748b; margin-bottom: 2rem;'>
@@ -522,27 +343,26 @@ def main():
     </p>
     """, unsafe_allow_html=True)
     
+    mostrar_depuracao()
+
     # Seção de Filtragem
     filtros = mostrar_filtros()
     
+    if filtros or 'resultados_filtro' in st.session_state:
+        st.subheader("Resultados da Filtragem")
     if filtros:
-        resultados_filtro = filtrar_moedas(filtros)
-        if resultados_filtro:
+        # Só a tabela compacta fica na sessão; candles são carregados sob demanda
+        with cronometrar("screen"):
+            st.session_state['resultados_filtro'] = filtrar_moedas(filtros)
+
+    resultados_filtro = st.session_state.get('resultados_filtro')
+    if resultados_filtro is not None:
+        if len(resultados_filtro):
             st.success(f"✅ {len(resultados_filtro)} moedas atendem aos critérios")
             
             # Exibir resultados em uma tabela
-            df_resultados = pd.DataFrame([{
-                'Moeda': r['Moeda'],
-                # Ajuste na formatação do preço
-                'Preço': f"${r['Preço']:.8f}" if r['Preço'] < 1 else f"${r['Preço']:,.2f}",
-                'Variação': f"{r['Variação']:+.2f}%",
-                'RSI': f"{r['RSI']:.1f}",
-                'Tendência': r['Tendência'],
-                'Volume': r['Volume'],
-                'Recomendação': r['Recomendação'] # Exibir a recomendação na tabela
-            } for r in resultados_filtro])
-            
-            st.dataframe(df_resultados, height=300, use_container_width=True)
+            st.dataframe(formatar_resultados(resultados_filtro), height=300, use_container_width=True)
+            mostrar_candles_resultado(resultados_filtro)
             st.divider() # Adiciona um divisor após os resultados da filtragem
         else:
             st.warning("Nenhuma moeda atende aos critérios selecionados")
@@ -580,42 +400,23 @@ def main():
             st.error("Dados insuficientes para análise")
             st.stop()
             
-        if timeframe_analise == "4h":
-            df_analise = agrupar_4h_otimizado(df_analise_raw)
-            if df_analise.empty: # Verifica se o agrupamento resultou em DF vazio
-                st.error("Dados insuficientes após agrupamento para 4h.")
-                st.stop()
-        else:
-            df_analise = df_analise_raw.copy()
+        # 4h e 1w são agregados a partir da série base (1h e 1d)
+        df_analise = preparar_candles(df_analise_raw, timeframe_analise, minimo=1,
+                                      simbolo=simbolo, reamostragem=get_cache_reamostragem())
+        if df_analise is None: # Verifica se o agrupamento resultou em DF vazio
+            st.error(f"Dados insuficientes após agrupamento para {timeframe_analise}.")
+            st.stop()
             
-        # Cálculo de indicadores
-        preco_atual = df_analise["close"].iloc[-1]
-        variacao = ((df_analise["close"].iloc[-1] - df_analise["close"].iloc[-2]) / df_analise["close"].iloc[-2] * 100) if len(df_analise) > 1 else 0
-        volume_atual = df_analise["volume"].iloc[-1]
-        volume_medio = df_analise["volume"].mean()
-        rsi = ta_momentum.RSIIndicator(df_analise["close"], 14).rsi().iloc[-1]
-        rsi_class = classificar_rsi(rsi)
-        
-        macd = ta_trend.MACD(df_analise["close"])
-        macd_line = macd.macd().iloc[-1]
-        macd_signal_line = macd.macd_signal().iloc[-1]
-        macd_diff = macd.macd_diff().iloc[-1]
-        macd_signal = "Compra" if macd_line > macd_signal_line else "Venda"
-        
-        # Cálculo EMAs (com verificação de dados suficientes)
-        ema_periods = [8, 21, 50, 200]
-        emas = {}
-        for period in ema_periods:
-            if len(df_analise) >= period:
-                emas[f"ema_{period}"] = ta_trend.EMAIndicator(df_analise["close"], period).ema_indicator().iloc[-1]
-            else:
-                emas[f"ema_{period}"] = None # Define como None se não houver dados suficientes
-        
-        tendencia = classificar_tendencia(emas.get("ema_8"), emas.get("ema_21"), emas.get("ema_50"), emas.get("ema_200"))
-        volume_class = classificar_volume(volume_atual, volume_medio)
-        
-        # Obter recomendação e detalhe
-        rec_principal, rec_detalhe = obter_recomendacao(tendencia, rsi_class, volume_class, macd_signal)
+        # Séries completas calculadas uma vez por candle e reutilizadas nos gráficos
+        indicadores = get_cache_indicadores().obter(simbolo, timeframe_analise, df_analise)
+        analise = analisar_candles(df_analise, indicadores)
+        preco_atual, variacao = analise["preco_atual"], analise["variacao"]
+        volume_atual, volume_medio, volume_class = analise["volume_atual"], analise["volume_medio"], analise["volume_class"]
+        rsi, rsi_class = analise["rsi"], analise["rsi_class"]
+        macd_line, macd_signal_line = analise["macd_line"], analise["macd_signal_line"]
+        macd_diff, macd_signal = analise["macd_diff"], analise["macd_signal"]
+        emas, tendencia = analise["emas"], analise["tendencia"]
+        rec_principal, rec_detalhe = analise["rec_principal"], analise["rec_detalhe"]
         texto_card, texto_detalhe_card, classe_card = style_recomendacao_card(rec_principal, rec_detalhe)
 
     # Exibição dos resultados principais
@@ -668,16 +469,41 @@ def main():
     """, unsafe_allow_html=True)
 
     # Gráficos
+    # Período exibido: janelas que cabem no orçamento de pontos saem em resolução total
+    inicio_grafico, fim_grafico = df_analise.index[0], df_analise.index[-1]
+    col_periodo, col_resolucao = st.columns([4, 1])
+    with col_resolucao:
+        resolucao_total = st.toggle("Resolução total", key="resolucao_total_grafico")
+    if len(df_analise) > 1:
+        with col_periodo:
+            inicio_grafico, fim_grafico = st.slider(
+                "Período do gráfico",
+                min_value=inicio_grafico.to_pydatetime(),
+                max_value=fim_grafico.to_pydatetime(),
+                value=(inicio_grafico.to_pydatetime(), fim_grafico.to_pydatetime()),
+                step=timedelta(hours=1) if timeframe_analise in ("1h", "4h") else timedelta(days=1),
+                format="DD/MM/YY HH:mm",
+                key=f"periodo_grafico_{simbolo}_{timeframe_analise}"
+            )
+    recorte = lambda serie: serie.loc[inicio_grafico:fim_grafico]
+    df_grafico = recorte(df_analise)
+    velas = df_grafico if resolucao_total else reduzir_candles(df_grafico)
+
+    # Importação tardia: o plotly só é carregado quando há gráfico a desenhar,
+    # depois que o topo da página já foi enviado ao navegador
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
     tab1, tab2 = st.tabs(["📊 Gráfico de Velas", "📈 Indicadores Técnicos"])
     
     with tab1:
         fig = go.Figure()
         fig.add_trace(go.Candlestick(
-            x=df_analise.index,
-            open=df_analise['open'],
-            high=df_analise['high'],
-            low=df_analise['low'],
-            close=df_analise['close'],
+            x=velas.index,
+            open=velas['open'],
+            high=velas['high'],
+            low=velas['low'],
+            close=velas['close'],
             name='Preço',
             increasing_line_color=st.get_option("theme.primaryColor") if st.get_option("theme.primaryColor") else '#10b981',
             decreasing_line_color='#ef4444'
@@ -685,10 +511,9 @@ def main():
         
         for period, color in zip([8, 21, 50, 200], ['orange', 'purple', 'blue', 'red']):
             if emas.get(f"ema_{period}") is not None:
-                ema_values = ta_trend.EMAIndicator(df_analise["close"], period).ema_indicator()
-                fig.add_trace(go.Scatter(
-                    x=df_analise.index,
-                    y=ema_values,
+                fig.add_trace(linha_grafico(
+                    recorte(indicadores.emas[period]),
+                    resolucao_total,
                     name=f'EMA {period}',
                     line=dict(color=color, width=1),
                     opacity=0.8
@@ -701,15 +526,16 @@ def main():
             hovermode="x unified",
             template="plotly_white"
         )
-        st.plotly_chart(fig, use_container_width=True)
+        with cronometrar("plotly"): # Serialização da figura
+            st.plotly_chart(fig, use_container_width=True)
     
     with tab2:
         fig = make_subplots(rows=2, cols=1, shared_xaxes=True, vertical_spacing=0.1)
         
         # RSI
-        fig.add_trace(go.Scatter(
-            x=df_analise.index,
-            y=ta_momentum.RSIIndicator(df_analise["close"], 14).rsi(),
+        fig.add_trace(linha_grafico(
+            recorte(indicadores.rsi),
+            resolucao_total,
             name='RSI',
             line=dict(color='#4f46e5')
         ), row=1, col=1)
@@ -720,24 +546,26 @@ def main():
                      annotation_text="Sobrecomprado", row=1, col=1)
         
         # MACD
-        macd = ta_trend.MACD(df_analise["close"])
-        fig.add_trace(go.Scatter(
-            x=df_analise.index,
-            y=macd.macd(),
+        fig.add_trace(linha_grafico(
+            recorte(indicadores.macd),
+            resolucao_total,
             name='MACD',
             line=dict(color='#2563eb')
         ), row=2, col=1)
         
-        fig.add_trace(go.Scatter(
-            x=df_analise.index,
-            y=macd.macd_signal(),
+        fig.add_trace(linha_grafico(
+            recorte(indicadores.macd_signal),
+            resolucao_total,
             name='Sinal',
             line=dict(color='#f59e0b')
         ), row=2, col=1)
         
+        histograma = recorte(indicadores.macd_diff)
+        if not resolucao_total:
+            histograma = reduzir_linha(histograma)
         fig.add_trace(go.Bar(
-            x=df_analise.index,
-            y=macd.macd_diff(),
+            x=histograma.index,
+            y=histograma,
             name='Histograma',
             marker_color='#d1d5db'
         ), row=2, col=1)
@@ -748,7 +576,8 @@ def main():
             hovermode="x unified",
             template="plotly_white"
         )
-        st.plotly_chart(fig, use_container_width=True)
+        with cronometrar("plotly"): # Serialização da figura
+            st.plotly_chart(fig, use_container_width=True)
 
     # Índice de Medo e Ganância
     st.divider()
@@ -774,7 +603,8 @@ def main():
                     'thickness': 0.75,
                     'value': fng}}))
         
-        st.plotly_chart(fig, use_container_width=True)
+        with cronometrar("plotly"): # Serialização da figura
+            st.plotly_chart(fig, use_container_width=True)
         st.markdown("""
         <div style="text-align: center; color: #64748b;">
             <small>0-25: Medo Extremo | 25-50: Medo | 50-75: Ganância | 75-100: Ganância Extrema</small>
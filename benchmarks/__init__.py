@@ -0,0 +1 @@
+"""Benchmarks offline do radar sobre fixtures gravadas da CryptoCompare"""
@@ -0,0 +1,265 @@
+"""Mede as etapas do screener offline e compara com uma linha de base.
+
+Sem fixtures na pasta padrão, as sintéticas (semente fixa) são geradas antes
+da primeira medida. A base não é versionada: tempos absolutos só valem na
+máquina que os mediu, então cada um grava a própria, e a comparação só vale
+como portão (código 1) quando o ambiente da base é o mesmo.
+
+Exemplos:
+    python -m benchmarks.executar --salvar-base         # grava benchmarks/base.json
+    python -m benchmarks.executar                       # compara com a base (código 1 se regredir)
+    python -m benchmarks.executar --comparar            # idem, e também código 1 se não houver base
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.fixtures import PASTA_PADRAO, ClienteFixtures, assinatura, sintetico
+from radar.armazenamento import ArmazemCandles
+from radar.cache import CacheSQLite, usar_cache
+from radar.candles import candles_de_json
+from radar.dados import INTERVALOS, carregar_candles, extrair_simbolo, get_timeframe_endpoint
+from radar.painel import PainelIndicadores
+from radar.reamostragem import BASE_DO_TIMEFRAME, DERIVADOS, preparar_candles, reamostrar
+from radar.screener import calcular_series, classificar_moeda, executar_screen
+
+BASE_PADRAO = os.path.join(os.path.dirname(__file__), "base.json")
+TIMEFRAMES = ("1h", "4h", "1d", "1w")
+TOLERANCIA_PADRAO = 0.15  # regressão: mediana mais de 15% acima da base
+CAMPOS_AMBIENTE = ("cpus", "plataforma", "numpy", "pandas")
+FILTROS_SCREEN = {"rsi": ["Sobrevendido", "Sobrecomprado"], "trend": ["Alta consolidada"]}
+
+
+class Cenario:
+    """Dados já carregados das fixtures, compartilhados pelas etapas.
+
+    As etapas de screen passam pelo caminho de produção (`carregar_candles`:
+    cache compartilhado, armazém SQLite e backfill) com armazém e cache em uma
+    pasta temporária, removida em `fechar`.
+    """
+
+    def __init__(self, pasta):
+        self.cliente = ClienteFixtures(pasta, ate=time.time())
+        self._pasta_temporaria = tempfile.mkdtemp(prefix="radar-bench-")
+        self.armazem = None
+        self._cache_anterior = self.reiniciar()
+        self.moedas = self.cliente.moedas
+        self.base = {
+            endpoint: {
+                moeda: candles_de_json(self.cliente.payload(endpoint, extrair_simbolo(moeda))["Data"]["Data"],
+                                       INTERVALOS[endpoint])
+                for moeda in self.moedas
+            }
+            for endpoint in ("histohour", "histoday")
+        }
+        self.candles = {tf: self._preparados(tf) for tf in TIMEFRAMES}
+
+    def _preparados(self, timeframe):
+        # Mesma janela que o app lê para o timeframe
+        endpoint, limit = get_timeframe_endpoint(timeframe)
+        preparados = ((m, preparar_candles(self.base[endpoint][m].iloc[-(limit + 1):], timeframe)) for m in self.moedas)
+        return {m: df for m, df in preparados if df is not None}
+
+    def reiniciar(self):
+        """Armazém e cache compartilhado vazios, como em um host recém-iniciado; devolve o cache anterior"""
+        pasta = tempfile.mkdtemp(dir=self._pasta_temporaria)
+        self.armazem = ArmazemCandles(os.path.join(pasta, "candles.sqlite"))
+        return usar_cache(CacheSQLite(os.path.join(pasta, "cache.sqlite")))
+
+    def buscar(self, simbolo, endpoint, limit):
+        return carregar_candles(simbolo, endpoint, limit, self.armazem, cliente=self.cliente)
+
+    def fechar(self):
+        usar_cache(self._cache_anterior)
+        shutil.rmtree(self._pasta_temporaria, ignore_errors=True)
+
+
+def _etapas(cenario):
+    """nome -> (função sem argumentos, unidades processadas por execução, nome da unidade)"""
+    payloads = [(cenario.cliente.payload(e, extrair_simbolo(m))["Data"]["Data"], INTERVALOS[e])
+                for e in ("histohour", "histoday") for m in cenario.moedas]
+    total_candles = sum(len(p) for p, _ in payloads)
+    derivados = [(df, tf) for tf in DERIVADOS for df in cenario.base[BASE_DO_TIMEFRAME[tf]].values()]
+    series = {tf: calcular_series(c, tf) for tf, c in cenario.candles.items()}
+    n_moedas = sum(len(c) for c in cenario.candles.values())
+
+    def parse():
+        for registros, intervalo in payloads:
+            candles_de_json(registros, intervalo)
+
+    def reamostragem():
+        for df, tf in derivados:
+            reamostrar(df, tf)
+
+    def indicadores():
+        for c in cenario.candles.values():
+            PainelIndicadores({m: df["close"] for m, df in c.items()})
+
+    def classificacao():
+        for tf, c in cenario.candles.items():
+            for m, df in c.items():
+                classificar_moeda(m, df, series[tf][m])
+
+    def screen():
+        # Regime do app em uso: candles já no armazém e respostas no cache compartilhado
+        for tf in TIMEFRAMES:
+            executar_screen(cenario.moedas, tf, cenario.buscar)
+
+    def screen_frio():
+        # Primeira execução no host: backfill das janelas inteiras e gravação no armazém
+        cenario.reiniciar()
+        for tf in TIMEFRAMES:
+            executar_screen(cenario.moedas, tf, cenario.buscar)
+
+    def screen_filtrado():
+        for tf in TIMEFRAMES:
+            executar_screen(cenario.moedas, tf, cenario.buscar, filters=FILTROS_SCREEN)
+
+    return {
+        "parse": (parse, total_candles, "candles"),
+        "reamostragem": (reamostragem, sum(len(df) for df, _ in derivados), "candles"),
+        "indicadores": (indicadores, n_moedas, "moedas"),
+        "classificacao": (classificacao, n_moedas, "moedas"),
+        "screen": (screen, len(cenario.moedas) * len(TIMEFRAMES), "moedas"),
+        "screen_frio": (screen_frio, len(cenario.moedas) * len(TIMEFRAMES), "moedas"),
+        "screen_filtrado": (screen_filtrado, len(cenario.moedas) * len(TIMEFRAMES), "moedas"),
+    }
+
+
+def medir(funcao, repeticoes):
+    """Tempos de `repeticoes` execuções e o pico de memória (tracemalloc) de uma execução extra"""
+    funcao()  # Aquecimento: imports tardios, caches de pandas/NumPy
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    tracemalloc.start()
+    try:
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return tempos, pico
+
+
+def executar(pasta=PASTA_PADRAO, repeticoes=5, somente=None):
+    cenario = Cenario(pasta)
+    try:
+        resultados = _medir_etapas(cenario, repeticoes, somente)
+    finally:
+        cenario.fechar()
+    return {
+        "gerado_em": time.time(),
+        "ambiente": {
+            "python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+            "plataforma": platform.platform(), "cpus": os.cpu_count(),
+        },
+        "moedas": len(cenario.moedas),
+        "fixtures": assinatura(pasta),
+        "repeticoes": repeticoes,
+        "etapas": resultados,
+    }
+
+
+def _medir_etapas(cenario, repeticoes, somente):
+    resultados = {}
+    for nome, (funcao, unidades, unidade) in _etapas(cenario).items():
+        if somente and nome not in somente:
+            continue
+        tempos, pico = medir(funcao, repeticoes)
+        mediana = statistics.median(tempos)
+        resultados[nome] = {
+            "mediana_s": mediana,
+            "min_s": min(tempos),
+            "unidades": unidades,
+            "unidade": unidade,
+            "por_segundo": unidades / mediana if mediana else None,
+            "pico_mb": pico / 2 ** 20,
+        }
+        print(f"{nome:16s} {mediana * 1000:10.1f} ms  {resultados[nome]['por_segundo']:12,.0f} {unidade}/s"
+              f"  pico {resultados[nome]['pico_mb']:8.1f} MB", file=sys.stderr)
+    return resultados
+
+
+def diferencas_de_ambiente(atual, base):
+    """Campos de `ambiente` que mudaram desde a base (tempos de máquinas diferentes não se comparam)"""
+    return [campo for campo in CAMPOS_AMBIENTE
+            if atual["ambiente"].get(campo) != base.get("ambiente", {}).get(campo)]
+
+
+def comparar(atual, base, tolerancia=TOLERANCIA_PADRAO):
+    """Linhas (etapa, base, atual, variação) e a lista de etapas que regrediram"""
+    linhas, regressoes = [], []
+    for nome, medida in atual["etapas"].items():
+        anterior = base["etapas"].get(nome)
+        if anterior is None:
+            continue
+        variacao = medida["mediana_s"] / anterior["mediana_s"] - 1
+        linhas.append((nome, anterior["mediana_s"], medida["mediana_s"], variacao))
+        if variacao > tolerancia:
+            regressoes.append(nome)
+    return linhas, regressoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="benchmarks.executar", description="Benchmark offline do screener")
+    parser.add_argument("--fixtures", default=PASTA_PADRAO)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--etapas", nargs="*", help="mede só estas etapas")
+    parser.add_argument("--base", default=BASE_PADRAO, help="resultado de referência (JSON)")
+    parser.add_argument("--salvar-base", action="store_true", help="grava o resultado como nova base")
+    parser.add_argument("--comparar", action="store_true", help="falha (código 1) se não houver base")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA_PADRAO)
+    parser.add_argument("--saida", help="grava o resultado completo em JSON")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(os.path.join(args.fixtures, "moedas.json.gz")):
+        if os.path.abspath(args.fixtures) != os.path.abspath(PASTA_PADRAO):
+            parser.error(f"sem fixtures em {args.fixtures}; rode 'python -m benchmarks.fixtures sintetico' ou 'gravar'")
+        print(f"Gerando fixtures sintéticas em {args.fixtures}", file=sys.stderr)
+        sintetico(args.fixtures)
+
+    resultado = executar(args.fixtures, args.repeticoes, args.etapas)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, indent=2)
+    if args.salvar_base:
+        with open(args.base, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, indent=2)
+        print(f"Base gravada em {args.base}")
+        return 0
+    if not os.path.exists(args.base):
+        if args.comparar:
+            print(f"Sem base para comparar em {args.base} (use --salvar-base)", file=sys.stderr)
+            return 1
+        print("Sem base para comparar (use --salvar-base)")
+        return 0
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    if base.get("fixtures") not in (None, resultado["fixtures"]):
+        print("Aviso: a base foi medida com outras fixtures", file=sys.stderr)
+    linhas, regressoes = comparar(resultado, base, args.tolerancia)
+    for nome, anterior, atual, variacao in linhas:
+        marca = "  REGRESSÃO" if nome in regressoes else ""
+        print(f"{nome:16s} {anterior * 1000:10.1f} ms -> {atual * 1000:10.1f} ms  {variacao:+7.1%}{marca}")
+    mudou = diferencas_de_ambiente(resultado, base)
+    if mudou:
+        print(f"Aviso: ambiente diferente da base ({', '.join(mudou)}); comparação só informativa", file=sys.stderr)
+        return 0
+    return 1 if regressoes else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
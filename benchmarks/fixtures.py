@@ -0,0 +1,194 @@
+"""Fixtures de mercado: respostas da CryptoCompare gravadas em disco e servidas offline.
+
+As fixtures não são versionadas: as sintéticas padrão (semente fixa, mesmos
+bytes) são geradas por `benchmarks.executar` quando a pasta ainda não existe.
+Cada moeda tem as janelas que o app pede a cada endpoint.
+
+Exemplos:
+    python -m benchmarks.fixtures gravar --limite 100      # baixa da API real
+    python -m benchmarks.fixtures sintetico --moedas 100   # gera dados determinísticos
+"""
+import argparse
+import bisect
+import gzip
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+from radar.backfill import paginas
+from radar.dados import API_BASE, INTERVALOS, baixar_universo, get_timeframe_endpoint
+from radar.transporte import cliente_padrao
+
+PASTA_PADRAO = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def _janelas_do_app(timeframes=("1h", "4h", "1d", "1w", "1M")):
+    """Maior `limit` que os timeframes do app pedem a cada endpoint"""
+    janelas = {}
+    for timeframe in timeframes:
+        endpoint, limit = get_timeframe_endpoint(timeframe)
+        janelas[endpoint] = max(janelas.get(endpoint, 0), limit)
+    return janelas
+
+
+ENDPOINTS = _janelas_do_app()
+
+
+def _caminho(pasta, endpoint, simbolo):
+    return os.path.join(pasta, endpoint, f"{simbolo}.json.gz")
+
+
+def _gravar_json(caminho, payload):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    # mtime fixo no cabeçalho gzip: a mesma semente gera os mesmos bytes
+    with open(caminho, "wb") as bruto, gzip.GzipFile(fileobj=bruto, mode="wb", compresslevel=6, mtime=0) as f:
+        f.write(json.dumps(payload).encode("utf-8"))
+
+
+def _ler_json(caminho):
+    with gzip.open(caminho, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def gravar(pasta=PASTA_PADRAO, limite=100):
+    """Grava a lista de moedas e o histórico de cada uma a partir da API"""
+    cliente = cliente_padrao()
+    moedas, _ = baixar_universo.sem_cache(limite, cliente)
+    _gravar_json(os.path.join(pasta, "moedas.json.gz"), moedas)
+    for moeda in moedas:
+        simbolo = moeda.split("(")[-1].rstrip(")")
+        for endpoint, limit in ENDPOINTS.items():
+            _gravar_json(_caminho(pasta, endpoint, simbolo), _historico_paginado(cliente, endpoint, simbolo, limit))
+    return moedas
+
+
+def _historico_paginado(cliente, endpoint, simbolo, limit):
+    """Um payload com as últimas limit + 1 barras, montado com as páginas de `toTs` da API"""
+    intervalo = INTERVALOS[endpoint]
+    fim = int(time.time())
+    registros, payload = {}, None
+    for to_ts, n in paginas((fim // intervalo - limit) * intervalo, fim, intervalo):
+        payload = cliente.obter_json(f"{API_BASE}/v2/{endpoint}",
+                                     {"fsym": simbolo, "tsym": "USD", "limit": n, "toTs": to_ts})
+        for registro in payload["Data"]["Data"]:
+            registros.setdefault(registro["time"], registro)
+    dados = [registros[t] for t in sorted(registros)]
+    return {**payload, "Data": {**payload["Data"], "TimeFrom": dados[0]["time"], "TimeTo": dados[-1]["time"],
+                                "Data": dados}}
+
+
+def _payload_sintetico(rng, fim, intervalo, limit):
+    # Passeio aleatório geométrico com volume log-normal, no formato do histo v2
+    n = limit + 1
+    tempos = fim - intervalo * np.arange(n)[::-1]
+    close = np.exp(np.cumsum(rng.normal(0, 0.02, n))) * rng.uniform(0.01, 50000)
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.01, n))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.01, n))
+    volume = rng.lognormal(14, 1, n)
+    dados = [
+        {"time": int(t), "high": h, "low": l, "open": o, "volumefrom": v / c, "volumeto": v, "close": c,
+         "conversionType": "direct", "conversionSymbol": ""}
+        for t, o, h, l, c, v in zip(tempos, open_, high, low, close, volume)
+    ]
+    return {"Response": "Success", "Message": "", "Data": {"Aggregated": False, "TimeFrom": int(tempos[0]),
+                                                           "TimeTo": int(tempos[-1]), "Data": dados}}
+
+
+def sintetico(pasta=PASTA_PADRAO, moedas=100, semente=42, fim=1_700_000_000):
+    """Fixtures determinísticas (mesma semente, mesmos bytes) com o formato da API"""
+    rng = np.random.default_rng(semente)
+    lista = [f"Moeda {i:03d} (M{i:03d})" for i in range(moedas)]
+    _gravar_json(os.path.join(pasta, "moedas.json.gz"), lista)
+    for moeda in lista:
+        simbolo = moeda.split("(")[-1].rstrip(")")
+        for endpoint, limit in ENDPOINTS.items():
+            intervalo = INTERVALOS[endpoint]
+            _gravar_json(_caminho(pasta, endpoint, simbolo),
+                         _payload_sintetico(rng, fim // intervalo * intervalo, intervalo, limit))
+    return lista
+
+
+def assinatura(pasta=PASTA_PADRAO):
+    """SHA-1 dos arquivos das fixtures (identifica com que dados uma base foi medida)"""
+    digest = hashlib.sha1()
+    arquivos = [os.path.join(pasta, "moedas.json.gz")]
+    for moeda in _ler_json(arquivos[0]):
+        simbolo = moeda.split("(")[-1].rstrip(")")
+        arquivos += [_caminho(pasta, endpoint, simbolo) for endpoint in ENDPOINTS]
+    for arquivo in arquivos:
+        with open(arquivo, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _deslocar(payload, ate, intervalo):
+    """Cópia do payload com os horários deslocados para o último candle cair no período de `ate`"""
+    dados = payload["Data"]["Data"]
+    delta = int(ate) // intervalo * intervalo - dados[-1]["time"]
+    dados = [{**r, "time": r["time"] + delta} for r in dados]
+    return {**payload, "Data": {**payload["Data"], "TimeFrom": dados[0]["time"], "TimeTo": dados[-1]["time"],
+                                "Data": dados}}
+
+
+class ClienteFixtures:
+    """Substitui o ClienteHTTP: `obter_json` responde do disco (payloads em memória).
+
+    Com `ate` (um epoch, normalmente o instante atual), as séries são deslocadas
+    no tempo para terminar nele, e o caminho de produção (`carregar_candles`,
+    que calcula a janela a partir do relógio) encontra os candles que procura.
+    """
+
+    def __init__(self, pasta=PASTA_PADRAO, ate=None):
+        self.pasta = pasta
+        self.moedas = _ler_json(os.path.join(pasta, "moedas.json.gz"))
+        self._payloads = {}
+        self._tempos = {}
+        for endpoint in ENDPOINTS:
+            for moeda in self.moedas:
+                simbolo = moeda.split("(")[-1].rstrip(")")
+                payload = _ler_json(_caminho(pasta, endpoint, simbolo))
+                if ate is not None:
+                    payload = _deslocar(payload, ate, INTERVALOS[endpoint])
+                self._payloads[(endpoint, simbolo)] = payload
+                self._tempos[(endpoint, simbolo)] = [r["time"] for r in payload["Data"]["Data"]]
+
+    def payload(self, endpoint, simbolo):
+        return self._payloads[(endpoint, simbolo)]
+
+    def obter_json(self, url, params=None):
+        """limit + 1 barras terminando em `toTs` (ou na última gravada), como a API"""
+        endpoint = url.rstrip("/").rsplit("/", 1)[-1]
+        chave = (endpoint, params["fsym"])
+        payload, tempos = self._payloads[chave], self._tempos[chave]
+        limit = int(params.get("limit", ENDPOINTS[endpoint]))
+        fim = bisect.bisect_right(tempos, int(params["toTs"])) if "toTs" in params else len(tempos)
+        dados = payload["Data"]["Data"][max(0, fim - limit - 1):fim]
+        return {**payload, "Data": {**payload["Data"], "Data": dados}}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="benchmarks.fixtures", description="Grava ou gera fixtures de mercado")
+    parser.add_argument("--pasta", default=PASTA_PADRAO)
+    sub = parser.add_subparsers(dest="comando", required=True)
+    gravar_cmd = sub.add_parser("gravar", help="baixa as respostas da API real")
+    gravar_cmd.add_argument("--limite", type=int, default=100)
+    sint = sub.add_parser("sintetico", help="gera fixtures determinísticas")
+    sint.add_argument("--moedas", type=int, default=100)
+    sint.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    if args.comando == "gravar":
+        moedas = gravar(args.pasta, args.limite)
+    else:
+        moedas = sintetico(args.pasta, args.moedas, args.semente)
+    print(f"{len(moedas)} moedas em {args.pasta} ({time.perf_counter() - inicio:.1f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
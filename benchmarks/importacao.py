@@ -0,0 +1,95 @@
+"""Orçamento de tempo de importação (partida a frio do app e da CLI).
+
+Cada módulo é importado em um interpretador novo; o custo medido é o que o
+módulo acrescenta às bibliotecas de base (pandas, NumPy, requests), que toda
+sessão paga de qualquer forma. O orçamento é só relatado (a medida depende da
+máquina); o que falha é algo pesado de gráfico importado no topo do app ou pelo
+pacote headless, verificado também pelos testes.
+
+Exemplos:
+    python -m benchmarks.importacao
+    python -m benchmarks.importacao --orcamento-ms 100 --repeticoes 9
+"""
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASE = ("numpy", "pandas", "requests")
+MODULOS = ("radar.cli", "radar.worker", "radar.screener", "radar.analise", "radar.planejador", "radar.indice")
+# Não podem ser carregados na importação (só quando um gráfico é desenhado)
+PESADOS = ("plotly", "matplotlib", "ta")
+ORCAMENTO_PADRAO_MS = 150.0  # acréscimo máximo de cada módulo sobre a base
+
+_MEDIR = """
+import json, sys, time
+inicio = time.perf_counter()
+{importacoes}
+duracao = time.perf_counter() - inicio
+print(json.dumps({{"s": duracao, "modulos": sorted(sys.modules)}}))
+"""
+
+
+def _medir_uma(modulos):
+    codigo = _MEDIR.format(importacoes="\n".join(f"import {m}" for m in modulos))
+    saida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True, check=True)
+    return json.loads(saida.stdout)
+
+
+def medir(modulos, repeticoes):
+    """Menor tempo (s) de `repeticoes` importações a frio (o menos afetado por ruído) e os módulos carregados"""
+    medidas = [_medir_uma(modulos) for _ in range(repeticoes)]
+    return min(m["s"] for m in medidas), medidas[-1]["modulos"]
+
+
+def pesados_carregados(modulos_carregados):
+    return sorted({m.split(".")[0] for m in modulos_carregados} & set(PESADOS))
+
+
+def importacoes_do_topo(caminho):
+    """Pacotes importados no nível do módulo (fora de funções) de um arquivo"""
+    with open(caminho, encoding="utf-8") as f:
+        arvore = ast.parse(f.read(), caminho)
+    nomes = set()
+    for no in arvore.body:
+        if isinstance(no, ast.Import):
+            nomes.update(alias.name.split(".")[0] for alias in no.names)
+        elif isinstance(no, ast.ImportFrom) and no.module and not no.level:
+            nomes.add(no.module.split(".")[0])
+    return nomes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="benchmarks.importacao", description="Orçamento de importação")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--orcamento-ms", type=float, default=ORCAMENTO_PADRAO_MS)
+    parser.add_argument("--modulos", nargs="*", default=list(MODULOS))
+    args = parser.parse_args(argv)
+
+    problemas = []
+    base, _ = medir(BASE, args.repeticoes * 2)  # Mais amostras: a base é subtraída de todas as medidas
+    print(f"{'base':20s} {base * 1000:8.1f} ms  ({', '.join(BASE)})")
+    for modulo in args.modulos:
+        total, carregados = medir(BASE + (modulo,), args.repeticoes)
+        extra = max(0.0, total - base) * 1000
+        pesados = pesados_carregados(carregados)
+        marca = f"  acima do orçamento de {args.orcamento_ms:.0f} ms" if extra > args.orcamento_ms else ""
+        print(f"{modulo:20s} {extra:+8.1f} ms{marca}")
+        if pesados:
+            problemas.append(f"{modulo} importa {', '.join(pesados)}")
+
+    # O app não roda fora do Streamlit; basta garantir que o topo do script não importa nada pesado
+    no_topo = importacoes_do_topo(os.path.join(RAIZ, "app.py")) & set(PESADOS)
+    if no_topo:
+        problemas.append(f"app.py importa no topo: {', '.join(sorted(no_topo))}")
+
+    for problema in problemas:
+        print(problema, file=sys.stderr)
+    return 1 if problemas else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
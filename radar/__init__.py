@@ -0,0 +1 @@
+"""Núcleo do Crypto Analyst Pro (sem dependência do Streamlit)"""
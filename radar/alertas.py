@@ -0,0 +1,303 @@
+"""Alertas da watchlist: reclassifica uma moeda só quando chega um candle dela.
+
+Cada moeda/timeframe observado guarda um `EstadoIndicadores` e a última
+classificação. Um candle novo avança o estado em O(1); o mesmo candle com
+outro fechamento (ainda em formação) é revisado. Quando alguma classe muda,
+um `Evento` é entregue aos sinks configurados.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from radar.classificacao import classificar_rsi, classificar_tendencia, classificar_volume, obter_recomendacao
+from radar.metricas import contar, cronometrar
+from radar.reamostragem import inicio_dos_buckets
+from radar.streaming import EstadoIndicadores
+from radar.transporte import TIMEOUT_PADRAO, cliente_padrao
+
+logger = logging.getLogger(__name__)
+
+# Destinos separados por vírgula: "log", "arquivo:CAMINHO" ou "webhook:URL"
+SINKS_PADRAO = os.environ.get("RADAR_ALERTAS", "log")
+CAMPOS = ("Tendência", "Classe RSI", "Volume", "Recomendação")
+
+
+class Evento:
+    """Mudança de uma classe de uma moeda em um timeframe"""
+
+    __slots__ = ("moeda", "timeframe", "campo", "anterior", "atual", "candle", "preco", "rsi", "instante")
+
+    def __init__(self, moeda, timeframe, campo, anterior, atual, candle, preco, rsi):
+        self.moeda = moeda
+        self.timeframe = timeframe
+        self.campo = campo
+        self.anterior = anterior
+        self.atual = atual
+        self.candle = candle
+        self.preco = preco
+        self.rsi = rsi
+        self.instante = time.time()
+
+    def para_dict(self):
+        return {
+            "moeda": self.moeda,
+            "timeframe": self.timeframe,
+            "campo": self.campo,
+            "anterior": self.anterior,
+            "atual": self.atual,
+            "candle": self.candle.isoformat() if isinstance(self.candle, pd.Timestamp) else self.candle,
+            "preco": self.preco,
+            "rsi": None if self.rsi is None or np.isnan(self.rsi) else self.rsi,
+            "instante": self.instante,
+        }
+
+    def __repr__(self):
+        return f"Evento({self.moeda} {self.timeframe} {self.campo}: {self.anterior} -> {self.atual})"
+
+
+class SinkLog:
+    """Escreve cada evento no log"""
+
+    def __init__(self, nivel=logging.INFO):
+        self.nivel = nivel
+
+    def emitir(self, eventos):
+        for e in eventos:
+            logger.log(self.nivel, "%s [%s] %s: %s -> %s (preço %s)",
+                       e.moeda, e.timeframe, e.campo, e.anterior, e.atual, e.preco)
+
+
+class SinkArquivo:
+    """Fila em arquivo: uma linha JSON por evento, acrescentada a cada entrega"""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+
+    def emitir(self, eventos):
+        linhas = "".join(json.dumps(e.para_dict(), ensure_ascii=False) + "\n" for e in eventos)
+        with self._lock, open(self.caminho, "a", encoding="utf-8") as f:
+            f.write(linhas)
+
+
+class SinkWebhook:
+    """POST com a lista de eventos em JSON; falhas são registradas e descartadas"""
+
+    def __init__(self, url, cliente=None):
+        self.url = url
+        self.cliente = cliente
+
+    def emitir(self, eventos):
+        sessao = (self.cliente or cliente_padrao()).sessao
+        try:
+            resposta = sessao.post(self.url, json={"eventos": [e.para_dict() for e in eventos]},
+                                   timeout=TIMEOUT_PADRAO)
+            resposta.raise_for_status()
+        except Exception as e:
+            logger.warning("Falha ao entregar %d alerta(s) para %s: %s", len(eventos), self.url, e)
+
+
+class SinkMemoria:
+    """Guarda os eventos em uma lista (útil para a interface e para inspeção)"""
+
+    def __init__(self, maximo=1000):
+        self.eventos = deque(maxlen=maximo)
+
+    def emitir(self, eventos):
+        self.eventos.extend(eventos)
+
+
+def criar_sinks(especificacao=SINKS_PADRAO):
+    """Sinks a partir de "log,arquivo:alertas.jsonl,webhook:https://..." """
+    sinks = []
+    for item in filter(None, (parte.strip() for parte in especificacao.split(","))):
+        tipo, _, alvo = item.partition(":")
+        if tipo == "log":
+            sinks.append(SinkLog())
+        elif tipo == "arquivo" and alvo:
+            sinks.append(SinkArquivo(alvo))
+        elif tipo == "webhook" and alvo:
+            sinks.append(SinkWebhook(alvo))
+        else:
+            raise ValueError(f"sink de alertas desconhecido: {item!r}")
+    return sinks
+
+
+class EstadoMoeda:
+    """Indicadores incrementais, janela de volume e última classificação de uma moeda/timeframe"""
+
+    __slots__ = ("indicadores", "volumes", "soma_volume", "ultimo_candle", "close_anterior",
+                 "ultimo_close", "classes", "rsi")
+
+    def __init__(self, df):
+        self.indicadores = EstadoIndicadores.a_partir_de(df["close"].to_numpy()[:-1])
+        # A média de volume do screener é a da janela buscada; a janela desliza com os candles novos
+        self.volumes = deque(df["volume"].to_numpy()[:-1].tolist(), maxlen=len(df))
+        self.soma_volume = float(sum(self.volumes))
+        self.ultimo_candle = None
+        self.close_anterior = self.ultimo_close = float("nan")
+        self.classes = None
+        self.rsi = float("nan")
+        self.avancar(df.index[-1], df["close"].iat[-1], df["volume"].iat[-1])
+
+    def avancar(self, candle, close, volume):
+        """Incorpora um candle novo, ou revisa o último se `candle` for o mesmo instante"""
+        close, volume = float(close), float(volume)
+        if candle == self.ultimo_candle:
+            self.soma_volume -= self.volumes.pop()
+            valores = self.indicadores.revisar(close)
+        else:
+            if len(self.volumes) == self.volumes.maxlen:
+                self.soma_volume -= self.volumes[0]
+            self.close_anterior = self.ultimo_close
+            valores = self.indicadores.avancar(close)
+        self.volumes.append(volume)
+        self.soma_volume += volume
+        self.ultimo_candle, self.ultimo_close = candle, close
+        self.rsi = valores["rsi"]
+        self.classes = self._classificar(valores, volume)
+        return self.classes
+
+    def _classificar(self, valores, volume):
+        # Mesmas regras de screener.classificar_ultimos
+        rsi_class = classificar_rsi(valores["rsi"])
+        tendencia = classificar_tendencia(valores["ema_8"], valores["ema_21"], valores["ema_50"], valores["ema_200"])
+        volume_class = classificar_volume(volume, self.soma_volume / len(self.volumes))
+        macd_signal = "Compra" if valores["macd"] > valores["macd_signal"] else "Venda"
+        rec_principal, _ = obter_recomendacao(tendencia, rsi_class, volume_class, macd_signal)
+        return {"Tendência": tendencia, "Classe RSI": rsi_class, "Volume": volume_class, "Recomendação": rec_principal}
+
+
+class MotorAlertas:
+    """Watchlist com reavaliação incremental e entrega de transições aos sinks.
+
+    `observar` inicializa uma moeda com o histórico (sem gerar eventos);
+    depois, `novo_candle` ou `atualizar` reavaliam só a moeda que mudou.
+    """
+
+    def __init__(self, sinks=None, campos=CAMPOS):
+        self.sinks = list(criar_sinks() if sinks is None else sinks)
+        self.campos = tuple(campos)
+        self._estados = {}  # (moeda, timeframe) -> EstadoMoeda
+        self._lock = threading.Lock()
+
+    def observar(self, moeda, timeframe, df):
+        """Inclui (ou reinicia) a moeda na watchlist a partir dos candles preparados"""
+        estado = EstadoMoeda(df)
+        with self._lock:
+            self._estados[(moeda, timeframe)] = estado
+        return estado.classes
+
+    def esquecer(self, moeda, timeframe=None):
+        with self._lock:
+            for chave in [c for c in self._estados if c[0] == moeda and timeframe in (None, c[1])]:
+                del self._estados[chave]
+
+    def observadas(self):
+        with self._lock:
+            return list(self._estados)
+
+    def ultimo_candle(self, moeda, timeframe):
+        """Instante do último candle já avaliado da moeda, ou None se não observada"""
+        estado = self._estados.get((moeda, timeframe))
+        return None if estado is None else estado.ultimo_candle
+
+    def classes(self, moeda, timeframe):
+        """Última classificação conhecida da moeda, ou None se não observada"""
+        estado = self._estados.get((moeda, timeframe))
+        return None if estado is None else dict(estado.classes)
+
+    def novo_candle(self, moeda, timeframe, candle, close, volume):
+        """Reavalia a moeda com um candle (novo ou revisado) e entrega as transições"""
+        estado = self._estados.get((moeda, timeframe))
+        if estado is None or (estado.ultimo_candle is not None and candle < estado.ultimo_candle):
+            return []
+        with cronometrar("alertas"):
+            anteriores = estado.classes
+            atuais = estado.avancar(candle, close, volume)
+            eventos = [
+                Evento(moeda, timeframe, campo, anteriores[campo], atuais[campo], candle, estado.ultimo_close, estado.rsi)
+                for campo in self.campos if anteriores[campo] != atuais[campo]
+            ]
+        self._entregar(eventos)
+        return eventos
+
+    def atualizar(self, moeda, timeframe, df):
+        """Aplica só os candles de `df` a partir do último já visto (nada a fazer se não mudou)"""
+        estado = self._estados.get((moeda, timeframe))
+        if estado is None:
+            self.observar(moeda, timeframe, df)
+            return []
+        if df.index[-1] == estado.ultimo_candle and df["close"].iat[-1] == estado.ultimo_close:
+            return []  # Mesmo candle, mesmo fechamento
+        novos = df.loc[estado.ultimo_candle:]
+        eventos = []
+        for candle, close, volume in zip(novos.index, novos["close"].to_numpy(), novos["volume"].to_numpy()):
+            eventos += self.novo_candle(moeda, timeframe, candle, close, volume)
+        return eventos
+
+    def _entregar(self, eventos):
+        if not eventos:
+            return
+        contar("alertas_emitidos", len(eventos))
+        for sink in self.sinks:
+            try:
+                sink.emitir(eventos)
+            except Exception:
+                logger.exception("Falha no sink de alertas %r", sink)
+
+
+def _mudaram(motor, moedas, timeframe, cotacoes, precos):
+    """Moedas cujo candle atual pode ter mudado desde a última busca.
+
+    Sem cotação da moeda, ou com um período novo do timeframe já começado
+    desde o último candle avaliado, ela é sempre buscada; senão, só se o preço
+    do snapshot for diferente do visto na última busca.
+    """
+    atual = int(inicio_dos_buckets(np.array([int(time.time())], dtype=np.int64), timeframe)[0])
+    mudaram = []
+    for moeda in moedas:
+        cotacao = cotacoes.obter(moeda)
+        ultimo = motor.ultimo_candle(moeda, timeframe)
+        if (cotacao is None or ultimo is None or int(ultimo.timestamp()) < atual
+                or cotacao[0] != precos.get(moeda)):
+            mudaram.append((moeda, None if cotacao is None else cotacao[0]))
+    return mudaram
+
+
+def acompanhar(motor, moedas, timeframe, buscar_candles, intervalo=60.0, parar=None, buscar_cotacoes=None):
+    """Laço simples de polling: busca os candles da watchlist e repassa ao motor.
+
+    `buscar_candles(moeda, timeframe)` devolve os candles preparados (ou None).
+    Com `buscar_cotacoes(moedas)` (snapshot em lote, como `dados.baixar_cotacoes`,
+    indexado pelos mesmos nomes de `moedas`), cada volta custa uma chamada e os
+    candles só são buscados para as moedas cujo preço mudou ou cujo candle
+    virou; sem ele, toda a watchlist é buscada a cada volta.
+    """
+    parar = parar or threading.Event()
+    precos = {}  # moeda -> preço do snapshot na última busca de candles bem-sucedida
+    while not parar.is_set():
+        inicio = time.monotonic()
+        pendentes = [(moeda, None) for moeda in moedas]
+        if buscar_cotacoes is not None:
+            try:
+                pendentes = _mudaram(motor, moedas, timeframe, buscar_cotacoes(moedas), precos)
+            except Exception as e:
+                logger.warning("Erro ao buscar cotações da watchlist: %s", e)
+        contar("alertas_sem_mudanca", len(moedas) - len(pendentes))
+        for moeda, preco in pendentes:
+            try:
+                df = buscar_candles(moeda, timeframe)
+            except Exception as e:
+                logger.warning("Erro ao buscar dados de %s: %s", moeda, e)
+                continue
+            if df is not None and len(df):
+                motor.atualizar(moeda, timeframe, df)
+                precos[moeda] = preco
+        parar.wait(max(0.0, intervalo - (time.monotonic() - inicio)))
@@ -0,0 +1,67 @@
+"""Análise individual de uma moeda (sem dependência do Streamlit)"""
+from radar.classificacao import classificar_rsi, classificar_tendencia, classificar_volume, obter_recomendacao
+from radar.dados import get_timeframe_endpoint
+from radar.indicadores import calcular_indicadores
+from radar.metricas import cronometrado
+from radar.reamostragem import preparar_candles
+from radar.resultado import Falha, Resultado
+
+
+@cronometrado("analise")
+def analisar_candles(df, indicadores):
+    """Métricas, classificações e recomendação referentes ao último candle"""
+    preco_atual = df["close"].iloc[-1]
+    variacao = ((df["close"].iloc[-1] - df["close"].iloc[-2]) / df["close"].iloc[-2] * 100) if len(df) > 1 else 0
+    volume_atual = df["volume"].iloc[-1]
+    volume_medio = df["volume"].mean()
+    rsi = indicadores.rsi.iloc[-1]
+    rsi_class = classificar_rsi(rsi)
+
+    macd_line = indicadores.macd.iloc[-1]
+    macd_signal_line = indicadores.macd_signal.iloc[-1]
+    macd_signal = "Compra" if macd_line > macd_signal_line else "Venda"
+
+    # EMAs (None se não houver dados suficientes)
+    emas = indicadores.ultimos_emas()
+    tendencia = classificar_tendencia(emas.get("ema_8"), emas.get("ema_21"), emas.get("ema_50"), emas.get("ema_200"))
+    volume_class = classificar_volume(volume_atual, volume_medio)
+    rec_principal, rec_detalhe = obter_recomendacao(tendencia, rsi_class, volume_class, macd_signal)
+
+    return {
+        "preco_atual": preco_atual,
+        "variacao": variacao,
+        "volume_atual": volume_atual,
+        "volume_medio": volume_medio,
+        "rsi": rsi,
+        "rsi_class": rsi_class,
+        "macd_line": macd_line,
+        "macd_signal_line": macd_signal_line,
+        "macd_diff": indicadores.macd_diff.iloc[-1],
+        "macd_signal": macd_signal,
+        "emas": emas,
+        "tendencia": tendencia,
+        "volume_class": volume_class,
+        "rec_principal": rec_principal,
+        "rec_detalhe": rec_detalhe,
+    }
+
+
+def analisar_moeda(simbolo, timeframe, buscar_candles, cache_indicadores=None, reamostragem=None):
+    """Busca, prepara e analisa uma moeda; erros viram `Falha` no resultado"""
+    endpoint, limit = get_timeframe_endpoint(timeframe)
+    try:
+        df = buscar_candles(simbolo, endpoint, limit)
+    except Exception as e:
+        return Resultado(falhas=[Falha(simbolo, "busca", e)])
+
+    df = preparar_candles(df, timeframe, minimo=1, simbolo=simbolo, reamostragem=reamostragem)
+    if df is None:
+        return Resultado(falhas=[Falha(simbolo, "preparo", "Dados insuficientes para análise")])
+
+    if cache_indicadores is not None:
+        indicadores = cache_indicadores.obter(simbolo, timeframe, df)
+    else:
+        indicadores = calcular_indicadores(df)
+    analise = analisar_candles(df, indicadores)
+    analise.update(simbolo=simbolo, timeframe=timeframe, ultimo_candle=df.index[-1].isoformat())
+    return Resultado(analise)
@@ -0,0 +1,140 @@
+"""Armazenamento local de candles OHLCV em SQLite"""
+import os
+import sqlite3
+from contextlib import contextmanager
+
+import pandas as pd
+
+from radar.candles import COLUNAS, candles_de_tuplas
+
+CAMINHO_PADRAO = os.environ.get("RADAR_DB", os.path.join("dados", "candles.sqlite"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS candles (
+    symbol   TEXT    NOT NULL,
+    endpoint TEXT    NOT NULL,
+    time     INTEGER NOT NULL,
+    open     REAL    NOT NULL,
+    high     REAL    NOT NULL,
+    low      REAL    NOT NULL,
+    close    REAL    NOT NULL,
+    volume   REAL    NOT NULL,
+    PRIMARY KEY (symbol, endpoint, time)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS historico (
+    symbol   TEXT    NOT NULL,
+    endpoint TEXT    NOT NULL,
+    inicio   INTEGER NOT NULL,
+    PRIMARY KEY (symbol, endpoint)
+) WITHOUT ROWID
+"""
+
+
+class ArmazemCandles:
+    """Candles persistidos por (símbolo, endpoint, horário do candle)"""
+
+    def __init__(self, caminho=CAMINHO_PADRAO):
+        self.caminho = caminho
+        pasta = os.path.dirname(caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        with self._conectar() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _conectar(self):
+        # Uma conexão por operação: o armazém é usado por várias threads
+        conn = sqlite3.connect(self.caminho, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def ultimo_timestamp(self, simbolo, endpoint):
+        """Epoch (s) do candle mais recente armazenado, ou None"""
+        with self._conectar() as conn:
+            (ultimo,) = conn.execute(
+                "SELECT MAX(time) FROM candles WHERE symbol = ? AND endpoint = ?",
+                (simbolo, endpoint),
+            ).fetchone()
+        return ultimo
+
+    def primeiro_timestamp(self, simbolo, endpoint):
+        """Epoch (s) do candle mais antigo armazenado, ou None"""
+        with self._conectar() as conn:
+            (primeiro,) = conn.execute(
+                "SELECT MIN(time) FROM candles WHERE symbol = ? AND endpoint = ?",
+                (simbolo, endpoint),
+            ).fetchone()
+        return primeiro
+
+    def inicio_do_historico(self, simbolo, endpoint):
+        """Epoch (s) do primeiro candle que a API tem para a moeda, se o backfill já chegou lá"""
+        with self._conectar() as conn:
+            linha = conn.execute(
+                "SELECT inicio FROM historico WHERE symbol = ? AND endpoint = ?", (simbolo, endpoint),
+            ).fetchone()
+        return None if linha is None else linha[0]
+
+    def marcar_inicio_do_historico(self, simbolo, endpoint, inicio):
+        with self._conectar() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO historico (symbol, endpoint, inicio) VALUES (?, ?, ?)",
+                (simbolo, endpoint, int(inicio)),
+            )
+
+    def gravar(self, simbolo, endpoint, df):
+        """Insere ou substitui candles (o último candle pode estar em formação)"""
+        if df.empty:
+            return
+        tempos = (df.index - pd.Timestamp("1970-01-01")) // pd.Timedelta(seconds=1)
+        linhas = zip(
+            [simbolo] * len(df), [endpoint] * len(df), tempos.tolist(),
+            *(df[col].tolist() for col in COLUNAS),
+        )
+        with self._conectar() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO candles (symbol, endpoint, time, open, high, low, close, volume) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                linhas,
+            )
+
+    def carregar(self, simbolo, endpoint, n):
+        """Retorna os `n` candles mais recentes em ordem cronológica"""
+        with self._conectar() as conn:
+            linhas = conn.execute(
+                "SELECT time, open, high, low, close, volume FROM candles "
+                "WHERE symbol = ? AND endpoint = ? ORDER BY time DESC LIMIT ?",
+                (simbolo, endpoint, int(n)),
+            ).fetchall()
+        if not linhas:
+            return pd.DataFrame(columns=COLUNAS)
+        return candles_de_tuplas(linhas[::-1])
+
+    def lacunas(self, simbolo, endpoint, intervalo, inicio, fim):
+        """(anterior, seguinte) de cada salto maior que `intervalo` entre candles guardados que toca [inicio, fim]"""
+        with self._conectar() as conn:
+            return conn.execute(
+                "SELECT anterior, time FROM ("
+                "  SELECT time, LAG(time) OVER (ORDER BY time) AS anterior FROM candles"
+                "  WHERE symbol = ? AND endpoint = ? AND time >= COALESCE("
+                "    (SELECT MAX(time) FROM candles WHERE symbol = ? AND endpoint = ? AND time < ?), ?)"
+                ") WHERE time - anterior > ? AND time > ? AND anterior < ? ORDER BY time DESC",
+                (simbolo, endpoint, simbolo, endpoint, int(inicio), int(inicio), int(intervalo),
+                 int(inicio), int(fim)),
+            ).fetchall()
+
+    def intervalo(self, simbolo, endpoint, inicio=None, fim=None):
+        """Candles com horário em [inicio, fim] (epochs em s; None = sem limite), em ordem cronológica"""
+        with self._conectar() as conn:
+            linhas = conn.execute(
+                "SELECT time, open, high, low, close, volume FROM candles "
+                "WHERE symbol = ? AND endpoint = ? AND time BETWEEN ? AND ? ORDER BY time",
+                (simbolo, endpoint, -2 ** 63 if inicio is None else int(inicio),
+                 2 ** 63 - 1 if fim is None else int(fim)),
+            ).fetchall()
+        if not linhas:
+            return pd.DataFrame(columns=COLUNAS)
+        return candles_de_tuplas(linhas)
@@ -0,0 +1,169 @@
+"""Histórico profundo: páginas de `toTs` buscadas em paralelo e guardadas no armazém.
+
+Como cada página cobre um intervalo fixo (até 2001 barras terminando em
+`toTs`), todas as páginas de um período são conhecidas de antemão e podem
+ser buscadas ao mesmo tempo, sem seguir a paginação uma a uma. As páginas
+vão da mais recente para a mais antiga em ondas; a moeda sai da fila quando
+a API devolve candles zerados (antes da listagem) ou quando uma página falha,
+para que o armazém guarde sempre um trecho contínuo.
+"""
+import logging
+import os
+import time
+
+import pandas as pd
+
+from radar.armazenamento import ArmazemCandles
+from radar.coleta import MAX_WORKERS, buscar_concorrente
+from radar.dados import INTERVALOS, baixar_historico
+
+logger = logging.getLogger(__name__)
+
+# Profundidade padrão do backfill, em dias
+PROFUNDIDADE_DIAS = int(os.environ.get("RADAR_BACKFILL_DIAS", "1825"))
+LIMITE_MAXIMO = 2000  # maior `limit` aceito pela API (a página traz limit + 1 barras)
+
+
+def paginas(inicio, fim, intervalo, limite=LIMITE_MAXIMO):
+    """(to_ts, limit) de cada página cobrindo [inicio, fim], da mais recente para a mais antiga"""
+    to_ts = fim // intervalo * intervalo
+    inicio = -(-inicio // intervalo) * intervalo  # Primeiro candle inteiro dentro do período
+    resultado = []
+    while to_ts >= inicio:
+        barras = min(limite + 1, (to_ts - inicio) // intervalo + 1)
+        resultado.append((to_ts, barras - 1))
+        to_ts -= barras * intervalo
+    return resultado
+
+
+def sem_pre_listagem(df):
+    """(candles, chegou ao início): a API preenche com zeros as barras anteriores à listagem"""
+    zerados = (df[["open", "high", "low", "close"]] == 0).all(axis=1)
+    if not zerados.any():
+        return df, False
+    return df[~zerados], True
+
+
+def costurar(partes):
+    """Junta páginas em uma série cronológica; em horários repetidos vale a página mais recente"""
+    partes = [p for p in partes if not p.empty]
+    if not partes:
+        return pd.DataFrame(columns=["open", "high", "low", "close", "volume"])
+    df = pd.concat(partes[::-1])
+    return df[~df.index.duplicated(keep="last")].sort_index()
+
+
+def _epoch(instante):
+    return int(instante.timestamp()) if isinstance(instante, pd.Timestamp) else int(instante)
+
+
+class Backfill:
+    """Completa o armazém de candles até uma data de início.
+
+    Só os trechos que faltam são buscados: o que é mais novo que o último
+    candle guardado, as lacunas no meio (saltos maiores que um candle, deixados
+    por períodos sem atualização) e o que é mais antigo que o primeiro.
+    `falhas` guarda o erro de cada moeda cujo preenchimento parou na última
+    chamada de `preencher`.
+    """
+
+    def __init__(self, armazem=None, max_workers=MAX_WORKERS, cliente=None):
+        self.armazem = armazem or ArmazemCandles()
+        self.max_workers = max_workers
+        self.cliente = cliente
+        self.falhas = {}
+
+    def faltando(self, simbolo, endpoint, inicio, fim, atualizar_ultimo=False):
+        """Páginas ainda não armazenadas de [inicio, fim]
+
+        O último candle guardado pode ter sido gravado ainda em formação: com
+        `atualizar_ultimo` ele é sempre rebuscado; sem, só quando [inicio, fim]
+        já passa do período dele.
+        """
+        intervalo = INTERVALOS[endpoint]
+        inicio_api = self.armazem.inicio_do_historico(simbolo, endpoint)
+        if inicio_api is not None:
+            inicio = max(inicio, inicio_api)
+        primeiro = self.armazem.primeiro_timestamp(simbolo, endpoint)
+        if primeiro is None:
+            return paginas(inicio, fim, intervalo)
+        ultimo = self.armazem.ultimo_timestamp(simbolo, endpoint)
+        novas = []
+        if fim >= ultimo + intervalo or (atualizar_ultimo and fim >= ultimo):
+            novas = paginas(max(inicio, ultimo), fim, intervalo)
+        lacunas = [
+            pagina
+            for anterior, seguinte in self.armazem.lacunas(simbolo, endpoint, intervalo, inicio, fim)
+            for pagina in paginas(max(inicio, anterior + intervalo), min(fim, seguinte - intervalo), intervalo)
+        ]
+        antigas = paginas(inicio, primeiro - intervalo, intervalo) if inicio < primeiro else []
+        return novas + lacunas + antigas
+
+    def _baixar(self, tarefa):
+        simbolo, endpoint, (to_ts, limit) = tarefa
+        try:
+            return baixar_historico(simbolo, endpoint, limit, to_ts=to_ts, cliente=self.cliente)
+        except Exception as e:
+            return e
+
+    def preencher(self, simbolos, endpoint, inicio, fim=None, ao_progredir=None, atualizar_ultimo=False):
+        """Busca e grava o que falta de cada moeda; devolve {simbolo: candles gravados}"""
+        inicio, fim = _epoch(inicio), _epoch(time.time() if fim is None else fim)
+        filas = {s: self.faltando(s, endpoint, inicio, fim, atualizar_ultimo) for s in simbolos}
+        self.falhas = {}
+        gravados = dict.fromkeys(simbolos, 0)
+        total, feitos = sum(len(f) for f in filas.values()), 0
+
+        filas = {s: f for s, f in filas.items() if f}
+        while filas:
+            # Com poucas moedas na fila, cada uma recebe várias páginas por onda
+            por_moeda = max(1, self.max_workers // len(filas))
+            tarefas = [(s, endpoint, pagina) for s, fila in filas.items() for pagina in fila[:por_moeda]]
+            respostas = buscar_concorrente(tarefas, self._baixar, self.max_workers)
+
+            por_simbolo = {}
+            for (simbolo, _, pagina), resposta in zip(tarefas, respostas):
+                por_simbolo.setdefault(simbolo, []).append((pagina, resposta))
+            for simbolo, resultados in por_simbolo.items():
+                partes, parar, chegou_ao_inicio = [], False, False
+                primeiro = self.armazem.primeiro_timestamp(simbolo, endpoint)
+                for (to_ts, _), resposta in resultados:
+                    if isinstance(resposta, Exception):
+                        logger.warning("Backfill de %s (%s) parou em toTs=%d: %s", simbolo, endpoint, to_ts, resposta)
+                        self.falhas[simbolo] = resposta
+                        parar = True
+                        break
+                    df, chegou_ao_inicio = sem_pre_listagem(resposta)
+                    partes.append(df)
+                    # Só uma página mais antiga que o armazém pode revelar o início da listagem
+                    chegou_ao_inicio = (chegou_ao_inicio or df.empty) and (primeiro is None or to_ts < primeiro)
+                    if chegou_ao_inicio:
+                        parar = True
+                        break
+                df = costurar(partes)
+                self.armazem.gravar(simbolo, endpoint, df)
+                gravados[simbolo] += len(df)
+                primeiro = self.armazem.primeiro_timestamp(simbolo, endpoint)
+                if chegou_ao_inicio and primeiro is not None:
+                    # Não há nada mais antigo na API: próximos backfills não voltam a pedir
+                    self.armazem.marcar_inicio_do_historico(simbolo, endpoint, primeiro)
+                if parar:
+                    total -= len(filas[simbolo]) - len(resultados)  # Páginas que não serão mais pedidas
+                filas[simbolo] = [] if parar else filas[simbolo][len(resultados):]
+
+            feitos += len(tarefas)
+            if ao_progredir is not None:
+                ao_progredir(feitos, total)
+            filas = {s: f for s, f in filas.items() if f}
+        return gravados
+
+
+def carregar_intervalo(simbolo, endpoint, inicio, fim=None, armazem=None, cliente=None):
+    """Candles de [inicio, fim] lidos do armazém, buscando antes só o que ainda falta.
+
+    Sem nada faltando no período pedido, nenhuma requisição é feita. As páginas
+    de uma moeda são buscadas em sequência: quem paraleliza é quem chama.
+    """
+    backfill = Backfill(armazem, max_workers=1, cliente=cliente)
+    backfill.preencher([simbolo], endpoint, inicio, fim)
+    return backfill.armazem.intervalo(simbolo, endpoint, _epoch(inicio), None if fim is None else _epoch(fim))
@@ -0,0 +1,229 @@
+"""Backtest vetorizado das recomendações sobre históricos inteiros.
+
+As regras são as de `classificacao` (RSI, tendência pelas EMAs, volume e MACD),
+avaliadas para todas as barras e moedas de uma vez com operações de array. O
+volume médio de cada barra é o da mesma janela que a classificação ao vivo
+busca para o timeframe (as últimas barras até ela, sem olhar adiante).
+"""
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from radar.dados import INTERVALOS, get_timeframe_endpoint
+from radar.painel import PERIODOS_EMA, ema_painel, macd_painel, montar_painel, rsi_painel
+
+RECOMENDACOES = ("Aguardar", "Compra Forte", "Compra", "Aguardar correção", "Observar reversão", "Venda / Evitar")
+# Direção esperada do preço depois de cada sinal (acerto = retorno futuro nesse sentido)
+DIRECAO = {"Compra Forte": 1, "Compra": 1, "Observar reversão": 1, "Aguardar correção": -1, "Venda / Evitar": -1}
+ENTRADAS_PADRAO = ("Compra Forte", "Compra")
+SAIDAS_PADRAO = ("Venda / Evitar", "Aguardar correção")
+HORIZONTE_PADRAO = 10  # barras para medir o retorno depois de cada sinal
+
+# Códigos das classes intermediárias
+_SOBREVENDIDO, _NEUTRO, _SOBRECOMPRADO = 0, 1, 2
+_INSUFICIENTE, _ALTA, _BAIXA, _TRANSICAO = 0, 1, 2, 3
+_INDEFINIDO, _SUBINDO, _NORMAL, _CAINDO = 0, 1, 2, 3
+
+# Duração (s) de uma barra de cada timeframe; o mês é o médio do calendário gregoriano
+_DURACOES = {"1h": 3600, "4h": 4 * 3600, "1d": 86400, "1w": 7 * 86400, "1M": 2_629_746}
+
+
+def janela_ao_vivo(timeframe):
+    """Barras do timeframe cobertas pela busca da classificação ao vivo (None se desconhecido)"""
+    if timeframe not in _DURACOES:
+        return None
+    endpoint, limit = get_timeframe_endpoint(timeframe)
+    return max(1, (limit + 1) * INTERVALOS[endpoint] // _DURACOES[timeframe])
+
+
+class Parametros:
+    """Limiares das regras de classificação (padrões iguais aos do screener)"""
+
+    __slots__ = ("rsi_baixo", "rsi_alto", "volume_alto", "volume_baixo")
+
+    def __init__(self, rsi_baixo=30, rsi_alto=70, volume_alto=1.2, volume_baixo=0.8):
+        self.rsi_baixo = rsi_baixo
+        self.rsi_alto = rsi_alto
+        self.volume_alto = volume_alto
+        self.volume_baixo = volume_baixo
+
+    def para_dict(self):
+        return {nome: getattr(self, nome) for nome in self.__slots__}
+
+    def __repr__(self):
+        return f"Parametros({', '.join(f'{k}={v}' for k, v in self.para_dict().items())})"
+
+
+def grade(rsi_baixo=(30,), rsi_alto=(70,), volume_alto=(1.2,), volume_baixo=(0.8,)):
+    """Produto cartesiano dos limiares"""
+    return [Parametros(*valores) for valores in itertools.product(rsi_baixo, rsi_alto, volume_alto, volume_baixo)]
+
+
+class PainelBacktest:
+    """Indicadores de todas as barras de um universo, calculados uma vez por timeframe.
+
+    Só a classificação depende dos limiares; EMAs, RSI, MACD e volume médio
+    são reaproveitados por todos os pontos da grade. O volume médio é o das
+    últimas `janela_volume` barras (por padrão a janela ao vivo do timeframe;
+    sem timeframe, todo o histórico até a barra).
+    """
+
+    def __init__(self, candles, timeframe=None, janela_volume=None):
+        self.timeframe = timeframe
+        self.janela_volume = janela_volume or janela_ao_vivo(timeframe)
+        self.moedas = list(candles)
+        self.close = montar_painel([df["close"] for df in candles.values()])
+        self.volume = montar_painel([df["volume"] for df in candles.values()])
+        self.rsi = rsi_painel(self.close)
+        macd, sinal, _ = macd_painel(self.close)
+        self.macd_compra = macd > sinal  # NaN compara como False: "Venda", como no escalar
+
+        emas = [ema_painel(self.close, p) for p in PERIODOS_EMA]
+        with np.errstate(invalid="ignore"):
+            alta = (emas[0] > emas[1]) & (emas[1] > emas[2]) & (emas[2] > emas[3])
+            baixa = (emas[0] < emas[1]) & (emas[1] < emas[2]) & (emas[2] < emas[3])
+        insuficiente = np.isnan(np.stack(emas)).any(axis=0)
+        self.tendencia = np.select([insuficiente, alta, baixa], [_INSUFICIENTE, _ALTA, _BAIXA], _TRANSICAO)
+
+        # Média das barras válidas da janela, como `volume.mean()` sobre os candles buscados ao vivo
+        volume = pd.DataFrame(self.volume)
+        janela = volume.rolling(self.janela_volume, min_periods=1) if self.janela_volume else volume.expanding()
+        self.volume_medio = janela.mean().to_numpy()
+
+    def sinais(self, parametros=None):
+        """Código (índice em RECOMENDACOES) da recomendação em cada barra (tempo × moeda)"""
+        p = parametros or Parametros()
+        with np.errstate(invalid="ignore"):
+            rsi = np.select([self.rsi < p.rsi_baixo, self.rsi > p.rsi_alto], [_SOBREVENDIDO, _SOBRECOMPRADO], _NEUTRO)
+            volume = np.select(
+                [self.volume_medio == 0, self.volume >= self.volume_medio * p.volume_alto,
+                 self.volume <= self.volume_medio * p.volume_baixo],
+                [_INDEFINIDO, _SUBINDO, _CAINDO], _NORMAL,
+            )
+        alta, baixa, compra = self.tendencia == _ALTA, self.tendencia == _BAIXA, self.macd_compra
+        # Mesma ordem de if/elif de classificacao.obter_recomendacao
+        return np.select(
+            [
+                alta & (rsi == _SOBREVENDIDO) & (volume == _SUBINDO) & compra,
+                alta & (rsi == _NEUTRO) & (volume == _SUBINDO) & compra,
+                alta & (rsi == _SOBRECOMPRADO),
+                baixa & (rsi == _SOBREVENDIDO) & compra,
+                baixa & ((volume == _CAINDO) | ~compra),
+            ],
+            [1, 2, 3, 4, 5], 0,
+        ).astype(np.int8)
+
+    def serie_de_sinais(self, moeda, indice, parametros=None):
+        """Sinais de uma moeda como Series de rótulos alinhada ao índice dos candles"""
+        j = self.moedas.index(moeda)
+        codigos = self.sinais(parametros)[len(self.close) - len(indice):, j]
+        return pd.Series(np.array(RECOMENDACOES, dtype=object)[codigos], index=indice, name="sinal")
+
+
+def _posicoes(sinais, entradas, saidas):
+    """1 com posição comprada, 0 fora: entra nos sinais de entrada e sai nos de saída"""
+    codigo = {r: i for i, r in enumerate(RECOMENDACOES)}
+    evento = np.full(sinais.shape, np.nan)
+    evento[np.isin(sinais, [codigo[r] for r in saidas])] = 0.0
+    evento[np.isin(sinais, [codigo[r] for r in entradas])] = 1.0
+    return pd.DataFrame(evento).ffill().fillna(0.0).to_numpy()
+
+
+def simular(painel, parametros=None, entradas=ENTRADAS_PADRAO, saidas=SAIDAS_PADRAO, horizonte=HORIZONTE_PADRAO):
+    """Operações simuladas e estatísticas por moeda e por sinal.
+
+    O sinal é avaliado no fechamento da barra; a posição passa a render a
+    partir da barra seguinte e é encerrada no fechamento da barra de saída.
+    """
+    sinais = painel.sinais(parametros)
+    close = painel.close
+    posicao = _posicoes(sinais, entradas, saidas)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        retornos = np.nan_to_num(close[1:] / close[:-1] - 1)
+    curva = np.cumprod(1 + posicao[:-1] * retornos, axis=0)
+    drawdown = 1 - curva / np.maximum.accumulate(curva, axis=0)
+    mudancas = np.diff(posicao, axis=0, prepend=0.0)
+
+    moedas = []
+    for j, moeda in enumerate(painel.moedas):
+        valido = ~np.isnan(close[:, j])
+        inicio = int(np.argmax(valido))
+        abre = np.flatnonzero(mudancas[:, j] > 0)
+        fecha = np.flatnonzero(mudancas[:, j] < 0)
+        # Operação ainda aberta é encerrada na última barra
+        fecha = np.concatenate([fecha, np.full(len(abre) - len(fecha), len(close) - 1, dtype=fecha.dtype)])
+        operacoes = close[fecha, j] / close[abre, j] - 1
+        moedas.append({
+            "moeda": moeda,
+            "timeframe": painel.timeframe,
+            "operacoes": len(operacoes),
+            "taxa_acerto": float(np.mean(operacoes > 0)) if len(operacoes) else None,
+            "retorno_medio": float(np.mean(operacoes)) if len(operacoes) else None,
+            "retorno_estrategia": float(curva[-1, j] - 1) if len(curva) else 0.0,
+            "retorno_buy_hold": float(close[-1, j] / close[inicio, j] - 1),
+            "exposicao": float(posicao[inicio:, j].mean()),
+            "max_drawdown": float(drawdown[:, j].max()) if len(drawdown) else 0.0,
+        })
+
+    # Retorno `horizonte` barras depois de cada ocorrência de cada sinal
+    futuro = np.full(close.shape, np.nan)
+    if len(close) > horizonte:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            futuro[:-horizonte] = close[horizonte:] / close[:-horizonte] - 1
+    por_sinal = []
+    for codigo, rotulo in enumerate(RECOMENDACOES):
+        if rotulo not in DIRECAO:
+            continue
+        amostras = futuro[(sinais == codigo) & ~np.isnan(futuro)]
+        por_sinal.append({
+            "timeframe": painel.timeframe,
+            "sinal": rotulo,
+            "ocorrencias": len(amostras),
+            "retorno_futuro_medio": float(amostras.mean()) if len(amostras) else None,
+            "taxa_acerto": float(np.mean(np.sign(amostras) == DIRECAO[rotulo])) if len(amostras) else None,
+        })
+    return {"moedas": moedas, "sinais": por_sinal}
+
+
+def resumir(resultado):
+    """Agregado do universo: todas as operações juntas e médias por moeda"""
+    moedas = resultado["moedas"]
+    operacoes = sum(m["operacoes"] for m in moedas)
+    acertos = sum(m["taxa_acerto"] * m["operacoes"] for m in moedas if m["operacoes"])
+    return {
+        "operacoes": operacoes,
+        "taxa_acerto": acertos / operacoes if operacoes else None,
+        "retorno_estrategia_medio": float(np.mean([m["retorno_estrategia"] for m in moedas])) if moedas else None,
+        "retorno_buy_hold_medio": float(np.mean([m["retorno_buy_hold"] for m in moedas])) if moedas else None,
+        "max_drawdown_medio": float(np.mean([m["max_drawdown"] for m in moedas])) if moedas else None,
+    }
+
+
+# Painel do processo filho, recebido uma única vez pelo initializer do pool
+_painel_do_processo = None
+
+
+def _iniciar_processo(painel):
+    global _painel_do_processo
+    _painel_do_processo = painel
+
+
+def _avaliar(parametros, entradas, saidas, horizonte, painel=None):
+    resultado = simular(painel or _painel_do_processo, parametros, entradas, saidas, horizonte)
+    return {**parametros.para_dict(), **resumir(resultado)}
+
+
+def varrer_grade(painel, pontos, processos=None, entradas=ENTRADAS_PADRAO, saidas=SAIDAS_PADRAO,
+                 horizonte=HORIZONTE_PADRAO):
+    """Resumo de cada ponto da grade; com `processos` > 1 os pontos são divididos entre núcleos"""
+    processos = processos or os.cpu_count() or 1
+    if processos <= 1 or len(pontos) <= 1:
+        return [_avaliar(p, entradas, saidas, horizonte, painel) for p in pontos]
+    # O painel é enviado uma vez por processo, não uma vez por ponto da grade
+    with ProcessPoolExecutor(max_workers=min(processos, len(pontos)), initializer=_iniciar_processo,
+                             initargs=(painel,)) as executor:
+        return list(executor.map(_avaliar, pontos, itertools.repeat(entradas), itertools.repeat(saidas),
+                                 itertools.repeat(horizonte)))
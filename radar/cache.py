@@ -0,0 +1,421 @@
+"""Cache de dados de mercado compartilhado entre processos (réplicas e reinícios)"""
+import functools
+import logging
+import os
+import pickle
+import sqlite3
+import struct
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from radar import metricas
+from radar.candles import COLUNAS, frame_de_arrays
+
+logger = logging.getLogger(__name__)
+
+# "sqlite" (padrão, compartilhado pelo host), "memoria" (só o processo) ou "nenhum"
+BACKEND_PADRAO = os.environ.get("RADAR_CACHE", "sqlite")
+CAMINHO_PADRAO = os.environ.get("RADAR_CACHE_DB", os.path.join("dados", "cache.sqlite"))
+TAMANHO_MAXIMO = int(float(os.environ.get("RADAR_CACHE_MB", "256")) * 1024 * 1024)
+# Granularidade do instante de acesso do LRU em disco: leituras dentro dela não gravam nada
+INTERVALO_ACESSO = float(os.environ.get("RADAR_CACHE_ACESSO_S", "60"))
+
+# Cache de objetos vivos do processo (candles já como DataFrame)
+MEMORIA_MAXIMA = int(float(os.environ.get("RADAR_MEMORIA_MB", "512")) * 1024 * 1024)
+POLITICA_PADRAO = os.environ.get("RADAR_CACHE_POLITICA", "lru")  # "lru" ou "lfu"
+GUARDAR_FLOAT32 = os.environ.get("RADAR_CACHE_FLOAT32", "0") == "1"
+TOLERANCIA_FLOAT32 = 1e-6  # erro relativo máximo aceito ao converter para float32
+
+_CABECALHO = struct.Struct("<q")  # quantidade de candles
+
+
+def serializar(valor):
+    """(formato, bytes): candles OHLCV em binário cru, o resto com pickle"""
+    if isinstance(valor, pd.DataFrame) and list(valor.columns) == COLUNAS and isinstance(valor.index, pd.DatetimeIndex):
+        tempos = (valor.index - pd.Timestamp("1970-01-01")) // pd.Timedelta(seconds=1)
+        valores = np.asarray(valor.to_numpy(dtype=np.float64), order="F")
+        return "candles", b"".join([
+            _CABECALHO.pack(len(valor)),
+            np.asarray(tempos, dtype=np.int64).tobytes(),
+            valores.tobytes(order="F"),
+        ])
+    return "pickle", pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def desserializar(formato, dados):
+    if formato == "candles":
+        (n,) = _CABECALHO.unpack_from(dados)
+        # bytearray: arrays graváveis, como os de um DataFrame comum
+        buffer = bytearray(dados[_CABECALHO.size:])
+        tempos = np.frombuffer(buffer, dtype=np.int64, count=n)
+        valores = np.frombuffer(buffer, dtype=np.float64, offset=n * 8).reshape((n, len(COLUNAS)), order="F")
+        return frame_de_arrays(tempos, valores)
+    return pickle.loads(dados)
+
+
+class Entrada:
+    """Valor lido do cache e o instante (epoch) em que deixa de ser fresco"""
+
+    __slots__ = ("valor", "expira")
+
+    def __init__(self, valor, expira):
+        self.valor = valor
+        self.expira = expira
+
+    @property
+    def fresca(self):
+        return self.expira > time.time()
+
+
+class CacheNulo:
+    """Backend que não guarda nada (RADAR_CACHE=nenhum)"""
+
+    def obter(self, chave):
+        return None
+
+    def gravar(self, chave, valor, ttl, max_obsoleto=0):
+        pass
+
+
+class CacheMemoria:
+    """Backend local ao processo, com TTL e LRU por quantidade de bytes"""
+
+    def __init__(self, tamanho_maximo=TAMANHO_MAXIMO):
+        self.tamanho_maximo = tamanho_maximo
+        self._entradas = OrderedDict()  # chave -> (expira, descarte, formato, dados)
+        self._tamanho = 0
+        self._lock = threading.Lock()
+
+    def obter(self, chave):
+        """Entrada ainda dentro do limite de obsolescência, ou None"""
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                return None
+            if entrada[1] <= time.time():
+                self._remover(chave)
+                return None
+            self._entradas.move_to_end(chave)
+        return Entrada(desserializar(entrada[2], entrada[3]), entrada[0])
+
+    def gravar(self, chave, valor, ttl, max_obsoleto=0):
+        """Guarda por `ttl` segundos como fresco e mais `max_obsoleto` como obsoleto"""
+        formato, dados = serializar(valor)
+        expira = time.time() + ttl
+        with self._lock:
+            if chave in self._entradas:
+                self._remover(chave)
+            self._entradas[chave] = (expira, expira + max_obsoleto, formato, dados)
+            self._tamanho += len(dados)
+            while self._tamanho > self.tamanho_maximo and len(self._entradas) > 1:
+                self._remover(next(iter(self._entradas)))
+
+    def _remover(self, chave):
+        self._tamanho -= len(self._entradas.pop(chave)[3])
+
+
+# Incrementar ao mudar o esquema: o cache antigo é simplesmente descartado
+VERSAO_ESQUEMA = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    chave    TEXT    PRIMARY KEY,
+    formato  TEXT    NOT NULL,
+    dados    BLOB    NOT NULL,
+    tamanho  INTEGER NOT NULL,
+    expira   REAL    NOT NULL,
+    descarte REAL    NOT NULL,
+    acesso   REAL    NOT NULL
+)
+"""
+
+
+class CacheSQLite:
+    """Backend em arquivo SQLite (WAL), compartilhado por todos os processos do host.
+
+    Cada gravação é uma transação; quando o total passa de `tamanho_maximo`,
+    as entradas acessadas há mais tempo são removidas na mesma transação.
+    O instante de acesso só é atualizado quando tem mais de `intervalo_acesso`
+    segundos, para que leituras repetidas não virem escritas no arquivo.
+    """
+
+    def __init__(self, caminho=CAMINHO_PADRAO, tamanho_maximo=TAMANHO_MAXIMO, intervalo_acesso=INTERVALO_ACESSO):
+        self.caminho = caminho
+        self.tamanho_maximo = tamanho_maximo
+        self.intervalo_acesso = intervalo_acesso
+        pasta = os.path.dirname(caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        with self._conectar() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            if conn.execute("PRAGMA user_version").fetchone()[0] != VERSAO_ESQUEMA:
+                conn.execute("DROP TABLE IF EXISTS cache")
+                conn.execute(f"PRAGMA user_version = {VERSAO_ESQUEMA}")
+            conn.execute(_SCHEMA)
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_acesso ON cache (acesso)")
+
+    @contextmanager
+    def _conectar(self):
+        # Uma conexão por operação, como no armazém de candles
+        conn = sqlite3.connect(self.caminho, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def obter(self, chave):
+        """Entrada ainda dentro do limite de obsolescência, ou None"""
+        agora = time.time()
+        with self._conectar() as conn:
+            linha = conn.execute(
+                "SELECT formato, dados, expira, descarte, acesso FROM cache WHERE chave = ?", (chave,)
+            ).fetchone()
+            if linha is None:
+                return None
+            if linha[3] <= agora:
+                conn.execute("DELETE FROM cache WHERE chave = ?", (chave,))
+                return None
+            if agora - linha[4] >= self.intervalo_acesso:
+                conn.execute("UPDATE cache SET acesso = ? WHERE chave = ?", (agora, chave))
+        return Entrada(desserializar(linha[0], linha[1]), linha[2])
+
+    def gravar(self, chave, valor, ttl, max_obsoleto=0):
+        """Guarda por `ttl` segundos como fresco e mais `max_obsoleto` como obsoleto"""
+        formato, dados = serializar(valor)
+        agora = time.time()
+        with self._conectar() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (chave, formato, dados, tamanho, expira, descarte, acesso) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (chave, formato, sqlite3.Binary(dados), len(dados), agora + ttl, agora + ttl + max_obsoleto, agora),
+            )
+            conn.execute("DELETE FROM cache WHERE descarte <= ?", (agora,))
+            # LRU: mantém as entradas mais recentes cujo tamanho acumulado cabe no limite
+            conn.execute(
+                "DELETE FROM cache WHERE chave IN ("
+                " SELECT chave FROM (SELECT chave, SUM(tamanho) OVER (ORDER BY acesso DESC) AS acumulado FROM cache)"
+                " WHERE acumulado > ?)",
+                (self.tamanho_maximo,),
+            )
+
+
+def tamanho_em_bytes(valor):
+    """Bytes ocupados por um DataFrame (com o índice), array ou outro objeto"""
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(index=True, deep=True).sum())
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes
+    return len(pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def reduzir_precisao(df, tolerancia=TOLERANCIA_FLOAT32):
+    """Candles em float32 se o erro relativo ficar dentro da tolerância; senão o próprio df"""
+    if not isinstance(df, pd.DataFrame) or df.empty:
+        return df
+    valores = df.to_numpy(dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        reduzidos = valores.astype(np.float32)
+        erro = np.abs(reduzidos - valores) / np.abs(valores)
+    erro[valores == 0] = 0.0
+    if not np.isfinite(reduzidos[np.isfinite(valores)]).all() or np.nanmax(erro) > tolerancia:
+        return df
+    return pd.DataFrame(reduzidos, index=df.index, columns=df.columns, copy=False)
+
+
+class CacheLimitado:
+    """Objetos vivos do processo com orçamento global de memória, TTL e remoção LRU ou LFU.
+
+    O tamanho de cada valor é medido ao gravar; ao passar de `memoria_maxima`
+    saem as entradas usadas há mais tempo (LRU) ou com menos acessos (LFU).
+    """
+
+    def __init__(self, memoria_maxima=MEMORIA_MAXIMA, politica=POLITICA_PADRAO, float32=GUARDAR_FLOAT32):
+        if politica not in ("lru", "lfu"):
+            raise ValueError(f"política de cache desconhecida: {politica}")
+        self.memoria_maxima = memoria_maxima
+        self.politica = politica
+        self.float32 = float32
+        self._entradas = OrderedDict()  # chave -> [valor, tamanho, expira, acessos]
+        self._bytes = 0
+        self.acertos = self.falhas = self.remocoes = self.expirados = 0
+        self._lock = threading.Lock()
+
+    def obter(self, chave):
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is not None and entrada[2] <= time.time():
+                self._remover(chave)
+                self.expirados += 1
+                entrada = None
+            if entrada is None:
+                self.falhas += 1
+                return None
+            self.acertos += 1
+            entrada[3] += 1
+            self._entradas.move_to_end(chave)
+            return entrada[0]
+
+    def gravar(self, chave, valor, ttl):
+        if self.float32:
+            valor = reduzir_precisao(valor)
+        tamanho = tamanho_em_bytes(valor)
+        with self._lock:
+            if chave in self._entradas:
+                self._remover(chave)
+            if tamanho > self.memoria_maxima:
+                return valor # Maior que o orçamento inteiro: não é guardado
+            while self._entradas and self._bytes + tamanho > self.memoria_maxima:
+                self._remover(self._vitima())
+                self.remocoes += 1
+            self._entradas[chave] = [valor, tamanho, time.time() + ttl, 0]
+            self._bytes += tamanho
+        return valor
+
+    def _vitima(self):
+        if self.politica == "lru":
+            return next(iter(self._entradas))
+        # LFU: menos acessos; no empate, a usada há mais tempo (ordem do OrderedDict)
+        return min(self._entradas, key=lambda chave: self._entradas[chave][3])
+
+    def _remover(self, chave):
+        self._bytes -= self._entradas.pop(chave)[1]
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._bytes = 0
+
+    def estatisticas(self):
+        """Contadores de acertos, falhas, remoções e uso de memória"""
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "taxa_acerto": self.acertos / consultas if consultas else None,
+                "remocoes": self.remocoes,
+                "expirados": self.expirados,
+                "entradas": len(self._entradas),
+                "bytes": self._bytes,
+                "memoria_maxima": self.memoria_maxima,
+                "politica": self.politica,
+            }
+
+
+BACKENDS = {"sqlite": CacheSQLite, "memoria": CacheMemoria, "nenhum": CacheNulo}
+
+_cache_padrao = None
+_cache_lock = threading.Lock()
+
+
+def cache_padrao():
+    """Backend configurado em RADAR_CACHE, criado na primeira utilização"""
+    global _cache_padrao
+    with _cache_lock:
+        if _cache_padrao is None:
+            _cache_padrao = BACKENDS[BACKEND_PADRAO]()
+        return _cache_padrao
+
+
+def usar_cache(backend):
+    """Troca o backend padrão (benchmarks, testes) e devolve o anterior"""
+    global _cache_padrao
+    with _cache_lock:
+        anterior, _cache_padrao = _cache_padrao, backend
+        return anterior
+
+
+class VooUnico:
+    """Coalescência de chamadas: uma execução por chave, as demais aguardam o resultado"""
+
+    def __init__(self):
+        self._em_voo = {}
+        self._lock = threading.Lock()
+
+    def executar(self, chave, funcao):
+        """Executa `funcao` ou aguarda a execução já em andamento para a mesma chave"""
+        with self._lock:
+            futuro = self._em_voo.get(chave)
+            lider = futuro is None
+            if lider:
+                futuro = self._em_voo[chave] = Future()
+        if not lider:
+            return futuro.result()
+        try:
+            futuro.set_result(funcao())
+        except BaseException as e:
+            futuro.set_exception(e)
+        finally:
+            with self._lock:
+                del self._em_voo[chave]
+        return futuro.result()
+
+    def em_segundo_plano(self, chave, funcao):
+        """Dispara `funcao` em uma thread, a menos que a chave já esteja em voo"""
+        with self._lock:
+            if chave in self._em_voo:
+                return False
+
+        def revalidar():
+            try:
+                self.executar(chave, funcao)
+            except Exception as e:
+                logger.warning("Falha ao revalidar %s em segundo plano: %s", chave, e)
+
+        threading.Thread(target=revalidar, name=f"radar-revalidar-{chave}", daemon=True).start()
+        return True
+
+
+_voos = VooUnico()
+
+
+def compartilhado(ttl, chave, max_obsoleto=0):
+    """Memoriza a função no cache compartilhado.
+
+    `chave` recebe os mesmos argumentos da função e devolve a chave do cache
+    (ou None para não usar o cache nessa chamada). Chamadas simultâneas da
+    mesma chave executam a função uma única vez. Até `max_obsoleto` segundos
+    depois de vencido, o valor antigo é devolvido na hora e atualizado em
+    segundo plano (stale-while-revalidate). Falhas do backend apenas fazem a
+    função ser executada normalmente.
+    """
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            k = chave(*args, **kwargs)
+            if k is None:
+                return funcao(*args, **kwargs)
+            cache = cache_padrao()
+
+            def calcular():
+                valor = funcao(*args, **kwargs)
+                try:
+                    cache.gravar(k, valor, ttl, max_obsoleto)
+                except Exception as e:
+                    logger.warning("Cache indisponível ao gravar %s: %s", k, e)
+                return valor
+
+            try:
+                entrada = cache.obter(k)
+            except Exception as e:
+                logger.warning("Cache indisponível ao ler %s: %s", k, e)
+                entrada = None
+            if entrada is None:
+                metricas.contar("cache_compartilhado_falhas")
+                return _voos.executar(k, calcular)
+            if not entrada.fresca:
+                metricas.contar("cache_compartilhado_obsoletos")
+                _voos.em_segundo_plano(k, calcular)
+            else:
+                metricas.contar("cache_compartilhado_acertos")
+            return entrada.valor
+        envolvida.sem_cache = funcao
+        return envolvida
+    return decorador
@@ -0,0 +1,77 @@
+"""Conversão direta de candles (JSON da API ou linhas do SQLite) para arrays NumPy"""
+import logging
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+
+from radar.metricas import cronometrado
+
+logger = logging.getLogger(__name__)
+
+COLUNAS = ["open", "high", "low", "close", "volume"]
+# Campos lidos de cada candle da API, na ordem das colunas (volume em USD)
+CAMPOS_API = ("time", "open", "high", "low", "close", "volumeto")
+
+
+def frame_de_arrays(tempos, valores):
+    """DataFrame OHLCV sobre os próprios arrays (epoch int64 e bloco float64 n x 5).
+
+    `valores` em ordem Fortran vira o bloco interno do pandas sem cópia e com
+    cada coluna contígua.
+    """
+    indice = pd.DatetimeIndex((tempos * 1_000_000_000).view("datetime64[ns]"), name="time")
+    return pd.DataFrame(valores, index=indice, columns=COLUNAS, copy=False)
+
+
+def validar_tempos(tempos, intervalo=None):
+    """Máscara das linhas a manter: horários crescentes, sem duplicatas (vale a última).
+
+    Com `intervalo`, lacunas entre candles consecutivos são apenas registradas.
+    """
+    manter = np.ones(len(tempos), dtype=bool)
+    if len(tempos) < 2:
+        return manter
+    passos = np.diff(tempos)
+    if (passos <= 0).any():
+        # Fora de ordem ou repetido: fica a última ocorrência de cada horário
+        _, ultima = np.unique(tempos[::-1], return_index=True)
+        manter[:] = False
+        manter[len(tempos) - 1 - ultima] = True
+        passos = np.diff(np.sort(tempos[manter]))
+        logger.debug("Descartados %d candles repetidos", len(tempos) - manter.sum())
+    if intervalo is not None:
+        lacunas = int(np.count_nonzero(passos != intervalo))
+        if lacunas:
+            logger.debug("%d lacunas na série de candles (intervalo de %ds)", lacunas, intervalo)
+    return manter
+
+
+def candles_de_tuplas(linhas, intervalo=None):
+    """Tuplas (epoch, open, high, low, close, volume) -> DataFrame OHLCV em uma passada"""
+    linhas = list(linhas)
+    try:
+        # Strings numéricas viram float e None vira NaN, como no pd.to_numeric anterior
+        bruto = np.array(linhas, dtype=np.float64)
+    except (TypeError, ValueError):
+        # Algum valor malformado: só ele vira NaN (e a linha é descartada abaixo)
+        bruto = pd.DataFrame(linhas).apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+    bruto = bruto.reshape(-1, len(COLUNAS) + 1)
+    invalidas = np.isnan(bruto).any(axis=1)
+    if invalidas.any():
+        logger.debug("Descartados %d candles com valores inválidos", int(invalidas.sum()))
+        bruto = bruto[~invalidas]
+    tempos = bruto[:, 0].astype(np.int64)
+    manter = validar_tempos(tempos, intervalo)
+    if not manter.all():
+        ordem = np.argsort(tempos[manter], kind="stable")
+        tempos, bruto = tempos[manter][ordem], bruto[manter][ordem]
+    # Transposta de uma cópia C-contígua (6 x n): colunas OHLCV contíguas, sem outra cópia
+    colunas = np.ascontiguousarray(bruto.T)
+    return frame_de_arrays(tempos, colunas[1:].T)
+
+
+@cronometrado("parse")
+def candles_de_json(registros, intervalo=None):
+    """Lista de dicts da API -> DataFrame OHLCV, lendo só os campos usados"""
+    return candles_de_tuplas(map(itemgetter(*CAMPOS_API), registros), intervalo)
@@ -0,0 +1,68 @@
+"""Regras de classificação e recomendação dos indicadores"""
+
+
+def classificar_rsi(rsi):
+    """Classifica o valor do RSI"""
+    if rsi < 30: return "Sobrevendido"
+    elif rsi > 70: return "Sobrecomprado"
+    else: return "Neutro"
+
+
+def classificar_tendencia(ema_fast, ema_medium, ema_slow, ema_long):
+    """Classifica a tendência com base nas EMAs"""
+    # Verifica se todas as EMAs são válidas (não None)
+    if any(ema is None for ema in [ema_fast, ema_medium, ema_slow, ema_long]):
+        return "Dados insuficientes"
+    
+    if ema_fast > ema_medium > ema_slow > ema_long:
+        return "Alta consolidada"
+    elif ema_fast < ema_medium < ema_slow < ema_long:
+        return "Baixa consolidada"
+    return "Neutra/Transição"
+
+
+def classificar_volume(v_atual, v_medio):
+    """Compara volume atual com médio"""
+    if v_medio == 0: # Evita divisão por zero
+        return "Indefinido"
+    if v_atual >= v_medio * 1.2: # 20% acima da média
+        return "Subindo (Alto)"
+    elif v_atual <= v_medio * 0.8: # 20% abaixo da média
+        return "Caindo (Baixo)"
+    else:
+        return "Normal"
+
+
+def obter_recomendacao(tendencia, rsi_class, volume_class, macd_signal):
+    """Gera recomendação com base nos indicadores"""
+    rec_principal = "Aguardar"
+    rec_detalhe = "Condições atuais não indicam um ponto claro de entrada ou saída. Observe o mercado."
+
+    if tendencia == "Alta consolidada":
+        if rsi_class == "Sobrevendido" and "Subindo" in volume_class and macd_signal == "Compra":
+            rec_principal = "Compra Forte"
+            rec_detalhe = "Forte tendência de alta, ativo sobrevendido com volume crescente e sinal de compra MACD. Excelente oportunidade."
+        elif rsi_class == "Neutro" and "Subindo" in volume_class and macd_signal == "Compra":
+            rec_principal = "Compra"
+            rec_detalhe = "Tendência de alta confirmada, RSI neutro e sinal de compra MACD. Bom ponto de entrada."
+        elif rsi_class == "Sobrecomprado":
+            rec_principal = "Aguardar correção"
+            rec_detalhe = "Ativo sobrecomprado em tendência de alta. Risco de correção iminente. Aguarde um recuo para nova entrada."
+    elif tendencia == "Baixa consolidada":
+        if rsi_class == "Sobrevendido" and macd_signal == "Compra":
+            rec_principal = "Observar reversão"
+            rec_detalhe = "Ativo sobrevendido em tendência de baixa, com possível sinal de reversão. Monitore de perto para confirmação."
+        elif "Caindo" in volume_class or macd_signal == "Venda":
+            rec_principal = "Venda / Evitar"
+            rec_detalhe = "Tendência de baixa confirmada, volume em queda ou sinal de venda MACD. Evite posições ou considere vender."
+    
+    # Casos para "Aguardar" mais específicos
+    if rec_principal == "Aguardar":
+        if tendencia == "Neutra/Transição":
+            rec_detalhe = "O ativo está em fase de consolidação ou transição de tendência. Aguarde uma definição clara."
+        elif rsi_class == "Neutro" and "Normal" in volume_class and macd_signal == "Venda":
+            rec_detalhe = "RSI neutro, volume normal e sinal de venda MACD. Não há clareza para compra, aguarde."
+        elif rsi_class == "Neutro" and "Normal" in volume_class and macd_signal == "Compra":
+            rec_detalhe = "RSI neutro, volume normal e sinal de compra MACD. Aguarde mais confirmações para uma entrada segura."
+
+    return rec_principal, rec_detalhe
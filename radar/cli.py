@@ -0,0 +1,262 @@
+"""Linha de comando: screener e análise sem o Streamlit.
+
+Exemplos:
+    python -m radar screen --timeframe 4h --rsi Sobrevendido --formato csv --saida screen.csv
+    python -m radar screen --rapido
+    python -m radar analisar BTC --timeframe 1d
+    python -m radar backtest --timeframe 4h --rsi-baixo 25 30 35 --rsi-alto 65 70 75 --formato csv
+    python -m radar alertas BTC ETH SOL --timeframe 1h --sink log --sink arquivo:alertas.jsonl
+    python -m radar backfill --timeframe 1d --dias 1825
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+
+import pandas as pd
+
+from radar import metricas
+from radar.alertas import SINKS_PADRAO, MotorAlertas, acompanhar, criar_sinks
+from radar.analise import analisar_moeda
+from radar.backtest import HORIZONTE_PADRAO, PainelBacktest, grade, simular, varrer_grade
+from radar.armazenamento import CAMINHO_PADRAO, ArmazemCandles
+from radar.backfill import PROFUNDIDADE_DIAS, Backfill, carregar_intervalo
+from radar.coleta import MAX_WORKERS
+from radar.cotacoes import Cotacoes, aplicar_cotacoes, tabela_rapida
+from radar.dados import TAMANHO_UNIVERSO, baixar_cotacoes, baixar_universo, carregar_candles, extrair_simbolo, get_timeframe_endpoint
+from radar.paralelo import PROCESSOS, PoolScreener
+from radar.reamostragem import preparar_candles
+from radar.resultado import Falha, Resultado
+from radar.screener import coletar_candles, executar_screen
+
+TIMEFRAMES = ["1h", "4h", "1d", "1w"]
+FORMATOS = ["json", "csv", "parquet"]
+
+
+def _buscador(db):
+    armazem = ArmazemCandles(db)
+    return lambda simbolo, endpoint, limit: carregar_candles(simbolo, endpoint, limit, armazem)
+
+
+def _escrever(texto, saida):
+    if saida in (None, "-"):
+        sys.stdout.write(texto + "\n")
+    else:
+        with open(saida, "w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+
+
+def _json(dados):
+    return json.dumps(dados, ensure_ascii=False, indent=2, default=str)
+
+
+def comando_screen(args):
+    """Classifica o universo, aplica os filtros e grava o resultado"""
+    falhas = []
+    try:
+        moedas, cotacoes = baixar_universo(args.limite)
+    except Exception as e:
+        falhas.append(Falha("top/mktcapfull", "busca", e))
+        moedas, cotacoes = [], Cotacoes([], [], [], [])
+
+    if args.rapido:
+        # Só as cotações do próprio payload do universo, sem histórico por moeda
+        resultado = Resultado(tabela_rapida(moedas, cotacoes, args.timeframe))
+    else:
+        filtros = {"trend": args.tendencia, "rsi": args.rsi, "volume": args.volume, "recommendation": args.recomendacao}
+        pool = PoolScreener(args.processos) if args.processos > 0 else None
+        try:
+            resultado = executar_screen(moedas, args.timeframe, _buscador(args.db), max_workers=args.workers,
+                                        filters=filtros, pool=pool)
+        finally:
+            if pool is not None:
+                pool.encerrar()
+    falhas += resultado.falhas
+    tabela = aplicar_cotacoes(resultado.valor, cotacoes)
+
+    if args.formato == "json":
+        _escrever(_json({
+            "timeframe": args.timeframe,
+            "gerado_em": time.time(),
+            "linhas": tabela.linhas(),
+            "falhas": [f.para_dict() for f in falhas],
+        }), args.saida)
+    else:
+        df = tabela.para_dataframe()
+        if args.formato == "csv":
+            _escrever(df.to_csv(index=False).rstrip("\n"), args.saida)
+        else:
+            if args.saida in (None, "-"):
+                raise SystemExit("--saida é obrigatório para o formato parquet")
+            df.to_parquet(args.saida, index=False) # Requer pyarrow ou fastparquet
+        for falha in falhas:
+            print(_json(falha.para_dict()), file=sys.stderr)
+    # Falha apenas quando nenhuma moeda pôde ser processada
+    return 1 if not moedas or len(resultado.falhas) == len(moedas) else 0
+
+
+def comando_analisar(args):
+    """Análise individual de uma moeda em JSON"""
+    resultado = analisar_moeda(args.simbolo.upper(), args.timeframe, _buscador(args.db))
+    _escrever(_json({
+        "ok": resultado.ok,
+        "analise": resultado.valor,
+        "falhas": [f.para_dict() for f in resultado.falhas],
+    }), args.saida)
+    return 0 if resultado.ok else 1
+
+
+def _buscador_profundo(db, dias):
+    """Como `_buscador`, mas com `dias` de histórico vindos do backfill no armazém"""
+    armazem = ArmazemCandles(db)
+    inicio = time.time() - dias * 86400
+    return lambda simbolo, endpoint, limit: carregar_intervalo(simbolo, endpoint, inicio, armazem=armazem)
+
+
+def comando_backtest(args):
+    """Backtest das recomendações sobre o histórico do universo, para cada ponto da grade de limiares"""
+    moedas, _ = baixar_universo(args.limite)
+    buscar = _buscador_profundo(args.db, args.dias) if args.dias else _buscador(args.db)
+    candles, falhas = coletar_candles(moedas, args.timeframe, buscar, max_workers=args.workers)
+    if not candles:
+        for falha in falhas:
+            print(_json(falha.para_dict()), file=sys.stderr)
+        return 1
+    painel = PainelBacktest(candles, args.timeframe)
+    pontos = grade(args.rsi_baixo, args.rsi_alto, args.volume_alto, args.volume_baixo)
+    linhas = varrer_grade(painel, pontos, args.processos, horizonte=args.horizonte)
+    linhas = [{"timeframe": args.timeframe, "moedas": len(candles), **linha} for linha in linhas]
+
+    if args.formato == "json":
+        dados = {"timeframe": args.timeframe, "gerado_em": time.time(), "grade": linhas,
+                 "falhas": [f.para_dict() for f in falhas]}
+        if len(pontos) == 1:
+            # Com um único ponto, inclui o detalhe por moeda e por sinal
+            dados.update(simular(painel, pontos[0], horizonte=args.horizonte))
+        _escrever(_json(dados), args.saida)
+    else:
+        _escrever(pd.DataFrame(linhas).to_csv(index=False).rstrip("\n"), args.saida)
+    return 0
+
+
+def comando_alertas(args):
+    """Acompanha a watchlist e entrega as mudanças de classificação aos sinks"""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    buscar = _buscador(args.db)
+    endpoint, limit = get_timeframe_endpoint(args.timeframe)
+    motor = MotorAlertas(criar_sinks(",".join(args.sink or [SINKS_PADRAO])))
+
+    def buscar_candles(simbolo, timeframe):
+        return preparar_candles(buscar(simbolo, endpoint, limit), timeframe, simbolo=simbolo)
+
+    simbolos = [s.upper() for s in args.simbolos]
+    try:
+        # O snapshot de cotações em lote decide quais moedas precisam de candles a cada volta
+        acompanhar(motor, simbolos, args.timeframe, buscar_candles, args.intervalo, buscar_cotacoes=baixar_cotacoes)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def comando_backfill(args):
+    """Completa o armazém com `--dias` de histórico das moedas pedidas (ou do universo)"""
+    endpoint, _ = get_timeframe_endpoint(args.timeframe)
+    simbolos = [s.upper() for s in args.simbolos] or [extrair_simbolo(m) for m in baixar_universo(args.limite)[0]]
+    backfill = Backfill(ArmazemCandles(args.db), max_workers=args.workers)
+    inicio = time.time() - args.dias * 86400
+    gravados = backfill.preencher(
+        simbolos, endpoint, inicio,
+        ao_progredir=lambda feitos, total: print(f"\r{feitos}/{total} páginas", end="", file=sys.stderr),
+    )
+    print(file=sys.stderr)
+    armazem = backfill.armazem
+    _escrever(_json({
+        "endpoint": endpoint,
+        "moedas": {
+            s: {"gravados": n, "primeiro": armazem.primeiro_timestamp(s, endpoint),
+                "ultimo": armazem.ultimo_timestamp(s, endpoint),
+                "inicio_do_historico": armazem.inicio_do_historico(s, endpoint)}
+            for s, n in gravados.items()
+        },
+    }), args.saida)
+    return 0
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(prog="radar", description="Crypto Analyst Pro sem interface")
+    parser.add_argument("--db", default=CAMINHO_PADRAO, help="arquivo SQLite do armazém de candles")
+    parser.add_argument("--metricas", help="grava tempos por etapa ao final (.prom para Prometheus, .jsonl para JSON lines)")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    screen = sub.add_parser("screen", help="classifica e filtra o universo de moedas")
+    screen.add_argument("--timeframe", choices=TIMEFRAMES, default="1d")
+    screen.add_argument("--limite", type=int, default=TAMANHO_UNIVERSO,
+                        help="quantidade de moedas do universo (páginas de 100)")
+    screen.add_argument("--workers", type=int, default=MAX_WORKERS)
+    screen.add_argument("--processos", type=int, default=PROCESSOS,
+                        help="processos para classificar o universo (0 = só threads)")
+    screen.add_argument("--tendencia", action="append", default=[],
+                        choices=["Alta consolidada", "Baixa consolidada", "Neutra/Transição"])
+    screen.add_argument("--rsi", action="append", default=[], choices=["Sobrevendido", "Neutro", "Sobrecomprado"])
+    screen.add_argument("--volume", action="append", default=[], choices=["Subindo (Alto)", "Normal", "Caindo (Baixo)"])
+    screen.add_argument("--recomendacao", action="append", default=[],
+                        choices=["Compra Forte", "Compra", "Aguardar correção", "Venda / Evitar", "Observar reversão", "Aguardar"])
+    screen.add_argument("--rapido", action="store_true",
+                        help="apenas preço e variação de 24h, sem indicadores nem histórico")
+    screen.add_argument("--formato", choices=FORMATOS, default="json")
+    screen.add_argument("--saida", help="arquivo de saída (padrão: stdout)")
+    screen.set_defaults(func=comando_screen)
+
+    analisar = sub.add_parser("analisar", help="análise individual de uma moeda")
+    analisar.add_argument("simbolo")
+    analisar.add_argument("--timeframe", choices=TIMEFRAMES, default="1d")
+    analisar.add_argument("--saida", help="arquivo de saída (padrão: stdout)")
+    analisar.set_defaults(func=comando_analisar)
+
+    backtest = sub.add_parser("backtest", help="desempenho histórico das recomendações (grade de limiares)")
+    backtest.add_argument("--timeframe", choices=TIMEFRAMES, default="1d")
+    backtest.add_argument("--limite", type=int, default=TAMANHO_UNIVERSO)
+    backtest.add_argument("--workers", type=int, default=MAX_WORKERS)
+    backtest.add_argument("--processos", type=int, default=None,
+                          help="processos para varrer a grade (padrão: um por núcleo)")
+    backtest.add_argument("--rsi-baixo", type=float, nargs="+", default=[30])
+    backtest.add_argument("--rsi-alto", type=float, nargs="+", default=[70])
+    backtest.add_argument("--volume-alto", type=float, nargs="+", default=[1.2])
+    backtest.add_argument("--volume-baixo", type=float, nargs="+", default=[0.8])
+    backtest.add_argument("--horizonte", type=int, default=HORIZONTE_PADRAO,
+                          help="barras para medir o retorno depois de cada sinal")
+    backtest.add_argument("--dias", type=int, default=0,
+                          help="histórico profundo (backfill no armazém) em vez da janela padrão do timeframe")
+    backtest.add_argument("--formato", choices=["json", "csv"], default="json")
+    backtest.add_argument("--saida", help="arquivo de saída (padrão: stdout)")
+    backtest.set_defaults(func=comando_backtest)
+
+    alertas = sub.add_parser("alertas", help="avisa quando a classificação de moedas da watchlist muda")
+    alertas.add_argument("simbolos", nargs="+")
+    alertas.add_argument("--timeframe", choices=TIMEFRAMES, default="1h")
+    alertas.add_argument("--intervalo", type=float, default=60.0, help="segundos entre verificações")
+    alertas.add_argument("--sink", action="append",
+                         help="log, arquivo:CAMINHO ou webhook:URL (repetível; padrão: RADAR_ALERTAS ou log)")
+    alertas.set_defaults(func=comando_alertas)
+
+    backfill = sub.add_parser("backfill", help="baixa histórico profundo para o armazém local")
+    backfill.add_argument("simbolos", nargs="*", help="padrão: o universo do screener")
+    backfill.add_argument("--timeframe", choices=TIMEFRAMES, default="1d")
+    backfill.add_argument("--dias", type=int, default=PROFUNDIDADE_DIAS)
+    backfill.add_argument("--limite", type=int, default=TAMANHO_UNIVERSO)
+    backfill.add_argument("--workers", type=int, default=MAX_WORKERS)
+    backfill.add_argument("--saida", help="arquivo de saída (padrão: stdout)")
+    backfill.set_defaults(func=comando_backfill)
+    return parser
+
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    if args.metricas:
+        metricas.ativar()
+    try:
+        return args.func(args)
+    finally:
+        if args.metricas:
+            metricas.gravar(args.metricas)
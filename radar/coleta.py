@@ -0,0 +1,71 @@
+"""Coleta concorrente de dados com limite de taxa"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Limites padrão (podem ser sobrescritos por variáveis de ambiente).
+# A CryptoCompare limita as chaves gratuitas por segundo/minuto; 20 req/s fica
+# abaixo da cota por segundo com folga.
+MAX_WORKERS = int(os.environ.get("RADAR_MAX_WORKERS", "8"))
+REQUISICOES_POR_SEGUNDO = float(os.environ.get("RADAR_REQ_POR_SEGUNDO", "20"))
+RAJADA_MAXIMA = int(os.environ.get("RADAR_RAJADA_MAXIMA", "20"))
+
+
+class LimitadorTaxa:
+    """Token bucket thread-safe para respeitar a cota da API"""
+
+    def __init__(self, taxa=REQUISICOES_POR_SEGUNDO, capacidade=RAJADA_MAXIMA):
+        if taxa <= 0 or capacidade < 1:
+            raise ValueError("taxa e capacidade devem ser positivas")
+        self.taxa = float(taxa)
+        self.capacidade = float(capacidade)
+        self._tokens = float(capacidade)
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _repor(self):
+        agora = time.monotonic()
+        self._tokens = min(self.capacidade, self._tokens + (agora - self._ultimo) * self.taxa)
+        self._ultimo = agora
+
+    def adquirir(self, tokens=1):
+        """Bloqueia até haver tokens disponíveis"""
+        while True:
+            with self._lock:
+                self._repor()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                espera = (tokens - self._tokens) / self.taxa
+            time.sleep(espera)
+
+
+def buscar_concorrente(itens, funcao, max_workers=MAX_WORKERS, ao_progredir=None):
+    """Aplica `funcao` a cada item em um pool de threads limitado.
+
+    Retorna os resultados na mesma ordem de `itens`. `ao_progredir(feitos, total)`
+    é chamado na thread de quem chamou, permitindo atualizar a UI. Com um único
+    item ou `max_workers` <= 1, tudo roda na própria thread, sem criar um pool
+    (chamadas de dentro de outro pool não multiplicam as threads).
+    """
+    itens = list(itens)
+    total = len(itens)
+    resultados = [None] * total
+    if total == 0:
+        return resultados
+
+    if total == 1 or max_workers <= 1:
+        for feitos, item in enumerate(itens, start=1):
+            resultados[feitos - 1] = funcao(item)
+            if ao_progredir is not None:
+                ao_progredir(feitos, total)
+        return resultados
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, total))) as executor:
+        futuros = {executor.submit(funcao, item): i for i, item in enumerate(itens)}
+        for feitos, futuro in enumerate(as_completed(futuros), start=1):
+            resultados[futuros[futuro]] = futuro.result()
+            if ao_progredir is not None:
+                ao_progredir(feitos, total)
+    return resultados
@@ -0,0 +1,123 @@
+"""Cotações em lote (preço, variação e volume de 24h) do universo de moedas"""
+import time
+
+import numpy as np
+
+from radar.resultados import COLUNAS, NUMERICAS, TabelaResultados
+
+# Limite de caracteres do parâmetro `fsyms` do pricemultifull
+MAX_CARACTERES_FSYMS = 300
+SEM_INDICADOR = "—"
+
+
+def lotes_de_simbolos(simbolos, max_caracteres=MAX_CARACTERES_FSYMS):
+    """Divide os símbolos em lotes cuja lista separada por vírgulas cabe no limite"""
+    lote, tamanho = [], 0
+    for simbolo in simbolos:
+        extra = len(simbolo) + (1 if lote else 0)
+        if lote and tamanho + extra > max_caracteres:
+            yield lote
+            lote, tamanho = [], 0
+            extra = len(simbolo)
+        lote.append(simbolo)
+        tamanho += extra
+    if lote:
+        yield lote
+
+
+class Cotacoes:
+    """Última cotação de cada símbolo, em colunas NumPy"""
+
+    __slots__ = ("gerado_em", "simbolos", "preco", "variacao", "volume", "_posicao")
+
+    def __init__(self, simbolos, preco, variacao, volume, gerado_em=None):
+        self.gerado_em = time.time() if gerado_em is None else gerado_em
+        self.simbolos = np.array(simbolos, dtype=object)
+        self.preco = np.asarray(preco, dtype=np.float64)
+        self.variacao = np.asarray(variacao, dtype=np.float64)
+        self.volume = np.asarray(volume, dtype=np.float64)
+        self._posicao = {simbolo: i for i, simbolo in enumerate(self.simbolos)}
+
+    @classmethod
+    def de_registros(cls, registros, gerado_em=None):
+        """Monta a partir de pares (símbolo, bloco RAW em USD); blocos vazios são ignorados"""
+        linhas = [
+            (simbolo, bruto.get("PRICE", np.nan), bruto.get("CHANGEPCT24HOUR", np.nan),
+             bruto.get("TOTALVOLUME24HTO", np.nan))
+            for simbolo, bruto in registros if bruto
+        ]
+        return cls(*(zip(*linhas) if linhas else ([], [], [], [])), gerado_em=gerado_em)
+
+    @classmethod
+    def de_mktcapfull(cls, data, gerado_em=None):
+        """Cotações embutidas na lista `Data` do top/mktcapfull"""
+        return cls.de_registros(
+            ((c["CoinInfo"]["Name"], c.get("RAW", {}).get("USD")) for c in data), gerado_em
+        )
+
+    @classmethod
+    def de_pricemultifull(cls, payload, gerado_em=None):
+        """Cotações da resposta do pricemultifull (campo RAW)"""
+        return cls.de_registros(
+            ((simbolo, moedas.get("USD")) for simbolo, moedas in payload.get("RAW", {}).items()), gerado_em
+        )
+
+    def __len__(self):
+        return len(self.simbolos)
+
+    def __contains__(self, simbolo):
+        return simbolo in self._posicao
+
+    def obter(self, simbolo):
+        """(preço, variação %, volume) de um símbolo, ou None"""
+        i = self._posicao.get(simbolo)
+        if i is None:
+            return None
+        return self.preco[i].item(), self.variacao[i].item(), self.volume[i].item()
+
+    def alinhar(self, simbolos):
+        """Preço e variação na ordem de `simbolos` (NaN onde não há cotação)"""
+        indices = np.array([self._posicao.get(s, -1) for s in simbolos], dtype=np.intp)
+        achou = indices >= 0
+        preco = np.full(len(indices), np.nan)
+        variacao = np.full(len(indices), np.nan)
+        preco[achou] = self.preco[indices[achou]]
+        variacao[achou] = self.variacao[indices[achou]]
+        return preco, variacao
+
+    def combinar(self, novas):
+        """Cotações atualizadas com `novas`, mantendo os símbolos que ficaram de fora"""
+        antigos = [i for i, s in enumerate(self.simbolos) if s not in novas]
+        return Cotacoes(
+            np.concatenate([self.simbolos[antigos], novas.simbolos]),
+            np.concatenate([self.preco[antigos], novas.preco]),
+            np.concatenate([self.variacao[antigos], novas.variacao]),
+            np.concatenate([self.volume[antigos], novas.volume]),
+            gerado_em=novas.gerado_em,
+        )
+
+
+def aplicar_cotacoes(tabela, cotacoes):
+    """Substitui Preço e Variação da tabela pelas cotações em lote, quando existirem"""
+    preco, variacao = cotacoes.alinhar(tabela["Símbolo"])
+    colunas = dict(tabela.colunas)
+    colunas["Preço"] = np.where(np.isnan(preco), tabela["Preço"], preco)
+    colunas["Variação"] = np.where(np.isnan(variacao), tabela["Variação"], variacao)
+    return TabelaResultados(tabela.timeframe, colunas)
+
+
+def tabela_rapida(moedas, cotacoes, timeframe=None):
+    """Varredura rápida: só preço e variação de 24h, sem baixar histórico"""
+    from radar.dados import extrair_simbolo # Importação tardia: dados monta as cotações deste módulo
+
+    moedas = [m for m in moedas if extrair_simbolo(m) in cotacoes]
+    simbolos = [extrair_simbolo(m) for m in moedas]
+    preco, variacao = cotacoes.alinhar(simbolos)
+    colunas = {}
+    for nome in COLUNAS:
+        tipo = np.float64 if nome in NUMERICAS else object
+        colunas[nome] = np.full(len(moedas), np.nan if nome in NUMERICAS else SEM_INDICADOR, dtype=tipo)
+    colunas["Moeda"] = np.array(moedas, dtype=object)
+    colunas["Símbolo"] = np.array(simbolos, dtype=object)
+    colunas["Preço"], colunas["Variação"] = preco, variacao
+    return TabelaResultados(timeframe, colunas)
@@ -0,0 +1,149 @@
+"""Acesso aos dados de mercado da CryptoCompare"""
+import hashlib
+import logging
+import os
+import time
+
+from radar.cache import compartilhado
+from radar.candles import candles_de_json
+from radar.coleta import buscar_concorrente
+from radar.cotacoes import Cotacoes, lotes_de_simbolos
+from radar.transporte import cliente_padrao
+
+logger = logging.getLogger(__name__)
+
+# URLs configuráveis para apontar para um servidor local em testes
+API_BASE = os.environ.get("RADAR_API_BASE", "https://min-api.cryptocompare.com/data")
+FNG_URL = os.environ.get("RADAR_FNG_URL", "https://api.alternative.me/fng/")
+
+# Duração de cada candle por endpoint, em segundos
+INTERVALOS = {"histominute": 60, "histohour": 3600, "histoday": 86400}
+
+MOEDAS_PADRAO = ["Bitcoin (BTC)", "Ethereum (ETH)", "Binance Coin (BNB)"]
+
+# Moedas no universo do screener; o mktcapfull devolve no máximo 100 por página
+TAMANHO_UNIVERSO = int(os.environ.get("RADAR_UNIVERSO", "100"))
+MOEDAS_POR_PAGINA = 100
+
+# Validade (s) das respostas no cache compartilhado entre processos
+TTL_CANDLES = int(os.environ.get("RADAR_TTL_CANDLES", "600"))
+TTL_UNIVERSO = int(os.environ.get("RADAR_TTL_UNIVERSO", "3600"))
+TTL_COTACOES = int(os.environ.get("RADAR_TTL_COTACOES", "60"))
+TTL_FEAR_GREED = int(os.environ.get("RADAR_TTL_FEAR_GREED", "1800"))
+# Depois do TTL o valor ainda é servido (e atualizado em segundo plano) por até:
+OBSOLETO_CANDLES = int(os.environ.get("RADAR_OBSOLETO_CANDLES", "1800"))
+OBSOLETO_UNIVERSO = int(os.environ.get("RADAR_OBSOLETO_UNIVERSO", "86400"))
+OBSOLETO_FEAR_GREED = int(os.environ.get("RADAR_OBSOLETO_FEAR_GREED", "3600"))
+
+
+# Barras base lidas para os timeframes derivados (4h, 1w, 1M): com 2000 horas o
+# 4h teria só 500 candles, e o 1w pouco mais de 100 (sem aquecer a EMA 200)
+BARRAS_DERIVADOS = int(os.environ.get("RADAR_BARRAS_DERIVADOS", "4000"))
+
+
+def get_timeframe_endpoint(timeframe):
+    """Mapeia timeframe para endpoint da API"""
+    if timeframe == "1h":
+        return "histohour", 2000
+    elif timeframe == "4h":
+        return "histohour", BARRAS_DERIVADOS
+    elif timeframe in ["1w", "1M"]:
+        # O mesmo tamanho nos dois: compartilham a série base na CacheReamostragem
+        return "histoday", BARRAS_DERIVADOS
+    else:
+        return "histoday", 730
+
+
+def extrair_simbolo(moeda_str):
+    """Extrai o símbolo da criptomoeda"""
+    return moeda_str.split("(")[-1].replace(")", "").strip()
+
+
+@compartilhado(TTL_UNIVERSO, lambda limit=TAMANHO_UNIVERSO, cliente=None: f"universo:{int(limit)}",
+               max_obsoleto=OBSOLETO_UNIVERSO)
+def baixar_universo(limit=TAMANHO_UNIVERSO, cliente=None):
+    """Principais moedas em ordem alfabética e as cotações que vêm no mesmo payload"""
+    cliente = cliente or cliente_padrao()
+    paginas = range(-(-limit // MOEDAS_POR_PAGINA))
+    respostas = buscar_concorrente(paginas, lambda pagina: cliente.obter_json(
+        f"{API_BASE}/top/mktcapfull", {"limit": min(limit, MOEDAS_POR_PAGINA), "page": pagina, "tsym": "USD"}
+    )["Data"], max_workers=4)
+    # O ranking pode mudar entre as páginas: cada moeda fica só na primeira posição
+    data, vistos = [], set()
+    for c in (c for pagina in respostas for c in pagina):
+        if c["CoinInfo"]["Name"] not in vistos:
+            vistos.add(c["CoinInfo"]["Name"])
+            data.append(c)
+    data = data[:limit]
+    moedas = sorted([f"{c['CoinInfo']['FullName']} ({c['CoinInfo']['Name']})" for c in data])
+    return moedas, Cotacoes.de_mktcapfull(data)
+
+
+def baixar_top_moedas(limit=TAMANHO_UNIVERSO, cliente=None):
+    """Lista as principais criptomoedas por capitalização, em ordem alfabética"""
+    return baixar_universo(limit, cliente)[0]
+
+
+def _chave_cotacoes(simbolos, cliente=None):
+    return "cotacoes:" + hashlib.sha1(",".join(sorted(simbolos)).encode()).hexdigest()
+
+
+@compartilhado(TTL_COTACOES, _chave_cotacoes)
+def baixar_cotacoes(simbolos, cliente=None):
+    """Cotações atuais de vários símbolos com uma chamada ao pricemultifull por lote"""
+    cliente = cliente or cliente_padrao()
+    cotacoes = Cotacoes([], [], [], [])
+    for lote in lotes_de_simbolos(simbolos):
+        payload = cliente.obter_json(f"{API_BASE}/pricemultifull", {"fsyms": ",".join(lote), "tsyms": "USD"})
+        if payload.get("Response") == "Error":
+            raise ValueError(payload.get("Message", "resposta de erro da API"))
+        cotacoes = cotacoes.combinar(Cotacoes.de_pricemultifull(payload))
+    return cotacoes
+
+
+def baixar_historico(simbolo, endpoint="histoday", limit=200, to_ts=None, cliente=None):
+    """Baixa candles da API (limit + 1 barras terminando em `to_ts`)"""
+    params = {"fsym": simbolo, "tsym": "USD", "limit": int(limit)}
+    if to_ts is not None:
+        params["toTs"] = int(to_ts)
+    cliente = cliente or cliente_padrao()
+    payload = cliente.obter_json(f"{API_BASE}/v2/{endpoint}", params)
+    if payload.get("Response") == "Error":
+        raise ValueError(payload.get("Message", "resposta de erro da API"))
+    return candles_de_json(payload["Data"]["Data"], INTERVALOS.get(endpoint))
+
+
+@compartilhado(TTL_FEAR_GREED, lambda cliente=None: "fear_greed", max_obsoleto=OBSOLETO_FEAR_GREED)
+def baixar_fear_greed(cliente=None):
+    """Valor atual (0-100) do índice de Medo e Ganância"""
+    cliente = cliente or cliente_padrao()
+    return int(cliente.obter_json(FNG_URL, {"limit": 1})["data"][0]["value"])
+
+
+@compartilhado(TTL_CANDLES, lambda simbolo, endpoint, limit, armazem, agora=None, cliente=None:
+              f"candles:{simbolo}:{endpoint}:{int(limit)}" if agora is None else None,
+              max_obsoleto=OBSOLETO_CANDLES)
+def carregar_candles(simbolo, endpoint, limit, armazem, agora=None, cliente=None):
+    """Completa no armazém a janela das últimas `limit` + 1 barras e a devolve lida de lá.
+
+    O backfill busca só o que falta: o último candle (que pode ter fechado
+    desde então) e os mais novos, lacunas deixadas por períodos sem
+    atualização e, para janelas maiores que uma página da API, as páginas
+    mais antigas. As páginas são buscadas em sequência, na thread de quem
+    chama (o screener já busca várias moedas em paralelo).
+    """
+    from radar.backfill import Backfill  # Importação tardia: o backfill usa este módulo
+
+    intervalo = INTERVALOS[endpoint]
+    agora = time.time() if agora is None else agora
+    inicio = (int(agora) // intervalo - int(limit)) * intervalo
+    backfill = Backfill(armazem, max_workers=1, cliente=cliente)
+    backfill.preencher([simbolo], endpoint, inicio, agora, atualizar_ultimo=True)
+    candles = armazem.intervalo(simbolo, endpoint, inicio)
+    falha = backfill.falhas.get(simbolo)
+    if falha is not None:
+        if candles.empty:
+            raise falha
+        # Fonte indisponível: os candles já armazenados são a última versão boa
+        logger.warning("Usando candles armazenados de %s (%s): %s", simbolo, endpoint, falha)
+    return candles
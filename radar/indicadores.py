@@ -0,0 +1,160 @@
+"""Indicadores completos por moeda, calculados uma vez e reaproveitados"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from radar.metricas import cronometrado
+from radar.painel import PERIODOS_EMA, ema_painel, macd_painel, montar_painel, rsi_painel
+from radar.streaming import EstadoIndicadores
+
+# Acima disso o recálculo vetorizado é mais barato que avançar candle a candle
+MAX_CANDLES_INCREMENTAIS = 50
+
+
+class Indicadores:
+    """Séries de EMA, RSI e MACD alinhadas ao índice dos candles"""
+
+    def __init__(self, indice, emas, rsi, macd, macd_signal, macd_diff):
+        serie = lambda valores, nome: pd.Series(valores, index=indice, name=nome)
+        # EMA sem dados suficientes fica None, como na análise original
+        self.emas = {p: serie(v, f"ema_{p}") if len(v) >= p else None for p, v in emas.items()}
+        self.rsi = serie(rsi, "rsi")
+        self.macd = serie(macd, "macd")
+        self.macd_signal = serie(macd_signal, "macd_signal")
+        self.macd_diff = serie(macd_diff, "macd_diff")
+
+    @classmethod
+    def de_painel(cls, painel, simbolo, indice):
+        """Extrai as séries de uma moeda de um PainelIndicadores já calculado"""
+        col = lambda valores: painel.serie(simbolo, valores)
+        return cls(
+            indice, {p: col(painel.emas[p]) for p in PERIODOS_EMA}, col(painel.rsi),
+            col(painel.macd), col(painel.macd_signal), col(painel.macd_diff),
+        )
+
+    def ultimos_emas(self):
+        """Último valor de cada EMA, no formato {'ema_8': ..., ...}"""
+        return {f"ema_{p}": None if s is None else s.iloc[-1] for p, s in self.emas.items()}
+
+    def ultimos(self):
+        """Valores do último candle no formato de PainelIndicadores.ultimos"""
+        valores = self.ultimos_emas()
+        valores.update(
+            rsi=self.rsi.iloc[-1], macd=self.macd.iloc[-1],
+            macd_signal=self.macd_signal.iloc[-1], macd_diff=self.macd_diff.iloc[-1],
+        )
+        return valores
+
+    def estender(self, indice, novos):
+        """Descarta a última barra (revisada em `novos`) e anexa os valores novos"""
+        def juntar(serie, chave):
+            antigos = np.full(len(self.rsi), np.nan) if serie is None else serie.to_numpy()
+            return np.concatenate([antigos[:-1], [v[chave] for v in novos]])
+        return Indicadores(
+            indice,
+            {p: juntar(s, f"ema_{p}") for p, s in self.emas.items()},
+            juntar(self.rsi, "rsi"), juntar(self.macd, "macd"),
+            juntar(self.macd_signal, "macd_signal"), juntar(self.macd_diff, "macd_diff"),
+        )
+
+
+@cronometrado("indicadores")
+def calcular_indicadores(df):
+    """Calcula todas as séries de indicadores para um DataFrame de candles"""
+    close = montar_painel([df["close"]])
+    macd, macd_signal, macd_diff = macd_painel(close)
+    return Indicadores(
+        df.index, {p: ema_painel(close, p)[:, 0] for p in PERIODOS_EMA}, rsi_painel(close)[:, 0],
+        macd[:, 0], macd_signal[:, 0], macd_diff[:, 0],
+    )
+
+
+def _versao(df):
+    # O último candle pode estar em formação: seu fechamento também invalida
+    return df.index[-1], float(df["close"].iloc[-1]), len(df)
+
+
+class _Entrada:
+    __slots__ = ("versao", "indicadores", "closes", "estado")
+
+    def __init__(self, versao, indicadores, closes, estado=None):
+        self.versao, self.indicadores, self.closes, self.estado = versao, indicadores, closes, estado
+
+
+def _encaixe(entrada, df):
+    """Posição em `df` do último candle da entrada, se `df` só acrescenta candles a ela; senão None.
+
+    Se o início da janela andou (janela deslizante), os indicadores do
+    recálculo começam mais tarde que os do estado avançado e as EMAs longas
+    divergem; nesse caso a entrada não é aproveitada.
+    """
+    indice_antigo = entrada.indicadores.rsi.index
+    pos = df.index.get_indexer([indice_antigo[-1]])[0]
+    if pos != len(indice_antigo) - 1 or len(df) - pos > MAX_CANDLES_INCREMENTAIS:
+        return None
+    if not df.index[:pos].equals(indice_antigo[:-1]):
+        return None
+    return pos
+
+
+class CacheIndicadores:
+    """Memoização por (símbolo, timeframe) válida enquanto o último candle não mudar.
+
+    Quando chegam candles novos ao fim do mesmo histórico, a entrada é
+    avançada com EstadoIndicadores (O(1) por candle) em vez de recalcular
+    tudo. Uma janela que perdeu barras do início é recalculada, para que o
+    resultado seja sempre o do recálculo completo.
+    """
+
+    def __init__(self):
+        self._entradas = {}
+        self._lock = threading.Lock()
+
+    def obter(self, simbolo, timeframe, df):
+        """Retorna os indicadores em cache (avançados se preciso) ou calcula e guarda"""
+        indicadores = self.atualizado(simbolo, timeframe, df)
+        if indicadores is None:
+            indicadores = calcular_indicadores(df)
+            self.registrar(simbolo, timeframe, df, indicadores)
+        return indicadores
+
+    def atualizado(self, simbolo, timeframe, df):
+        """Indicadores em cache para `df` sem recálculo completo, ou None"""
+        chave, versao = (simbolo, timeframe), _versao(df)
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                return None
+            if entrada.versao == versao:
+                return entrada.indicadores
+            return self._avancar(chave, entrada, df, versao)
+
+    def disponivel(self, simbolo, timeframe, df):
+        """Se `atualizado` serviria `df` do cache, sem avançar nem alterar a entrada"""
+        chave, versao = (simbolo, timeframe), _versao(df)
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            return entrada is not None and (entrada.versao == versao or _encaixe(entrada, df) is not None)
+
+    def _avancar(self, chave, entrada, df, versao):
+        pos = _encaixe(entrada, df)
+        if pos is None:
+            return None
+
+        if entrada.estado is None:
+            entrada.estado = EstadoIndicadores.a_partir_de(entrada.closes)
+        estado = entrada.estado
+        closes = df["close"].to_numpy(dtype=np.float64)
+        # O candle que era o último pode ter fechado com outro preço
+        novos = [estado.revisar(closes[pos])] + [estado.avancar(x) for x in closes[pos + 1:]]
+
+        indicadores = entrada.indicadores.estender(df.index, novos)
+        self._entradas[chave] = _Entrada(versao, indicadores, closes, estado)
+        return indicadores
+
+    def registrar(self, simbolo, timeframe, df, indicadores):
+        """Guarda indicadores já calculados (por exemplo, pelo painel do screener)"""
+        entrada = _Entrada(_versao(df), indicadores, df["close"].to_numpy(dtype=np.float64))
+        with self._lock:
+            self._entradas[(simbolo, timeframe)] = entrada
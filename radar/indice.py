@@ -0,0 +1,149 @@
+"""Índice invertido da classificação: valor de cada filtro -> bitmap de moedas.
+
+Cada moeda ocupa um bit fixo; cada par (filtro, valor), como ("rsi",
+"Sobrevendido"), guarda um inteiro com os bits das moedas naquela classe.
+Uma combinação de filtros é um OR dentro de cada filtro e um AND entre eles,
+e as contagens por categoria são `bit_count` dos mesmos inteiros.
+"""
+import threading
+
+from radar.resultados import COLUNA_DO_FILTRO, COLUNAS, TabelaResultados
+
+_POSICAO_COLUNA = {chave: COLUNAS.index(coluna) for chave, coluna in COLUNA_DO_FILTRO.items()}
+
+
+def _bits(mascara):
+    """Posições dos bits ligados, em ordem crescente"""
+    posicoes = []
+    while mascara:
+        menor = mascara & -mascara
+        posicoes.append(menor.bit_length() - 1)
+        mascara ^= menor
+    return posicoes
+
+
+class IndiceClassificacao:
+    """Bitmaps por categoria de um timeframe, atualizados moeda a moeda"""
+
+    def __init__(self, timeframe):
+        self.timeframe = timeframe
+        self._posicao = {}  # moeda -> bit
+        self._linhas = []   # bit -> tupla na ordem de resultados.COLUNAS (None se livre)
+        self._livres = []
+        self._ordem = {}    # moeda -> posição na última tabela sincronizada
+        self._ativos = 0
+        self._bitmaps = {chave: {} for chave in COLUNA_DO_FILTRO}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def de_tabela(cls, tabela):
+        indice = cls(tabela.timeframe)
+        indice.sincronizar(tabela)
+        return indice
+
+    def copiar(self):
+        """Cópia independente (os bitmaps são inteiros imutáveis; só os contêineres são copiados)"""
+        novo = IndiceClassificacao(self.timeframe)
+        with self._lock:
+            novo._posicao = dict(self._posicao)
+            novo._linhas = list(self._linhas)
+            novo._livres = list(self._livres)
+            novo._ordem = dict(self._ordem)
+            novo._ativos = self._ativos
+            novo._bitmaps = {chave: dict(bitmaps) for chave, bitmaps in self._bitmaps.items()}
+        return novo
+
+    def __len__(self):
+        return len(self._posicao)
+
+    def atualizar(self, linha):
+        """Inclui ou reclassifica uma moeda; só os bitmaps das classes que mudaram são tocados"""
+        with self._lock:
+            self._atualizar(linha)
+
+    def remover(self, moeda):
+        with self._lock:
+            self._remover(moeda)
+
+    def sincronizar(self, tabela):
+        """Aplica uma tabela completa: atualiza as moedas presentes e remove as que saíram.
+
+        A troca inteira acontece sob o lock: leitores veem a tabela anterior ou
+        a nova, nunca uma mistura das duas.
+        """
+        linhas = list(zip(*(tabela[nome].tolist() for nome in COLUNAS)))
+        presentes = {linha[0] for linha in linhas}
+        with self._lock:
+            for moeda in [m for m in self._posicao if m not in presentes]:
+                self._remover(moeda)
+            self._ordem = {linha[0]: i for i, linha in enumerate(linhas)}
+            for linha in linhas:
+                self._atualizar(linha)
+
+    def _atualizar(self, linha):
+        moeda = linha[0]
+        self._ordem.setdefault(moeda, len(self._ordem))
+        bit = self._posicao.get(moeda)
+        if bit is None:
+            bit = self._livres.pop() if self._livres else len(self._linhas)
+            if bit == len(self._linhas):
+                self._linhas.append(None)
+            self._posicao[moeda] = bit
+            self._ativos |= 1 << bit
+        anterior = self._linhas[bit]
+        for chave, i in _POSICAO_COLUNA.items():
+            if anterior is not None and anterior[i] == linha[i]:
+                continue
+            if anterior is not None:
+                self._bitmaps[chave][anterior[i]] &= ~(1 << bit)
+            bitmaps = self._bitmaps[chave]
+            bitmaps[linha[i]] = bitmaps.get(linha[i], 0) | 1 << bit
+        self._linhas[bit] = tuple(linha)
+
+    def _remover(self, moeda):
+        bit = self._posicao.pop(moeda, None)
+        if bit is None:
+            return
+        self._ordem.pop(moeda, None)
+        linha = self._linhas[bit]
+        for chave, i in _POSICAO_COLUNA.items():
+            self._bitmaps[chave][linha[i]] &= ~(1 << bit)
+        self._linhas[bit] = None
+        self._ativos &= ~(1 << bit)
+        self._livres.append(bit)
+
+    def _mascara(self, filters, ignorar=None):
+        mascara = self._ativos
+        for chave, bitmaps in self._bitmaps.items():
+            valores = filters.get(chave) if filters else None
+            if chave == ignorar or not valores:
+                continue
+            selecionados = 0
+            for valor in valores:
+                selecionados |= bitmaps.get(valor, 0)
+            mascara &= selecionados
+        return mascara
+
+    def _aprovadas(self, filters):
+        linhas = [self._linhas[bit] for bit in _bits(self._mascara(filters))]
+        return sorted(linhas, key=lambda linha: self._ordem[linha[0]])
+
+    def consultar(self, filters):
+        """Moedas que atendem aos filtros, na ordem da tabela sincronizada"""
+        with self._lock:
+            return [linha[0] for linha in self._aprovadas(filters)]
+
+    def selecionar(self, filters):
+        """TabelaResultados com as linhas aprovadas (mesmo resultado de `TabelaResultados.filtrar`)"""
+        with self._lock:
+            linhas = self._aprovadas(filters)
+        return TabelaResultados.de_tuplas(self.timeframe, linhas)
+
+    def contagens(self, filters=None):
+        """{filtro: {valor: moedas}} considerando as seleções dos demais filtros"""
+        with self._lock:
+            return {
+                chave: {valor: (bitmap & base).bit_count() for valor, bitmap in bitmaps.items()}
+                for chave, bitmaps in self._bitmaps.items()
+                for base in (self._mascara(filters, ignorar=chave),)
+            }
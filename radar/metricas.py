@@ -0,0 +1,131 @@
+"""Instrumentação leve: tempo por etapa e contadores, exportáveis para Prometheus ou JSON lines"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+import numpy as np
+
+# Desligada por padrão; pode ser ligada em tempo de execução com `ativar()`
+ATIVAS = os.environ.get("RADAR_METRICAS", "0") == "1"
+# Arquivo (.prom ou .jsonl) gravado pelo trabalhador a cada rodada, se definido
+ARQUIVO_PADRAO = os.environ.get("RADAR_METRICAS_ARQUIVO")
+JANELA = 1000  # durações recentes guardadas por etapa
+
+_NULO = nullcontext()
+_lock = threading.Lock()
+_duracoes = {}  # etapa -> deque de segundos
+_totais = {}    # etapa -> [quantidade, soma em segundos]
+_contadores = {}
+
+
+def ativar(ligar=True):
+    global ATIVAS
+    ATIVAS = bool(ligar)
+
+
+def limpar():
+    with _lock:
+        _duracoes.clear()
+        _totais.clear()
+        _contadores.clear()
+
+
+def registrar(etapa, segundos):
+    with _lock:
+        if etapa not in _duracoes:
+            _duracoes[etapa] = deque(maxlen=JANELA)
+            _totais[etapa] = [0, 0.0]
+        _duracoes[etapa].append(segundos)
+        _totais[etapa][0] += 1
+        _totais[etapa][1] += segundos
+
+
+@contextmanager
+def _medir(etapa):
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar(etapa, time.perf_counter() - inicio)
+
+
+def cronometrar(etapa):
+    """Context manager que mede a etapa; desligado, devolve um contexto nulo compartilhado"""
+    return _medir(etapa) if ATIVAS else _NULO
+
+
+def cronometrado(etapa):
+    """Decorador equivalente a `cronometrar` em volta da função inteira"""
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            if not ATIVAS:
+                return funcao(*args, **kwargs)
+            with _medir(etapa):
+                return funcao(*args, **kwargs)
+        return envolvida
+    return decorador
+
+
+def contar(nome, quantidade=1):
+    if ATIVAS:
+        with _lock:
+            _contadores[nome] = _contadores.get(nome, 0) + quantidade
+
+
+def resumo():
+    """{'etapas': {etapa: n, total/p50/p95/max em ms}, 'contadores': {...}}"""
+    with _lock:
+        etapas = {etapa: (np.array(d) * 1000, *_totais[etapa]) for etapa, d in _duracoes.items()}
+        contadores = dict(_contadores)
+    return {
+        "etapas": {
+            etapa: {
+                "n": n,
+                "total_ms": soma * 1000,
+                "p50_ms": float(np.percentile(ms, 50)),
+                "p95_ms": float(np.percentile(ms, 95)),
+                "max_ms": float(ms.max()),
+            }
+            for etapa, (ms, n, soma) in sorted(etapas.items())
+        },
+        "contadores": dict(sorted(contadores.items())),
+    }
+
+
+def exportar_prometheus():
+    """Texto no formato de exposição do Prometheus (summary por etapa e contadores)"""
+    dados = resumo()
+    linhas = ["# TYPE radar_etapa_segundos summary"]
+    for etapa, m in dados["etapas"].items():
+        rotulo = f'etapa="{etapa}"'
+        linhas += [
+            f'radar_etapa_segundos{{{rotulo},quantile="0.5"}} {m["p50_ms"] / 1000:.6f}',
+            f'radar_etapa_segundos{{{rotulo},quantile="0.95"}} {m["p95_ms"] / 1000:.6f}',
+            f"radar_etapa_segundos_sum{{{rotulo}}} {m['total_ms'] / 1000:.6f}",
+            f"radar_etapa_segundos_count{{{rotulo}}} {m['n']}",
+        ]
+    linhas.append("# TYPE radar_eventos_total counter")
+    linhas += [f'radar_eventos_total{{nome="{nome}"}} {valor}' for nome, valor in dados["contadores"].items()]
+    return "\n".join(linhas) + "\n"
+
+
+def exportar_jsonl():
+    """Uma linha JSON com o instante e o resumo atual"""
+    return json.dumps({"instante": time.time(), **resumo()}, ensure_ascii=False) + "\n"
+
+
+def gravar(caminho):
+    """Prometheus (.prom, sobrescreve, para o textfile collector) ou JSON lines (acrescenta)"""
+    if caminho.endswith(".jsonl"):
+        with open(caminho, "a", encoding="utf-8") as f:
+            f.write(exportar_jsonl())
+    else:
+        temporario = caminho + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            f.write(exportar_prometheus())
+        os.replace(temporario, caminho) # Leitores nunca veem o arquivo pela metade
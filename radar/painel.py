@@ -0,0 +1,85 @@
+"""Cálculo vetorizado de indicadores para vários símbolos de uma vez"""
+import numpy as np
+import pandas as pd
+
+PERIODOS_EMA = (8, 21, 50, 200)
+JANELA_RSI = 14
+MACD_RAPIDA, MACD_LENTA, MACD_SINAL = 12, 26, 9
+
+
+def montar_painel(series):
+    """Alinha as séries pelo último candle em um array (tempo × símbolo).
+
+    Cada coluna mantém a sequência própria do símbolo e é completada com NaN à
+    esquerda, o que reproduz exatamente o cálculo individual da biblioteca `ta`.
+    """
+    colunas = [np.asarray(s, dtype=np.float64) for s in series]
+    linhas = max((len(c) for c in colunas), default=0)
+    painel = np.full((linhas, len(colunas)), np.nan)
+    for j, valores in enumerate(colunas):
+        if len(valores):
+            painel[linhas - len(valores):, j] = valores
+    return painel
+
+
+def _ewm(painel, **kwargs):
+    # NaN à esquerda não altera a média: ela começa na primeira observação válida
+    return pd.DataFrame(painel).ewm(adjust=False, **kwargs).mean().to_numpy()
+
+
+def ema_painel(painel, periodo):
+    """EMA de cada coluna (equivale a ta.trend.EMAIndicator)"""
+    return _ewm(painel, span=periodo, min_periods=periodo)
+
+
+def rsi_painel(painel, janela=JANELA_RSI):
+    """RSI de Wilder de cada coluna (equivale a ta.momentum.RSIIndicator)"""
+    diff = np.diff(painel, axis=0, prepend=np.nan)
+    with np.errstate(invalid="ignore"):
+        alta = np.where(diff > 0, diff, 0.0)
+        baixa = np.where(diff < 0, -diff, 0.0)
+    # Antes do primeiro candle de cada símbolo não há observação
+    sem_dados = np.isnan(painel)
+    alta[sem_dados] = np.nan
+    baixa[sem_dados] = np.nan
+    media_alta = _ewm(alta, alpha=1 / janela, min_periods=janela)
+    media_baixa = _ewm(baixa, alpha=1 / janela, min_periods=janela)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(media_baixa == 0, 100.0, 100 - 100 / (1 + media_alta / media_baixa))
+
+
+def macd_painel(painel, rapida=MACD_RAPIDA, lenta=MACD_LENTA, sinal=MACD_SINAL):
+    """Linha MACD, linha de sinal e histograma de cada coluna"""
+    linha = ema_painel(painel, rapida) - ema_painel(painel, lenta)
+    linha_sinal = ema_painel(linha, sinal)
+    return linha, linha_sinal, linha - linha_sinal
+
+
+class PainelIndicadores:
+    """Indicadores de todo o universo calculados em uma única passada"""
+
+    def __init__(self, closes):
+        self.simbolos = list(closes)
+        self._coluna = {s: j for j, s in enumerate(self.simbolos)}
+        self.tamanhos = [len(c) for c in closes.values()]
+        self.close = montar_painel(closes.values())
+        self.emas = {p: ema_painel(self.close, p) for p in PERIODOS_EMA}
+        self.rsi = rsi_painel(self.close)
+        self.macd, self.macd_signal, self.macd_diff = macd_painel(self.close)
+
+    def serie(self, simbolo, valores):
+        """Recorta a coluna de um símbolo no tamanho original da série"""
+        return valores[len(valores) - self.tamanhos[self._coluna[simbolo]]:, self._coluna[simbolo]]
+
+    def ultimos(self, simbolo):
+        """Valores do último candle; EMAs sem dados suficientes viram None"""
+        j = self._coluna[simbolo]
+        valores = {f"ema_{p}": self.emas[p][-1, j] for p in PERIODOS_EMA}
+        valores = {k: None if np.isnan(v) else float(v) for k, v in valores.items()}
+        valores.update(
+            rsi=float(self.rsi[-1, j]),
+            macd=float(self.macd[-1, j]),
+            macd_signal=float(self.macd_signal[-1, j]),
+            macd_diff=float(self.macd_diff[-1, j]),
+        )
+        return valores
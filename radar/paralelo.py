@@ -0,0 +1,110 @@
+"""Classificação do universo em vários processos com candles em memória compartilhada"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from radar.metricas import cronometrado
+from radar.painel import PainelIndicadores
+from radar.resultados import TabelaResultados
+from radar.screener import classificar_ultimos
+
+# 0 desativa o modo multiprocesso (o screener roda nas threads do próprio processo)
+PROCESSOS = int(os.environ.get("RADAR_PROCESSOS", "0"))
+# Lotes por processo: mais lotes equilibram melhor moedas com histórico desigual
+LOTES_POR_PROCESSO = 4
+
+
+class PainelCompartilhado:
+    """Closes e volumes de todas as moedas concatenados em um bloco de memória compartilhada.
+
+    Os processos recebem só o nome do bloco e os deslocamentos de cada moeda;
+    nenhum DataFrame é serializado.
+    """
+
+    def __init__(self, candles):
+        self.moedas = list(candles)
+        self.tamanhos = np.array([len(df) for df in candles.values()], dtype=np.int64)
+        self.inicios = np.concatenate([[0], np.cumsum(self.tamanhos)[:-1]]).astype(np.int64)
+        total = int(self.tamanhos.sum())
+        self.total = total
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, 2 * total * 8))
+        dados = np.ndarray((2, total), dtype=np.float64, buffer=self._shm.buf)
+        for inicio, df in zip(self.inicios, candles.values()):
+            dados[0, inicio:inicio + len(df)] = df["close"].to_numpy()
+            dados[1, inicio:inicio + len(df)] = df["volume"].to_numpy()
+        del dados
+
+    @property
+    def nome(self):
+        return self._shm.name
+
+    def lotes(self, quantidade):
+        """Índices das moedas em lotes de tamanho parecido (histórico semelhante junto)"""
+        ordem = np.argsort(self.tamanhos, kind="stable")
+        return [lote.tolist() for lote in np.array_split(ordem, max(1, min(quantidade, len(ordem)))) if len(lote)]
+
+    def tarefa(self, lote):
+        """Argumentos (pequenos e serializáveis) de um lote para `classificar_lote`"""
+        return (self.nome, self.total, [self.moedas[i] for i in lote],
+                self.inicios[lote].tolist(), self.tamanhos[lote].tolist())
+
+    def fechar(self):
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+def classificar_lote(nome, total, moedas, inicios, tamanhos):
+    """Executado no processo filho: lê os arrays compartilhados e devolve só tuplas"""
+    shm = shared_memory.SharedMemory(name=nome)
+    try:
+        dados = np.ndarray((2, total), dtype=np.float64, buffer=shm.buf)
+        closes = {m: dados[0, i:i + n] for m, i, n in zip(moedas, inicios, tamanhos)}
+        volumes = {m: dados[1, i:i + n] for m, i, n in zip(moedas, inicios, tamanhos)}
+        painel = PainelIndicadores(closes) # Copia os closes para o painel do lote
+        linhas = [classificar_ultimos(m, closes[m], volumes[m], painel.ultimos(m)) for m in moedas]
+        del dados, closes, volumes # Nenhuma view pode sobreviver ao close()
+        return linhas
+    finally:
+        shm.close()
+
+
+class PoolScreener:
+    """Pool de processos persistente para classificar universos grandes"""
+
+    def __init__(self, processos=None):
+        self.processos = processos or os.cpu_count() or 1
+        self._executor = None
+
+    def _pool(self):
+        if self._executor is None:
+            # "spawn": o pool é criado de dentro de processos com threads (Streamlit, trabalhador),
+            # e um fork copiaria locks que podem estar presos por outra thread
+            self._executor = ProcessPoolExecutor(max_workers=self.processos,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    @cronometrado("pool")
+    def classificar(self, candles, timeframe):
+        """Mesmo resultado de screener.classificar_universo, dividido entre os processos"""
+        if not candles:
+            return TabelaResultados.de_tuplas(timeframe, [])
+        with PainelCompartilhado(candles) as painel:
+            tarefas = [painel.tarefa(lote) for lote in painel.lotes(self.processos * LOTES_POR_PROCESSO)]
+            futuros = [self._pool().submit(classificar_lote, *t) for t in tarefas]
+            por_moeda = {linha[0]: linha for futuro in futuros for linha in futuro.result()}
+        # Mantém a ordem de entrada do universo
+        return TabelaResultados.de_tuplas(timeframe, [por_moeda[m] for m in candles])
+
+    def encerrar(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
@@ -0,0 +1,69 @@
+"""Planejador de filtros do screener: avalia primeiro os predicados baratos"""
+import numpy as np
+
+from radar.classificacao import classificar_rsi, classificar_tendencia, classificar_volume
+from radar.dados import extrair_simbolo
+from radar.metricas import cronometrado
+from radar.painel import PERIODOS_EMA, ema_painel, montar_painel, rsi_painel
+from radar.screener import classificar_universo
+
+# Custo relativo de cada filtro: volume usa só médias, RSI duas EMAs de Wilder
+# e a tendência quatro EMAs. A recomendação depende de tudo (inclusive MACD) e
+# por isso só é avaliada nas moedas que sobreviverem às demais etapas.
+CUSTOS = {"volume": 1, "rsi": 2, "trend": 4}
+
+# Fração típica do universo em cada categoria, usada apenas para ordenar etapas
+FRACAO_ESTIMADA = {
+    "Subindo (Alto)": 0.25, "Normal": 0.5, "Caindo (Baixo)": 0.25, "Indefinido": 0.01,
+    "Sobrevendido": 0.1, "Neutro": 0.8, "Sobrecomprado": 0.1,
+    "Alta consolidada": 0.2, "Baixa consolidada": 0.3, "Neutra/Transição": 0.45, "Dados insuficientes": 0.05,
+}
+
+
+def planejar(filters):
+    """Etapas de filtro em ordem crescente de custo por moeda descartada"""
+    etapas = []
+    for chave, custo in CUSTOS.items():
+        if filters.get(chave):
+            passa = min(sum(FRACAO_ESTIMADA.get(v, 0.5) for v in filters[chave]), 0.99)
+            etapas.append((custo / (1 - passa), chave))
+    return [chave for _, chave in sorted(etapas)]
+
+
+@cronometrado("planejador")
+def _classificar_etapa(etapa, moedas, candles, painel, coluna):
+    if etapa == "volume":
+        return [classificar_volume(candles[m]['volume'].iloc[-1], candles[m]['volume'].mean()) for m in moedas]
+    closes = painel[:, [coluna[m] for m in moedas]]
+    if etapa == "rsi":
+        return [classificar_rsi(rsi) for rsi in rsi_painel(closes)[-1]]
+    ultimos = np.column_stack([ema_painel(closes, p)[-1] for p in PERIODOS_EMA])
+    return [classificar_tendencia(*(None if np.isnan(v) else v for v in linha)) for linha in ultimos]
+
+
+def filtrar_com_plano(candles, timeframe, filters, cache_indicadores=None):
+    """Classifica e filtra o universo descartando moedas o quanto antes.
+
+    O resultado é idêntico a classificar tudo e filtrar no final.
+    """
+    plano = planejar(filters)
+    em_cache = set()
+    if cache_indicadores is not None:
+        # Moedas já em cache saem quase de graça; o plano vale para as demais. A consulta
+        # não avança as entradas: isso acontece uma vez só, na classificação final
+        em_cache = {m for m, df in candles.items()
+                    if cache_indicadores.disponivel(extrair_simbolo(m), timeframe, df)}
+
+    vivas = [m for m in candles if m not in em_cache]
+    if plano and vivas:
+        painel = montar_painel([candles[m]['close'] for m in vivas])
+        coluna = {m: j for j, m in enumerate(vivas)}
+        for etapa in plano:
+            classes = _classificar_etapa(etapa, vivas, candles, painel, coluna)
+            vivas = [m for m, classe in zip(vivas, classes) if classe in filters[etapa]]
+            if not vivas:
+                break
+
+    sobreviventes = em_cache.union(vivas)
+    selecionadas = {m: df for m, df in candles.items() if m in sobreviventes}
+    return classificar_universo(selecionadas, timeframe, cache_indicadores).filtrar(filters)
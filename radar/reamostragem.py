@@ -0,0 +1,168 @@
+"""Reamostragem de candles para timeframes maiores"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from radar.metricas import cronometrar
+
+MIN_CANDLES = 50  # Mínimo de dados para indicadores
+
+# Série base de onde cada timeframe derivado é agregado
+BASE_DO_TIMEFRAME = {"4h": "histohour", "1d": "histoday", "1w": "histoday", "1M": "histoday"}
+DERIVADOS = ("4h", "1w", "1M")  # Timeframes que não vêm prontos da API
+
+_DURACOES = {"1h": 3600, "4h": 4 * 3600, "1d": 86400}
+_SEMANA = 7 * 86400
+_SEGUNDA = 4 * 86400  # 1970-01-01 foi quinta-feira; a semana começa na segunda (UTC)
+_COLUNAS = ("open", "high", "low", "close", "volume")
+
+
+def epoch_segundos(indice):
+    """Converte um DatetimeIndex para epoch em segundos (int64)"""
+    return np.asarray((indice - pd.Timestamp("1970-01-01")) // pd.Timedelta(seconds=1), dtype=np.int64)
+
+
+def inicio_dos_buckets(tempos, timeframe):
+    """Início (epoch s) do bucket de cada candle base"""
+    if timeframe in _DURACOES:
+        duracao = _DURACOES[timeframe]
+        return tempos // duracao * duracao
+    if timeframe == "1w":
+        return (tempos - _SEGUNDA) // _SEMANA * _SEMANA + _SEGUNDA
+    if timeframe == "1M":
+        meses = tempos.astype("datetime64[s]").astype("datetime64[M]")
+        return meses.astype("datetime64[s]").astype(np.int64)
+    raise ValueError(f"timeframe sem regra de reamostragem: {timeframe}")
+
+
+def _agregar(buckets, base):
+    """Agrega arrays base (open, high, low, close, volume) por bucket contíguo"""
+    if len(buckets) == 0:
+        return buckets, tuple(np.empty(0) for _ in _COLUNAS)
+    inicios = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    fins = np.r_[inicios[1:], len(buckets)] - 1
+    abertura, maxima, minima, fechamento, volume = base
+    return buckets[inicios], (
+        abertura[inicios],
+        np.maximum.reduceat(maxima, inicios),
+        np.minimum.reduceat(minima, inicios),
+        fechamento[fins],
+        np.add.reduceat(volume, inicios),
+    )
+
+
+def _frame(tempos, colunas):
+    indice = pd.DatetimeIndex(pd.to_datetime(tempos, unit="s"), name="time")
+    return pd.DataFrame(dict(zip(_COLUNAS, colunas)), index=indice)
+
+
+def reamostrar(df, timeframe):
+    """Agrega candles base no timeframe pedido (sem estado)"""
+    if df.empty:
+        return pd.DataFrame()
+    base = tuple(df[col].to_numpy(dtype=np.float64) for col in _COLUNAS)
+    validos = ~np.isnan(np.column_stack(base)).any(axis=1)
+    tempos = epoch_segundos(df.index)[validos]
+    buckets, colunas = _agregar(inicio_dos_buckets(tempos, timeframe), tuple(c[validos] for c in base))
+    return _frame(buckets, colunas)
+
+
+def agrupar_4h_otimizado(df_horas):
+    """Agrupa dados de 1h em 4h"""
+    # Buckets alinhados ao início do dia UTC, como resample('4h', origin='start_day')
+    return reamostrar(df_horas, "4h")
+
+
+class SerieBase:
+    """Série base de uma moeda com os timeframes derivados em cache.
+
+    Os buckets de cada candle base são calculados uma vez; ao receber candles
+    novos só o primeiro bucket (se a janela deslizou) e os buckets a partir do
+    primeiro candle alterado — normalmente apenas o último, ainda aberto — são
+    reagregados.
+    """
+
+    def __init__(self, df):
+        self._definir(df)
+        self._derivadas = {}
+
+    def _definir(self, df):
+        self.versao = (df.index[-1], float(df["close"].iloc[-1]), len(df))
+        self.tempos = epoch_segundos(df.index)
+        self.base = tuple(df[col].to_numpy(dtype=np.float64) for col in _COLUNAS)
+
+    def derivar(self, timeframe):
+        """DataFrame do timeframe derivado (compartilhado: não modificar)"""
+        if timeframe not in self._derivadas:
+            buckets = inicio_dos_buckets(self.tempos, timeframe)
+            agregados = _agregar(buckets, self.base)
+            self._derivadas[timeframe] = (buckets, agregados, _frame(*agregados))
+        return self._derivadas[timeframe][2]
+
+    def atualizar(self, df):
+        """Incorpora a nova janela de candles; False se ela não continuar esta série"""
+        tempos = epoch_segundos(df.index)
+        descartados = np.searchsorted(self.tempos, tempos[0])
+        alterado = np.searchsorted(tempos, self.tempos[-1])
+        if (descartados >= len(self.tempos) or alterado >= len(tempos)
+                or not np.array_equal(self.tempos[descartados:-1], tempos[:alterado])):
+            return False
+
+        derivadas = self._derivadas
+        self._definir(df)
+        self._derivadas = {}
+        for timeframe, (buckets_antigos, (tempos_agg, colunas_agg), _) in derivadas.items():
+            # Só os candles novos têm o bucket calculado
+            buckets = np.concatenate([
+                buckets_antigos[descartados:len(buckets_antigos) - 1],
+                inicio_dos_buckets(tempos[alterado:], timeframe),
+            ])
+            primeiro, mudou = buckets[0], buckets[alterado]
+            fim_primeiro = np.searchsorted(buckets, primeiro, side="right")
+            inicio_mudado = np.searchsorted(buckets, mudou)
+            manter = (tempos_agg > primeiro) & (tempos_agg < mudou)
+
+            partes = [_agregar(buckets[inicio_mudado:], tuple(c[inicio_mudado:] for c in self.base))]
+            if primeiro < mudou:
+                partes.insert(0, (tempos_agg[manter], tuple(c[manter] for c in colunas_agg)))
+                partes.insert(0, _agregar(buckets[:fim_primeiro], tuple(c[:fim_primeiro] for c in self.base)))
+            agregados = (
+                np.concatenate([p[0] for p in partes]),
+                tuple(np.concatenate([p[1][i] for p in partes]) for i in range(len(_COLUNAS))),
+            )
+            self._derivadas[timeframe] = (buckets, agregados, _frame(*agregados))
+        return True
+
+
+class CacheReamostragem:
+    """Séries base por (moeda, endpoint) servindo todos os timeframes derivados"""
+
+    def __init__(self):
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def obter(self, simbolo, df, timeframe):
+        """Candles de `df` reamostrados em `timeframe`, atualizando só o necessário"""
+        chave = (simbolo, BASE_DO_TIMEFRAME[timeframe])
+        versao = (df.index[-1], float(df["close"].iloc[-1]), len(df))
+        with self._lock:
+            serie = self._series.get(chave)
+            if serie is None or (serie.versao != versao and not serie.atualizar(df)):
+                serie = self._series[chave] = SerieBase(df)
+            return serie.derivar(timeframe)
+
+
+def preparar_candles(df, timeframe, minimo=MIN_CANDLES, simbolo=None, reamostragem=None):
+    """Aplica o agrupamento do timeframe; None se não houver dados suficientes"""
+    if df.empty or len(df) < minimo:
+        return None
+    if timeframe in DERIVADOS:
+        with cronometrar("reamostragem"):
+            if reamostragem is not None and simbolo is not None:
+                df = reamostragem.obter(simbolo, df, timeframe)
+            else:
+                df = reamostrar(df, timeframe)
+        if df.empty or len(df) < minimo: # Verifica novamente após agrupamento
+            return None
+    return df
@@ -0,0 +1,64 @@
+"""Redução de séries longas para o orçamento de pontos dos gráficos"""
+import os
+
+import numpy as np
+import pandas as pd
+
+# Pontos desenhados por série (~largura útil do gráfico em pixels)
+PONTOS_MAXIMOS = int(os.environ.get("RADAR_PONTOS_GRAFICO", "800"))
+# Acima disso as linhas usam Scattergl (WebGL) em vez de SVG
+LIMITE_WEBGL = int(os.environ.get("RADAR_LIMITE_WEBGL", "1000"))
+
+
+def indices_lttb(x, y, n):
+    """Índices escolhidos pelo Largest-Triangle-Three-Buckets"""
+    total = len(y)
+    if n >= total or n < 3:
+        return np.arange(total)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    limites = np.linspace(1, total - 1, n - 1).astype(np.int64)
+    escolhidos = np.empty(n, dtype=np.int64)
+    escolhidos[0], escolhidos[-1] = 0, total - 1
+    anterior = 0
+    for i in range(n - 2):
+        inicio, fim = limites[i], limites[i + 1]
+        # Média do próximo bucket (ou o último ponto) é o terceiro vértice
+        prox_fim = limites[i + 2] if i + 2 < n - 1 else total
+        prox_x = x[fim:prox_fim].mean()
+        prox_y = y[fim:prox_fim].mean()
+        areas = np.abs(
+            (x[anterior] - prox_x) * (y[inicio:fim] - y[anterior])
+            - (x[anterior] - x[inicio:fim]) * (prox_y - y[anterior])
+        )
+        anterior = inicio + int(np.argmax(areas))
+        escolhidos[i + 1] = anterior
+    return escolhidos
+
+
+def reduzir_linha(serie, max_pontos=PONTOS_MAXIMOS):
+    """Série reduzida por LTTB preservando picos e vales (NaN são descartados)"""
+    serie = serie.dropna()
+    if len(serie) <= max_pontos:
+        return serie
+    x = (serie.index - serie.index[0]) / pd.Timedelta(seconds=1)
+    return serie.iloc[indices_lttb(x, serie.to_numpy(), max_pontos)]
+
+
+def reduzir_candles(df, max_pontos=PONTOS_MAXIMOS):
+    """Agrupa candles consecutivos preservando abertura, máxima, mínima e fechamento"""
+    if len(df) <= max_pontos:
+        return df
+    passo = -(-len(df) // max_pontos)
+    # Grupos ancorados no fim: o grupo incompleto fica no início do histórico
+    inicios = np.r_[0, np.arange(len(df) % passo or passo, len(df), passo)]
+    fins = np.r_[inicios[1:], len(df)] - 1
+    dados = {
+        "open": df["open"].to_numpy()[inicios],
+        "high": np.maximum.reduceat(df["high"].to_numpy(), inicios),
+        "low": np.minimum.reduceat(df["low"].to_numpy(), inicios),
+        "close": df["close"].to_numpy()[fins],
+    }
+    if "volume" in df:
+        dados["volume"] = np.add.reduceat(df["volume"].to_numpy(), inicios)
+    return pd.DataFrame(dados, index=df.index[inicios])
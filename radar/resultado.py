@@ -0,0 +1,32 @@
+"""Resultados estruturados para uso sem interface (CLI, jobs, workers)"""
+
+
+class Falha:
+    """Erro de uma etapa do processamento de um alvo (moeda, lista, índice)"""
+
+    __slots__ = ("alvo", "etapa", "mensagem")
+
+    def __init__(self, alvo, etapa, mensagem):
+        self.alvo = alvo
+        self.etapa = etapa
+        self.mensagem = str(mensagem)
+
+    def para_dict(self):
+        return {"alvo": self.alvo, "etapa": self.etapa, "mensagem": self.mensagem}
+
+    def __repr__(self):
+        return f"Falha({self.alvo!r}, {self.etapa!r}, {self.mensagem!r})"
+
+
+class Resultado:
+    """Valor produzido e as falhas encontradas no caminho"""
+
+    __slots__ = ("valor", "falhas")
+
+    def __init__(self, valor=None, falhas=()):
+        self.valor = valor
+        self.falhas = list(falhas)
+
+    @property
+    def ok(self):
+        return self.valor is not None
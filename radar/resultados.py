@@ -0,0 +1,77 @@
+"""Tabela colunar e compacta com o resultado do screener"""
+import numpy as np
+import pandas as pd
+
+COLUNAS = ("Moeda", "Símbolo", "Preço", "Variação", "RSI", "Classe RSI", "Tendência", "Volume", "Recomendação")
+NUMERICAS = ("Preço", "Variação", "RSI")
+
+# Chave do dicionário de filtros da interface -> coluna avaliada
+COLUNA_DO_FILTRO = {"trend": "Tendência", "rsi": "Classe RSI", "volume": "Volume", "recommendation": "Recomendação"}
+
+
+class CandlesPreguicosos:
+    """Referência aos candles de uma linha, carregados só quando pedidos"""
+
+    __slots__ = ("simbolo", "timeframe", "_carregar")
+
+    def __init__(self, simbolo, timeframe, carregar):
+        self.simbolo = simbolo
+        self.timeframe = timeframe
+        self._carregar = carregar
+
+    def carregar(self):
+        """Busca os candles (normalmente já em cache) via `carregar(simbolo, timeframe)`"""
+        return self._carregar(self.simbolo, self.timeframe)
+
+
+class TabelaResultados:
+    """Uma coluna (array NumPy) por campo, em vez de um dict por moeda"""
+
+    __slots__ = ("timeframe", "colunas")
+
+    def __init__(self, timeframe, colunas):
+        self.timeframe = timeframe
+        self.colunas = colunas
+
+    @classmethod
+    def de_tuplas(cls, timeframe, tuplas):
+        """Monta a tabela a partir de tuplas na ordem de COLUNAS"""
+        valores = list(zip(*tuplas)) or [()] * len(COLUNAS)
+        colunas = {}
+        for nome, coluna in zip(COLUNAS, valores):
+            tipo = np.float64 if nome in NUMERICAS else object
+            colunas[nome] = np.array(coluna, dtype=tipo)
+        return cls(timeframe, colunas)
+
+    def __len__(self):
+        return len(self.colunas["Moeda"])
+
+    def __getitem__(self, nome):
+        return self.colunas[nome]
+
+    def selecionar(self, selecao):
+        """Nova tabela com as linhas da máscara booleana ou dos índices"""
+        return TabelaResultados(self.timeframe, {nome: c[selecao] for nome, c in self.colunas.items()})
+
+    def filtrar(self, filters):
+        """Linhas que atendem aos filtros selecionados (interseção de máscaras)"""
+        mascara = np.ones(len(self), dtype=bool)
+        for chave, coluna in COLUNA_DO_FILTRO.items():
+            if filters.get(chave):
+                mascara &= np.isin(self.colunas[coluna], list(filters[chave]))
+        return self.selecionar(mascara)
+
+    def linha(self, i):
+        """Uma linha como dict (para exibição ou serialização; NaN vira None)"""
+        linha = {nome: c[i].item() if nome in NUMERICAS else c[i] for nome, c in self.colunas.items()}
+        return {nome: None if v != v else v for nome, v in linha.items()}
+
+    def linhas(self):
+        return [self.linha(i) for i in range(len(self))]
+
+    def para_dataframe(self):
+        return pd.DataFrame(self.colunas, columns=list(COLUNAS))
+
+    def candles(self, i, carregar):
+        """Handle preguiçoso para os candles da linha `i`"""
+        return CandlesPreguicosos(self.colunas["Símbolo"][i], self.timeframe, carregar)
@@ -0,0 +1,98 @@
+"""Classificação do universo de moedas (núcleo do screener)"""
+from radar.classificacao import classificar_rsi, classificar_tendencia, classificar_volume, obter_recomendacao
+from radar.coleta import MAX_WORKERS, buscar_concorrente
+from radar.dados import extrair_simbolo, get_timeframe_endpoint
+from radar.indicadores import Indicadores
+from radar.metricas import cronometrado, cronometrar
+from radar.painel import PainelIndicadores
+from radar.reamostragem import preparar_candles
+from radar.resultado import Falha, Resultado
+from radar.resultados import TabelaResultados
+
+
+@cronometrado("indicadores")
+def calcular_series(candles, timeframe, cache_indicadores=None):
+    """Indicadores de cada moeda, reaproveitando o cache e o painel vetorizado"""
+    series = {}
+    if cache_indicadores is not None:
+        # Moedas já calculadas avançam só com os candles novos
+        series = {moeda: cache_indicadores.atualizado(extrair_simbolo(moeda), timeframe, df)
+                  for moeda, df in candles.items()}
+    faltando = {moeda: df for moeda, df in candles.items() if series.get(moeda) is None}
+    # As demais são calculadas juntas em uma única passada vetorizada
+    painel = PainelIndicadores({moeda: df['close'] for moeda, df in faltando.items()})
+    for moeda, df in faltando.items():
+        series[moeda] = Indicadores.de_painel(painel, moeda, df.index)
+        if cache_indicadores is not None:
+            # Disponibiliza as séries para a análise individual da mesma moeda
+            cache_indicadores.registrar(extrair_simbolo(moeda), timeframe, df, series[moeda])
+    return series
+
+
+def classificar_ultimos(moeda, close, volume, ultimos):
+    """Classificação a partir dos arrays de close/volume e dos indicadores do último candle.
+
+    Segue as mesmas regras de `analise.analisar_candles`, sem precisar de DataFrame.
+    """
+    variacao = (close[-1] - close[-2]) / close[-2] * 100 if len(close) > 1 else 0
+    rsi_class = classificar_rsi(ultimos["rsi"])
+    tendencia = classificar_tendencia(ultimos["ema_8"], ultimos["ema_21"], ultimos["ema_50"], ultimos["ema_200"])
+    volume_class = classificar_volume(volume[-1], volume.mean())
+    macd_signal = "Compra" if ultimos["macd"] > ultimos["macd_signal"] else "Venda"
+    rec_principal, _ = obter_recomendacao(tendencia, rsi_class, volume_class, macd_signal)
+    return (moeda, extrair_simbolo(moeda), close[-1], variacao, ultimos["rsi"],
+            rsi_class, tendencia, volume_class, rec_principal)
+
+
+def classificar_moeda(moeda, df, indicadores):
+    """Classificação de uma moeda (tupla na ordem de resultados.COLUNAS)"""
+    return classificar_ultimos(moeda, df["close"].to_numpy(), df["volume"].to_numpy(), indicadores.ultimos())
+
+
+def classificar_universo(candles, timeframe, cache_indicadores=None):
+    """Classifica todas as moedas já preparadas (dict moeda -> candles)"""
+    series = calcular_series(candles, timeframe, cache_indicadores)
+    with cronometrar("classificacao"):
+        tuplas = [classificar_moeda(moeda, df, series[moeda]) for moeda, df in candles.items()]
+    return TabelaResultados.de_tuplas(timeframe, tuplas)
+
+
+def coletar_candles(moedas, timeframe, buscar_candles, max_workers=MAX_WORKERS, ao_progredir=None, reamostragem=None):
+    """Candles preparados de cada moeda ({moeda: df}) e a lista de `Falha` de busca ou preparo"""
+    endpoint, limit = get_timeframe_endpoint(timeframe)
+    falhas = []
+
+    def buscar(moeda):
+        try:
+            return buscar_candles(extrair_simbolo(moeda), endpoint, limit)
+        except Exception as e:
+            return Falha(moeda, "busca", e)
+
+    candles = {}
+    for moeda, df in zip(moedas, buscar_concorrente(moedas, buscar, max_workers, ao_progredir)):
+        if isinstance(df, Falha):
+            falhas.append(df)
+            continue
+        df = preparar_candles(df, timeframe, simbolo=extrair_simbolo(moeda), reamostragem=reamostragem)
+        if df is None:
+            falhas.append(Falha(moeda, "preparo", "Dados insuficientes"))
+        else:
+            candles[moeda] = df
+    return candles, falhas
+
+
+def executar_screen(moedas, timeframe, buscar_candles, max_workers=MAX_WORKERS,
+                    cache_indicadores=None, ao_progredir=None, filters=None, reamostragem=None, pool=None):
+    """Busca e classifica o universo; moedas com erro viram `Falha` no resultado.
+
+    Com `filters`, devolve só as linhas aprovadas, usando o planejador de filtros.
+    Com `pool` (paralelo.PoolScreener), a classificação é dividida entre processos.
+    """
+    candles, falhas = coletar_candles(moedas, timeframe, buscar_candles, max_workers, ao_progredir, reamostragem)
+    if pool is not None:
+        tabela = pool.classificar(candles, timeframe)
+        return Resultado(tabela.filtrar(filters) if filters else tabela, falhas)
+    if filters:
+        from radar.planejador import filtrar_com_plano # Importação tardia: o planejador usa este módulo
+        return Resultado(filtrar_com_plano(candles, timeframe, filters, cache_indicadores), falhas)
+    return Resultado(classificar_universo(candles, timeframe, cache_indicadores), falhas)
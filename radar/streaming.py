@@ -0,0 +1,122 @@
+"""Estado incremental (O(1) por candle) de EMA, RSI de Wilder e MACD"""
+import math
+
+from radar.painel import JANELA_RSI, MACD_LENTA, MACD_RAPIDA, MACD_SINAL, PERIODOS_EMA
+
+NAN = float("nan")
+
+
+class _EMA:
+    """EMA com adjust=False que começa na primeira observação"""
+
+    __slots__ = ("alpha", "periodo", "valor", "n")
+
+    def __init__(self, alpha, periodo):
+        self.alpha, self.periodo, self.valor, self.n = alpha, periodo, NAN, 0
+
+    def avancar(self, x):
+        self.valor = x if self.n == 0 else self.valor + self.alpha * (x - self.valor)
+        self.n += 1
+
+    def atual(self):
+        # Mesma regra de min_periods usada pela biblioteca `ta`
+        return self.valor if self.n >= self.periodo else NAN
+
+
+class EstadoIndicadores:
+    """Indicadores de uma moeda/timeframe atualizados candle a candle.
+
+    Reproduz a recursão de `ta`/pandas (adjust=False), então avançar o estado
+    pela série inteira produz os mesmos valores de `calcular_indicadores`.
+    O último candle pode ser corrigido com `revisar` enquanto está em formação.
+    """
+
+    def __init__(self):
+        self.emas = {p: _EMA(2 / (p + 1), p) for p in PERIODOS_EMA}
+        self.media_alta = _EMA(1 / JANELA_RSI, JANELA_RSI)
+        self.media_baixa = _EMA(1 / JANELA_RSI, JANELA_RSI)
+        self.macd_rapida = _EMA(2 / (MACD_RAPIDA + 1), MACD_RAPIDA)
+        self.macd_lenta = _EMA(2 / (MACD_LENTA + 1), MACD_LENTA)
+        self.macd_sinal = _EMA(2 / (MACD_SINAL + 1), MACD_SINAL)
+        self.ultimo_close = NAN
+        self.n = 0
+        self._anterior = None
+
+    @classmethod
+    def a_partir_de(cls, closes):
+        """Constrói o estado percorrendo um histórico de fechamentos"""
+        estado = cls()
+        for close in closes:
+            estado.avancar(close)
+        return estado
+
+    def avancar(self, close):
+        """Incorpora um novo candle fechado e devolve os valores atuais"""
+        self._anterior = self.snapshot(incluir_anterior=False)
+        self._aplicar(float(close))
+        return self.valores()
+
+    def revisar(self, close):
+        """Substitui o fechamento do último candle (ainda em formação)"""
+        if self._anterior is None:
+            raise ValueError("não há candle para revisar")
+        anterior = self._anterior
+        self._carregar(anterior)
+        return self.avancar(close)
+
+    def _aplicar(self, close):
+        # O primeiro diff é NaN e a biblioteca `ta` o trata como variação zero
+        diff = 0.0 if self.n == 0 else close - self.ultimo_close
+        self.media_alta.avancar(diff if diff > 0 else 0.0)
+        self.media_baixa.avancar(-diff if diff < 0 else 0.0)
+        for ema in self.emas.values():
+            ema.avancar(close)
+        self.macd_rapida.avancar(close)
+        self.macd_lenta.avancar(close)
+        macd = self.macd_rapida.atual() - self.macd_lenta.atual()
+        if not math.isnan(macd):
+            self.macd_sinal.avancar(macd)
+        self.ultimo_close = close
+        self.n += 1
+
+    def valores(self):
+        """Valores atuais no mesmo formato de PainelIndicadores.ultimos"""
+        valores = {f"ema_{p}": None if math.isnan(e.atual()) else e.atual() for p, e in self.emas.items()}
+        alta, baixa = self.media_alta.atual(), self.media_baixa.atual()
+        if baixa == 0:
+            rsi = 100.0
+        else:
+            rsi = 100 - 100 / (1 + alta / baixa) if not math.isnan(baixa) else NAN
+        macd = self.macd_rapida.atual() - self.macd_lenta.atual()
+        sinal = self.macd_sinal.atual()
+        valores.update(rsi=rsi, macd=macd, macd_signal=sinal, macd_diff=macd - sinal)
+        return valores
+
+    def _emas_nomeadas(self):
+        nomeadas = {f"ema_{p}": e for p, e in self.emas.items()}
+        nomeadas.update(
+            media_alta=self.media_alta, media_baixa=self.media_baixa, macd_rapida=self.macd_rapida,
+            macd_lenta=self.macd_lenta, macd_sinal=self.macd_sinal,
+        )
+        return nomeadas
+
+    def snapshot(self, incluir_anterior=True):
+        """Estado serializável (dict de floats/ints) para persistir ou copiar"""
+        estado = {nome: [e.valor, e.n] for nome, e in self._emas_nomeadas().items()}
+        estado.update(ultimo_close=self.ultimo_close, n=self.n)
+        if incluir_anterior:
+            estado["anterior"] = self._anterior
+        return estado
+
+    def _carregar(self, estado):
+        for nome, e in self._emas_nomeadas().items():
+            e.valor, e.n = estado[nome]
+        self.ultimo_close, self.n = estado["ultimo_close"], estado["n"]
+
+    @classmethod
+    def restaurar(cls, estado):
+        """Recria um estado a partir de `snapshot()`"""
+        novo = cls()
+        novo._carregar(estado)
+        novo._anterior = estado.get("anterior")
+        return novo
@@ -0,0 +1,259 @@
+"""Cliente HTTP compartilhado: conexões persistentes, retentativas e disjuntor"""
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from urllib.parse import urlencode, urlsplit
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+from radar import metricas
+from radar.coleta import MAX_WORKERS, RAJADA_MAXIMA, REQUISICOES_POR_SEGUNDO, LimitadorTaxa
+
+logger = logging.getLogger(__name__)
+
+TIMEOUT_PADRAO = (3.05, 10)  # (conexão, leitura) em segundos
+STATUS_RETENTAVEIS = {429, 500, 502, 503, 504}
+
+
+class ErroTransporte(Exception):
+    """Falha definitiva ao consultar um serviço externo"""
+
+
+class CircuitoAberto(ErroTransporte):
+    """O host está em quarentena após falhas seguidas"""
+
+
+class Disjuntor:
+    """Circuit breaker por host: fecha, abre após falhas seguidas e testa após o resfriamento.
+
+    Passado o resfriamento, uma única requisição de teste é liberada (meio-aberto);
+    as demais continuam barradas até ela terminar. Se o teste falhar, o disjuntor
+    volta a abrir por mais um resfriamento. `testando` guarda a thread que faz o
+    teste (None sem teste em andamento).
+    """
+
+    def __init__(self, limite_falhas=5, resfriamento=30.0):
+        self.limite_falhas = limite_falhas
+        self.resfriamento = resfriamento
+        self.falhas = 0
+        self.aberto_ate = 0.0
+        self.testando = None
+        self._lock = threading.Lock()
+
+    def permite(self):
+        with self._lock:
+            if self.falhas < self.limite_falhas:
+                return True
+            if self.testando is not None or time.monotonic() < self.aberto_ate:
+                return False
+            self.testando = threading.get_ident()
+            return True
+
+    def sucesso(self):
+        with self._lock:
+            self.falhas = 0
+            self.aberto_ate = 0.0
+            self.testando = None
+
+    def falha(self):
+        with self._lock:
+            self.falhas += 1
+            self.testando = None
+            if self.falhas >= self.limite_falhas:
+                self.aberto_ate = time.monotonic() + self.resfriamento
+
+    def liberar(self):
+        """Encerra o teste desta thread sem resultado (exceção inesperada no meio dele)"""
+        with self._lock:
+            if self.testando == threading.get_ident():
+                self.testando = None
+
+
+class EstatisticasEndpoint:
+    """Latências recentes e contadores de um endpoint (atualizados por várias threads)"""
+
+    CONTADORES = ("requisicoes", "erros", "retentativas", "respostas_antigas")
+
+    def __init__(self, janela=500):
+        self.latencias = deque(maxlen=janela)
+        self.requisicoes = 0
+        self.erros = 0
+        self.retentativas = 0
+        self.respostas_antigas = 0
+        self._lock = threading.Lock()
+
+    def contar(self, contador):
+        with self._lock:
+            setattr(self, contador, getattr(self, contador) + 1)
+
+    def registrar_latencia(self, segundos):
+        with self._lock:
+            self.latencias.append(segundos)
+
+    def resumo(self):
+        with self._lock:
+            contadores = {nome: getattr(self, nome) for nome in self.CONTADORES}
+            latencias = np.array(self.latencias) * 1000 if self.latencias else None
+        return {
+            **contadores,
+            "p50_ms": None if latencias is None else float(np.percentile(latencias, 50)),
+            "p95_ms": None if latencias is None else float(np.percentile(latencias, 95)),
+        }
+
+
+class ClienteHTTP:
+    """Sessão `requests` com pool de conexões compartilhada entre threads.
+
+    Cada requisição (retentativas incluídas) passa antes pelo limitador de taxa
+    do host (`taxa` req/s com rajadas de até `rajada`; `taxa=None` desativa).
+    Respostas 429/5xx e erros de rede são repetidos com backoff exponencial e
+    jitter. Com o disjuntor do host aberto (ou esgotadas as tentativas), a
+    última resposta válida da mesma URL é devolvida, se houver.
+    """
+
+    def __init__(self, timeouts=None, tentativas=3, backoff_base=0.5, backoff_max=8.0,
+                 limite_falhas=5, resfriamento=30.0, max_respostas_guardadas=256, pool=MAX_WORKERS * 2,
+                 taxa=REQUISICOES_POR_SEGUNDO, rajada=RAJADA_MAXIMA):
+        self.timeouts = dict(timeouts or {})
+        self.tentativas = tentativas
+        self.taxa = taxa
+        self.rajada = rajada
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.limite_falhas = limite_falhas
+        self.resfriamento = resfriamento
+        self.max_respostas_guardadas = max_respostas_guardadas
+
+        self.sessao = requests.Session()
+        adaptador = HTTPAdapter(pool_connections=pool, pool_maxsize=pool)
+        self.sessao.mount("https://", adaptador)
+        self.sessao.mount("http://", adaptador)
+        self.sessao.headers.update({"Accept": "application/json", "Accept-Encoding": "gzip, deflate"})
+
+        self._disjuntores = {}
+        self._limitadores = {}
+        self._estatisticas = {}
+        self._ultimas_boas = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _disjuntor(self, host):
+        with self._lock:
+            if host not in self._disjuntores:
+                self._disjuntores[host] = Disjuntor(self.limite_falhas, self.resfriamento)
+            return self._disjuntores[host]
+
+    def _limitador(self, host):
+        if self.taxa is None:
+            return None
+        with self._lock:
+            if host not in self._limitadores:
+                self._limitadores[host] = LimitadorTaxa(self.taxa, self.rajada)
+            return self._limitadores[host]
+
+    def _stats(self, endpoint):
+        with self._lock:
+            if endpoint not in self._estatisticas:
+                self._estatisticas[endpoint] = EstatisticasEndpoint()
+            return self._estatisticas[endpoint]
+
+    def _espera(self, tentativa, resposta=None):
+        if resposta is not None and resposta.headers.get("Retry-After", "").isdigit():
+            return min(float(resposta.headers["Retry-After"]), self.backoff_max)
+        # Full jitter: uniforme entre zero e o teto exponencial
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** tentativa))
+
+    def _guardar(self, chave, payload):
+        with self._lock:
+            self._ultimas_boas[chave] = payload
+            self._ultimas_boas.move_to_end(chave)
+            while len(self._ultimas_boas) > self.max_respostas_guardadas:
+                self._ultimas_boas.popitem(last=False)
+
+    def _ultima_boa(self, chave, stats, erro):
+        with self._lock:
+            payload = self._ultimas_boas.get(chave)
+        if payload is None:
+            raise erro
+        stats.contar("respostas_antigas")
+        metricas.contar("respostas_antigas")
+        logger.warning("Servindo última resposta válida de %s: %s", chave, erro)
+        return payload
+
+    def obter_json(self, url, params=None):
+        """GET que devolve o JSON decodificado (ou a última resposta válida)"""
+        with metricas.cronometrar("rede"):
+            return self._obter_json(url, params)
+
+    def _obter_json(self, url, params):
+        partes = urlsplit(url)
+        host, endpoint = partes.netloc, partes.netloc + partes.path
+        chave = url + ("?" + urlencode(sorted(params.items())) if params else "")
+        disjuntor, stats, limitador = self._disjuntor(host), self._stats(endpoint), self._limitador(host)
+
+        if not disjuntor.permite():
+            return self._ultima_boa(chave, stats, CircuitoAberto(f"{host} indisponível; tentando novamente em breve"))
+
+        try:
+            erro = None
+            for tentativa in range(self.tentativas):
+                resposta = None
+                if limitador is not None:
+                    limitador.adquirir()
+                inicio = time.perf_counter()
+                try:
+                    stats.contar("requisicoes")
+                    metricas.contar("requisicoes_upstream")
+                    resposta = self.sessao.get(url, params=params, timeout=self.timeouts.get(host, TIMEOUT_PADRAO))
+                    stats.registrar_latencia(time.perf_counter() - inicio)
+                    if resposta.status_code not in STATUS_RETENTAVEIS:
+                        resposta.raise_for_status()
+                        payload = resposta.json()
+                        disjuntor.sucesso()
+                        self._guardar(chave, payload)
+                        return payload
+                    erro = ErroTransporte(f"HTTP {resposta.status_code} em {endpoint}")
+                except requests.HTTPError as e:
+                    # 4xx (exceto 429) não melhora com retentativas; o host respondeu, então não conta como falha dele
+                    stats.contar("erros")
+                    disjuntor.sucesso()
+                    raise ErroTransporte(str(e)) from e
+                except ValueError as e:
+                    # 200 com corpo que não é JSON (página de erro de proxy, resposta truncada)
+                    erro = ErroTransporte(f"resposta inválida de {endpoint}: {e}")
+                except requests.RequestException as e:
+                    erro = ErroTransporte(f"falha de rede em {endpoint}: {e}")
+
+                stats.contar("erros")
+                if tentativa + 1 < self.tentativas:
+                    stats.contar("retentativas")
+                    time.sleep(self._espera(tentativa, resposta))
+
+            disjuntor.falha()
+        finally:
+            # Qualquer outra exceção (ou interrupção) no meio do teste não pode deixar o
+            # disjuntor barrando o host para sempre
+            disjuntor.liberar()
+        return self._ultima_boa(chave, stats, erro)
+
+    def estatisticas(self):
+        """Resumo por endpoint (host + caminho) com p50/p95 de latência"""
+        with self._lock:
+            itens = list(self._estatisticas.items())
+        return {endpoint: stats.resumo() for endpoint, stats in itens}
+
+
+_cliente_padrao = None
+_cliente_lock = threading.Lock()
+
+
+def cliente_padrao():
+    """Cliente único do processo, criado na primeira utilização"""
+    global _cliente_padrao
+    with _cliente_lock:
+        if _cliente_padrao is None:
+            _cliente_padrao = ClienteHTTP()
+        return _cliente_padrao
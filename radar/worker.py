@@ -0,0 +1,119 @@
+"""Trabalhador em segundo plano que pré-calcula snapshots do screener"""
+import logging
+import os
+import threading
+import time
+
+from radar import metricas
+from radar.coleta import MAX_WORKERS
+from radar.indice import IndiceClassificacao
+from radar.screener import executar_screen
+
+logger = logging.getLogger(__name__)
+
+TIMEFRAMES = ("1h", "4h", "1d", "1w")
+INTERVALO_PADRAO = float(os.environ.get("RADAR_INTERVALO_SNAPSHOT", "300"))
+# "0" desliga o trabalhador: o app classifica sob demanda, a cada filtro aplicado
+ATIVO = os.environ.get("RADAR_TRABALHADOR", "1") != "0"
+
+
+class Snapshot:
+    """Tabela de classificação (TabelaResultados) publicada para um timeframe, com o índice dela"""
+
+    __slots__ = ("timeframe", "gerado_em", "tabela", "indice")
+
+    def __init__(self, timeframe, gerado_em, tabela, indice=None):
+        self.timeframe = timeframe
+        self.gerado_em = gerado_em
+        self.tabela = tabela
+        self.indice = indice
+
+
+class TrabalhadorScreener:
+    """Recalcula periodicamente a classificação completa de cada timeframe.
+
+    `listar_moedas()` devolve o universo e `buscar_candles(simbolo, endpoint, limit)`
+    os candles de uma moeda; ambos podem levantar exceções, que só descartam
+    a moeda (ou a rodada) afetada. Cada timeframe é publicado trocando a
+    referência do dicionário de snapshots, então leitores nunca veem uma
+    tabela pela metade.
+    """
+
+    def __init__(self, listar_moedas, buscar_candles, timeframes=TIMEFRAMES,
+                 intervalo=INTERVALO_PADRAO, max_workers=MAX_WORKERS, cache_indicadores=None,
+                 reamostragem=None, pool=None):
+        self.listar_moedas = listar_moedas
+        self.buscar_candles = buscar_candles
+        self.timeframes = tuple(timeframes)
+        self.intervalo = intervalo
+        self.max_workers = max_workers
+        self.cache_indicadores = cache_indicadores
+        self.reamostragem = reamostragem
+        self.pool = pool
+        self._snapshots = {}
+        self._parar = threading.Event()
+        self._thread = None
+
+    def snapshot(self, timeframe):
+        """Último snapshot publicado para o timeframe, ou None"""
+        return self._snapshots.get(timeframe)
+
+    def indice(self, timeframe):
+        """Índice de classificação do último snapshot publicado do timeframe, ou None"""
+        snapshot = self._snapshots.get(timeframe)
+        return None if snapshot is None else snapshot.indice
+
+    def iniciar(self):
+        """Inicia a thread (daemon) se ainda não estiver rodando"""
+        if self._thread is None or not self._thread.is_alive():
+            self._parar.clear()
+            self._thread = threading.Thread(target=self._executar, name="radar-screener", daemon=True)
+            self._thread.start()
+        return self
+
+    def parar(self, timeout=None):
+        """Sinaliza a parada e aguarda a rodada atual terminar"""
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _executar(self):
+        while not self._parar.is_set():
+            inicio = time.monotonic()
+            try:
+                with metricas.cronometrar("rodada_screener"):
+                    self.calcular_rodada()
+                if metricas.ARQUIVO_PADRAO:
+                    metricas.gravar(metricas.ARQUIVO_PADRAO)
+            except Exception:
+                logger.exception("Falha ao calcular snapshots do screener")
+            self._parar.wait(max(0.0, self.intervalo - (time.monotonic() - inicio)))
+
+    def calcular_rodada(self):
+        """Calcula e publica um snapshot para cada timeframe"""
+        moedas = self.listar_moedas()
+        for timeframe in self.timeframes:
+            if self._parar.is_set():
+                return
+            self._publicar(self.calcular_snapshot(moedas, timeframe))
+
+    def calcular_snapshot(self, moedas, timeframe):
+        """Busca, prepara e classifica o universo em um timeframe"""
+        resultado = executar_screen(moedas, timeframe, self.buscar_candles, self.max_workers,
+                                    self.cache_indicadores, reamostragem=self.reamostragem, pool=self.pool)
+        for falha in resultado.falhas:
+            if falha.etapa == "busca":
+                logger.warning("Erro ao buscar dados de %s: %s", falha.alvo, falha.mensagem)
+        return Snapshot(timeframe, time.time(), resultado.valor)
+
+    def _publicar(self, snapshot):
+        # Cópia do índice anterior (copy-on-write): só as moedas que mudaram de classe
+        # alteram bitmaps, e o índice publicado junto com a tabela nunca é modificado
+        anterior = self._snapshots.get(snapshot.timeframe)
+        if anterior is None or anterior.indice is None:
+            snapshot.indice = IndiceClassificacao.de_tabela(snapshot.tabela)
+        else:
+            snapshot.indice = anterior.indice.copiar()
+            snapshot.indice.sincronizar(snapshot.tabela)
+        # Troca atômica da referência: leitores usam o dicionário antigo ou o novo
+        self._snapshots = {**self._snapshots, snapshot.timeframe: snapshot}
@@ -0,0 +1,139 @@
+"""Motor de alertas: eventos só nas transições e polling guiado pelo snapshot de cotações"""
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from radar import alertas
+from radar.alertas import MotorAlertas, SinkMemoria, acompanhar
+from radar.cotacoes import Cotacoes
+from radar.indicadores import calcular_indicadores
+from radar.screener import classificar_ultimos
+
+AGORA = 1_700_000_000 // 3600 * 3600 + 1800  # No meio de um candle de 1h
+
+
+def _candles(semente=0, tamanho=300, fim=AGORA):
+    rng = np.random.default_rng(semente)
+    indice = pd.date_range(end=pd.Timestamp(fim, unit="s").floor("h"), periods=tamanho, freq="h", name="time")
+    return pd.DataFrame({
+        "close": 100 * np.exp(np.cumsum(rng.normal(0, 0.005, tamanho))),
+        "volume": rng.lognormal(10, 0.3, tamanho),
+    }, index=indice)
+
+
+def _com_candle(df, close, volume=None):
+    proximo = pd.DataFrame({"close": [close], "volume": [df["volume"].iat[-1] if volume is None else volume]},
+                           index=pd.DatetimeIndex([df.index[-1] + pd.Timedelta(hours=1)], name="time"))
+    return pd.concat([df.iloc[1:], proximo])
+
+
+def _classes_do_screener(df):
+    linha = classificar_ultimos("M", df["close"].to_numpy(), df["volume"].to_numpy(),
+                                calcular_indicadores(df).ultimos())
+    return dict(zip(("Classe RSI", "Tendência", "Volume", "Recomendação"), (linha[5], linha[6], linha[7], linha[8])))
+
+
+def test_cruzamento_de_rsi_gera_um_evento_e_o_mesmo_candle_nenhum():
+    sink = SinkMemoria()
+    motor = MotorAlertas([sink], campos=("Classe RSI",))
+    df = _candles()
+    motor.observar("M", "1h", df)
+    assert motor.classes("M", "1h")["Classe RSI"] == "Neutro"
+
+    df = _com_candle(df, df["close"].iat[-1] * 1.002)  # Candle novo sem cruzar nada
+    assert motor.atualizar("M", "1h", df) == []
+    assert motor.atualizar("M", "1h", df) == []  # Mesmo candle de novo
+
+    for _ in range(6):  # Alta forte: o RSI passa do limite de sobrecompra
+        df = _com_candle(df, df["close"].iat[-1] * 1.04)
+        motor.atualizar("M", "1h", df)
+    eventos = list(sink.eventos)
+    assert [(e.campo, e.anterior, e.atual) for e in eventos] == [("Classe RSI", "Neutro", "Sobrecomprado")]
+    assert eventos[0].rsi > 70
+    assert motor.atualizar("M", "1h", df) == []
+    assert len(sink.eventos) == 1
+
+
+def test_classes_acompanham_o_recalculo_do_screener():
+    motor = MotorAlertas([])
+    df = _candles(1)
+    motor.observar("M", "1h", df)
+    rng = np.random.default_rng(2)
+    for _ in range(40):
+        df = _com_candle(df, df["close"].iat[-1] * rng.uniform(0.97, 1.03), rng.lognormal(10, 0.6))
+        motor.atualizar("M", "1h", df)
+        # Tendência fica de fora: as EMAs incrementais guardam o histórico que saiu da janela
+        obtido, esperado = motor.classes("M", "1h"), _classes_do_screener(df)
+        assert {c: obtido[c] for c in ("Classe RSI", "Volume")} == {c: esperado[c] for c in ("Classe RSI", "Volume")}
+
+
+class Roteiro:
+    """Snapshots de cotações por volta; para o laço depois do último"""
+
+    def __init__(self, precos, parar):
+        self.precos = list(precos)
+        self.parar = parar
+        self.voltas = 0
+
+    def __call__(self, moedas):
+        precos = self.precos[min(self.voltas, len(self.precos) - 1)]
+        self.voltas += 1
+        if self.voltas >= len(self.precos):
+            self.parar.set()
+        return Cotacoes(list(precos), list(precos.values()), [0.0] * len(precos), [0.0] * len(precos))
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    monkeypatch.setattr(alertas, "time", SimpleNamespace(time=lambda: AGORA, monotonic=time.monotonic))
+
+
+def test_acompanhar_so_busca_candles_das_moedas_que_mudaram(relogio):
+    candles = {m: _candles(i) for i, m in enumerate(("A", "B", "C"))}
+    buscas = []
+
+    def buscar_candles(moeda, timeframe):
+        buscas.append(moeda)
+        return candles[moeda]
+
+    parar = threading.Event()
+    roteiro = Roteiro([
+        {"A": 1.0, "B": 2.0, "C": 3.0},
+        {"A": 1.0, "B": 2.0, "C": 3.0},  # Nada mudou: nenhuma busca
+        {"A": 1.0, "B": 2.5, "C": 3.0},
+        {"A": 1.0, "B": 2.5},  # Sem cotação de C: buscada por garantia
+    ], parar)
+    motor = MotorAlertas([])
+    acompanhar(motor, ["A", "B", "C"], "1h", buscar_candles, intervalo=0, parar=parar, buscar_cotacoes=roteiro)
+    assert buscas == ["A", "B", "C", "B", "C"]
+
+
+def test_candle_que_virou_e_buscado_mesmo_com_o_preco_igual(relogio):
+    candles = {"A": _candles(0, fim=AGORA - 3600)}  # Último candle é da hora anterior
+    buscas = []
+
+    def buscar_candles(moeda, timeframe):
+        buscas.append(moeda)
+        return candles[moeda]
+
+    parar = threading.Event()
+    roteiro = Roteiro([{"A": 1.0}, {"A": 1.0}], parar)
+    acompanhar(MotorAlertas([]), ["A"], "1h", buscar_candles, intervalo=0, parar=parar, buscar_cotacoes=roteiro)
+    assert buscas == ["A", "A"]
+
+
+def test_sem_snapshot_toda_a_watchlist_e_buscada():
+    buscas, parar = [], threading.Event()
+
+    def buscar_candles(moeda, timeframe):
+        buscas.append(moeda)
+        if len(buscas) == 4:
+            parar.set()
+        return _candles()
+
+    acompanhar(MotorAlertas([]), ["A", "B"], "1h", buscar_candles, intervalo=0, parar=parar)
+    assert buscas == ["A", "B", "A", "B"]
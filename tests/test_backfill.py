@@ -0,0 +1,104 @@
+"""Backfill e carregar_candles: só o que falta é pedido e a janela sai contínua do armazém"""
+import numpy as np
+import pytest
+
+import radar.backfill as backfill
+from radar.armazenamento import ArmazemCandles
+from radar.backfill import carregar_intervalo
+from radar.candles import candles_de_tuplas
+from radar.dados import carregar_candles
+
+HORA = 3600
+LISTAGEM = 1_600_000_000 // HORA * HORA  # Primeiro candle que a API de teste tem
+AGORA = LISTAGEM + 10_000 * HORA + 1800  # No meio de um candle em formação
+
+
+class ApiFalsa:
+    """Substitui baixar_historico: limit + 1 barras até to_ts, zeradas antes da listagem"""
+
+    def __init__(self):
+        self.pedidos = []
+        self.falhar = False
+
+    def __call__(self, simbolo, endpoint, limit, to_ts=None, cliente=None):
+        self.pedidos.append((to_ts, limit))
+        if self.falhar:
+            raise ConnectionError("API fora do ar")
+        tempos = np.arange(to_ts - limit * HORA, to_ts + 1, HORA)
+        return candles_de_tuplas(
+            (t, *((0.0,) * 5 if t < LISTAGEM else (t / HORA, t / HORA + 1, t / HORA - 1, t / HORA, 1.0)))
+            for t in tempos.tolist()
+        )
+
+
+@pytest.fixture
+def api(monkeypatch):
+    falsa = ApiFalsa()
+    monkeypatch.setattr(backfill, "baixar_historico", falsa)
+    return falsa
+
+
+@pytest.fixture
+def armazem(tmp_path):
+    return ArmazemCandles(str(tmp_path / "candles.sqlite"))
+
+
+def _contigua(df):
+    passos = np.diff(df.index.asi8) // 1_000_000_000
+    return bool((passos == HORA).all())
+
+
+def test_janela_maior_que_uma_pagina_vem_inteira(api, armazem):
+    df = carregar_candles("BTC", "histohour", 4500, armazem, agora=AGORA)
+    assert len(df) == 4501 and _contigua(df)
+    assert len(api.pedidos) == 3
+
+
+def test_janela_ja_armazenada_so_rebusca_o_ultimo_candle(api, armazem):
+    carregar_candles("BTC", "histohour", 3000, armazem, agora=AGORA)
+    api.pedidos.clear()
+    df = carregar_candles("BTC", "histohour", 3000, armazem, agora=AGORA + 2 * HORA)
+    assert api.pedidos == [(AGORA // HORA * HORA + 2 * HORA, 2)]
+    assert len(df) == 3001 and _contigua(df)
+
+
+def test_lacuna_no_meio_e_preenchida(api, armazem):
+    carregar_candles("BTC", "histohour", 3000, armazem, agora=AGORA - 5000 * HORA)
+    # Fora do ar por mais que a janela: o trecho novo não encosta no antigo
+    carregar_candles("BTC", "histohour", 2000, armazem, agora=AGORA)
+    assert len(armazem.lacunas("BTC", "histohour", HORA, LISTAGEM, AGORA)) == 1
+
+    api.pedidos.clear()
+    df = carregar_intervalo("BTC", "histohour", AGORA - 7000 * HORA, AGORA, armazem=armazem)
+    assert len(api.pedidos) == 2  # A lacuna de 3000 candles, em duas páginas
+    assert len(df) == 7000 and _contigua(df)  # Início fora do alinhamento: a partir do candle seguinte
+    assert armazem.lacunas("BTC", "histohour", HORA, LISTAGEM, AGORA) == []
+
+
+def test_intervalo_coberto_nao_faz_requisicao(api, armazem):
+    inicio, fim = AGORA - 3000 * HORA, AGORA - 100 * HORA
+    carregar_intervalo("BTC", "histohour", inicio, fim, armazem=armazem)
+    api.pedidos.clear()
+    df = carregar_intervalo("BTC", "histohour", inicio, fim, armazem=armazem)
+    assert api.pedidos == []
+    assert len(df) == 2900 and _contigua(df)
+
+
+def test_para_na_listagem_e_nao_volta_a_pedir(api, armazem):
+    carregar_intervalo("BTC", "histohour", LISTAGEM - 5000 * HORA, LISTAGEM + 3000 * HORA, armazem=armazem)
+    assert armazem.inicio_do_historico("BTC", "histohour") == LISTAGEM
+    api.pedidos.clear()
+    df = carregar_intervalo("BTC", "histohour", LISTAGEM - 5000 * HORA, LISTAGEM + 3000 * HORA, armazem=armazem)
+    assert api.pedidos == []
+    assert df.index[0].value // 1_000_000_000 == LISTAGEM and _contigua(df)
+
+
+def test_falha_usa_armazenados_ou_propaga(api, armazem):
+    api.falhar = True
+    with pytest.raises(ConnectionError):
+        carregar_candles("BTC", "histohour", 100, armazem, agora=AGORA)
+    api.falhar = False
+    carregar_candles("BTC", "histohour", 100, armazem, agora=AGORA)
+    api.falhar = True
+    df = carregar_candles("BTC", "histohour", 100, armazem, agora=AGORA + HORA)
+    assert len(df) == 100  # A janela andou um candle e o novo não veio
@@ -0,0 +1,52 @@
+"""Backtest vetorizado: sinais de cada barra iguais às regras ao vivo aplicadas barra a barra"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from radar.backtest import PainelBacktest, janela_ao_vivo
+from radar.classificacao import classificar_rsi, classificar_tendencia, classificar_volume, obter_recomendacao
+from radar.indicadores import calcular_indicadores
+
+
+def _candles(semente, tamanho, inicio="2020-01-01"):
+    rng = np.random.default_rng(semente)
+    indice = pd.date_range(inicio, periods=tamanho, freq="D", name="time")
+    return pd.DataFrame({
+        "close": 100 * np.exp(np.cumsum(rng.normal(0, 0.03, tamanho))),
+        "volume": rng.lognormal(10, 0.5, tamanho),
+    }, index=indice)
+
+
+def _ao_vivo(df, janela):
+    """Recomendação que a classificação ao vivo daria no fechamento de cada barra"""
+    indicadores = calcular_indicadores(df)
+    emas = {p: (None if s is None else s.to_numpy()) for p, s in indicadores.emas.items()}
+    rsi, macd, sinal = (s.to_numpy() for s in (indicadores.rsi, indicadores.macd, indicadores.macd_signal))
+    volume = df["volume"].to_numpy()
+    recomendacoes = []
+    for t in range(len(df)):
+        # EMAs são causais: o valor em t é o mesmo de um cálculo só com as barras até t
+        valores = [None if emas[p] is None or t + 1 < p else emas[p][t] for p in sorted(emas)]
+        tendencia = classificar_tendencia(*valores)
+        volume_class = classificar_volume(volume[t], volume[max(0, t + 1 - janela):t + 1].mean())
+        macd_signal = "Compra" if macd[t] > sinal[t] else "Venda"
+        recomendacoes.append(obter_recomendacao(tendencia, classificar_rsi(rsi[t]), volume_class, macd_signal)[0])
+    return recomendacoes
+
+
+@pytest.mark.parametrize("janela", [None, 120])
+def test_sinais_iguais_as_regras_ao_vivo_barra_a_barra(janela):
+    candles = {"A (A)": _candles(0, 900), "B (B)": _candles(1, 650, "2020-09-27")}
+    painel = PainelBacktest(candles, "1d", janela_volume=janela)
+    for moeda, df in candles.items():
+        obtido = painel.serie_de_sinais(moeda, df.index).tolist()
+        esperado = _ao_vivo(df, janela or janela_ao_vivo("1d"))
+        assert obtido == esperado
+        assert set(obtido) - {"Aguardar"}  # A série exercita outras recomendações
+
+
+def test_volume_medio_usa_a_janela_ao_vivo_do_timeframe():
+    df = _candles(2, 1000)
+    painel = PainelBacktest({"A (A)": df}, "1d")
+    assert painel.janela_volume == janela_ao_vivo("1d")
+    np.testing.assert_allclose(painel.volume_medio[-1, 0], df["volume"].iloc[-janela_ao_vivo("1d"):].mean())
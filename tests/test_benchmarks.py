@@ -0,0 +1,68 @@
+"""Benchmark offline: fixtures reproduzíveis e falha explícita sem linha de base"""
+import json
+
+from benchmarks import executar
+from benchmarks.fixtures import ENDPOINTS, ClienteFixtures, assinatura, sintetico
+from radar.cache import CacheNulo, usar_cache
+from radar.dados import extrair_simbolo
+
+
+def test_fixtures_sinteticas_sao_reproduziveis(tmp_path):
+    sintetico(str(tmp_path / "a"), moedas=3)
+    sintetico(str(tmp_path / "b"), moedas=3)
+    assert assinatura(str(tmp_path / "a")) == assinatura(str(tmp_path / "b"))
+
+
+def test_comparar_sem_base_falha(tmp_path):
+    pasta = str(tmp_path / "fixtures")
+    sintetico(pasta, moedas=3)
+    argv = ["--fixtures", pasta, "--repeticoes", "1", "--etapas", "parse", "--base", str(tmp_path / "base.json")]
+    assert executar.main(argv + ["--comparar"]) == 1
+    assert executar.main(argv) == 0
+
+    assert executar.main(argv + ["--salvar-base"]) == 0
+    with open(tmp_path / "base.json", encoding="utf-8") as f:
+        assert json.load(f)["fixtures"] == assinatura(pasta)
+    assert executar.main(argv + ["--comparar", "--tolerancia", "100"]) == 0
+
+
+def test_regressao_so_falha_no_mesmo_ambiente(tmp_path):
+    pasta, caminho = str(tmp_path / "fixtures"), tmp_path / "base.json"
+    sintetico(pasta, moedas=3)
+    argv = ["--fixtures", pasta, "--repeticoes", "1", "--etapas", "parse", "--base", str(caminho)]
+    assert executar.main(argv + ["--salvar-base"]) == 0
+    with open(caminho, encoding="utf-8") as f:
+        base = json.load(f)
+    base["etapas"]["parse"]["mediana_s"] = 1e-9  # Toda medida nova parece uma regressão
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(base, f)
+    assert executar.main(argv + ["--comparar"]) == 1
+
+    base["ambiente"]["cpus"] = (base["ambiente"]["cpus"] or 1) + 63
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(base, f)
+    assert executar.main(argv + ["--comparar"]) == 0
+
+
+def test_fixtures_servem_paginas_como_a_api(tmp_path):
+    pasta = str(tmp_path / "fixtures")
+    sintetico(pasta, moedas=1)
+    cliente = ClienteFixtures(pasta)
+    simbolo = extrair_simbolo(cliente.moedas[0])
+    registros = cliente.payload("histohour", simbolo)["Data"]["Data"]
+    assert len(registros) == ENDPOINTS["histohour"] + 1
+    to_ts = registros[-100]["time"]
+    pagina = cliente.obter_json("https://x/data/v2/histohour", {"fsym": simbolo, "limit": 9, "toTs": to_ts})
+    assert [r["time"] for r in pagina["Data"]["Data"]] == [r["time"] for r in registros[-109:-99]]
+
+
+def test_screen_passa_pelo_armazem_e_devolve_o_cache(tmp_path):
+    pasta = str(tmp_path / "fixtures")
+    sintetico(pasta, moedas=2)
+    anterior = usar_cache(CacheNulo())
+    try:
+        resultado = executar.executar(pasta, repeticoes=1, somente=["screen", "screen_frio"])
+        assert set(resultado["etapas"]) == {"screen", "screen_frio"}
+        assert isinstance(usar_cache(anterior), CacheNulo)
+    finally:
+        usar_cache(anterior)
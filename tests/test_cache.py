@@ -0,0 +1,230 @@
+"""Caches: TTL e LRU do SQLite, voo único, stale-while-revalidate e orçamento de memória"""
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from radar import cache as modulo_cache
+from radar.cache import (CacheLimitado, CacheMemoria, CacheNulo, CacheSQLite, VooUnico, compartilhado,
+                         reduzir_precisao, tamanho_em_bytes, usar_cache)
+
+BLOCO = 1000  # bytes de cada valor (mais alguns do pickle)
+
+
+class Relogio:
+    """Substitui o módulo `time` do cache por um relógio controlado pelo teste"""
+
+    def __init__(self, agora=1_700_000_000.0):
+        self.agora = agora
+
+    def time(self):
+        return self.agora
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    r = Relogio()
+    monkeypatch.setattr(modulo_cache, "time", r)
+    return r
+
+
+def _acessos(backend):
+    with sqlite3.connect(backend.caminho) as conn:
+        return dict(conn.execute("SELECT chave, acesso FROM cache"))
+
+
+def test_entrada_vence_e_e_descartada(tmp_path, relogio):
+    backend = CacheSQLite(str(tmp_path / "cache.sqlite"))
+    backend.gravar("a", [1, 2], ttl=10, max_obsoleto=20)
+    assert backend.obter("a").fresca
+    relogio.agora += 15
+    entrada = backend.obter("a")
+    assert entrada.valor == [1, 2] and not entrada.fresca  # Obsoleta, ainda servida
+    relogio.agora += 15
+    assert backend.obter("a") is None
+    assert _acessos(backend) == {}
+
+
+def test_limite_de_tamanho_remove_as_menos_acessadas(tmp_path, relogio):
+    backend = CacheSQLite(str(tmp_path / "cache.sqlite"), tamanho_maximo=int(3.5 * BLOCO), intervalo_acesso=0)
+    for chave in "abc":
+        relogio.agora += 1
+        backend.gravar(chave, bytes(BLOCO), ttl=60)
+    relogio.agora += 1
+    assert backend.obter("a") is not None  # "a" passa a ser a mais recente
+    relogio.agora += 1
+    backend.gravar("d", bytes(BLOCO), ttl=60)
+    assert set(_acessos(backend)) == {"a", "c", "d"}  # Saiu "b", a acessada há mais tempo
+    relogio.agora += 1
+    backend.gravar("e", bytes(BLOCO), ttl=60)
+    assert set(_acessos(backend)) == {"a", "d", "e"}
+
+
+def test_leituras_dentro_do_intervalo_nao_gravam_o_acesso(tmp_path, relogio):
+    backend = CacheSQLite(str(tmp_path / "cache.sqlite"), intervalo_acesso=60)
+    backend.gravar("a", 1, ttl=600)
+    gravado = _acessos(backend)["a"]
+    for _ in range(5):
+        relogio.agora += 10
+        assert backend.obter("a").valor == 1
+    assert _acessos(backend)["a"] == gravado
+    relogio.agora += 20
+    backend.obter("a")
+    assert _acessos(backend)["a"] == relogio.agora
+
+
+@pytest.fixture
+def trocar_cache():
+    def trocar(novo):
+        anteriores.append(usar_cache(novo))
+        return novo
+    anteriores = []
+    yield trocar
+    usar_cache(anteriores[0])
+
+
+class Contador:
+    """Função cara de teste: conta as execuções e só termina quando `liberar` é sinalizado"""
+
+    def __init__(self):
+        self.chamadas = 0
+        self.liberar = threading.Event()
+        self._lock = threading.Lock()
+
+    def __call__(self, x):
+        with self._lock:
+            self.chamadas += 1
+            n = self.chamadas
+        assert self.liberar.wait(5)
+        return (x, n)
+
+
+def _em_threads(funcao, quantidade):
+    resultados = [None] * quantidade
+
+    def chamar(i):
+        resultados[i] = funcao()
+
+    threads = [threading.Thread(target=chamar, args=(i,)) for i in range(quantidade)]
+    for t in threads:
+        t.start()
+    return threads, resultados
+
+
+def _aguardar(condicao, limite=5):
+    fim = time.monotonic() + limite
+    while not condicao():
+        assert time.monotonic() < fim
+        time.sleep(0.01)
+
+
+def test_voo_unico_executa_uma_vez_para_chamadas_simultaneas():
+    voos, contador = VooUnico(), Contador()
+    threads, resultados = _em_threads(lambda: voos.executar("k", lambda: contador("v")), 8)
+    _aguardar(lambda: contador.chamadas == 1)
+    time.sleep(0.1)  # Tempo para as demais chegarem enquanto a primeira está em voo
+    contador.liberar.set()
+    for t in threads:
+        t.join()
+    assert contador.chamadas == 1
+    assert resultados == [("v", 1)] * 8
+
+
+def test_compartilhado_sem_valor_em_cache_calcula_uma_vez(trocar_cache):
+    trocar_cache(CacheNulo())  # Toda leitura falha: só o voo único evita as chamadas repetidas
+    contador = Contador()
+    funcao = compartilhado(60, chave=lambda x: f"teste-voo:{x}")(contador)
+    threads, resultados = _em_threads(lambda: funcao("v"), 8)
+    _aguardar(lambda: contador.chamadas == 1)
+    time.sleep(0.1)
+    contador.liberar.set()
+    for t in threads:
+        t.join()
+    assert contador.chamadas == 1
+    assert resultados == [("v", 1)] * 8
+
+
+def test_obsoleto_e_devolvido_na_hora_e_revalidado_uma_vez(trocar_cache, relogio):
+    trocar_cache(CacheMemoria())
+    contador = Contador()
+    funcao = compartilhado(10, chave=lambda x: f"teste-obsoleto:{x}", max_obsoleto=100)(contador)
+    contador.liberar.set()
+    assert funcao("v") == ("v", 1)
+    contador.liberar.clear()
+
+    relogio.agora += 30  # Vencido, mas dentro de max_obsoleto
+    # A revalidação fica presa em `liberar`: as respostas não esperam por ela
+    assert [funcao("v") for _ in range(5)] == [("v", 1)] * 5
+    _aguardar(lambda: contador.chamadas == 2)
+    contador.liberar.set()
+    _aguardar(lambda: funcao("v") == ("v", 2))
+    assert contador.chamadas == 2
+
+
+def test_alem_de_max_obsoleto_o_valor_nao_e_servido(trocar_cache, relogio):
+    trocar_cache(CacheMemoria())
+    contador = Contador()
+    contador.liberar.set()
+    funcao = compartilhado(10, chave=lambda x: f"teste-descarte:{x}", max_obsoleto=100)(contador)
+    assert funcao("v") == ("v", 1)
+    relogio.agora += 111
+    assert funcao("v") == ("v", 2)  # Calculado na hora, sem devolver o antigo
+    assert contador.chamadas == 2
+
+
+def _bloco(n=100):
+    return np.arange(n, dtype=np.float64)  # n * 8 bytes
+
+
+def test_limitado_remove_pelo_orcamento_de_memoria():
+    cache = CacheLimitado(memoria_maxima=2500, politica="lru")
+    for chave in "abc":
+        cache.gravar(chave, _bloco(), ttl=60)  # 800 bytes cada
+    cache.gravar("d", _bloco(), ttl=60)
+    assert cache.obter("a") is None and cache.obter("d") is not None
+    assert cache.estatisticas()["bytes"] == 2400 and cache.remocoes == 1
+    cache.gravar("e", _bloco(400), ttl=60)  # Maior que o orçamento inteiro: não é guardado
+    assert cache.obter("e") is None and cache.estatisticas()["entradas"] == 3
+
+
+@pytest.mark.parametrize("politica, removida", [("lru", "a"), ("lfu", "b")])
+def test_vitima_lru_e_lfu(politica, removida):
+    cache = CacheLimitado(memoria_maxima=2500, politica=politica)
+    for chave in "abc":
+        cache.gravar(chave, _bloco(), ttl=60)
+    for chave in "aaaccb":
+        cache.obter(chave)
+    # LRU: "a" é a usada há mais tempo; LFU: "b" tem menos acessos (1 contra 3 e 2)
+    cache.gravar("d", _bloco(), ttl=60)
+    assert {k for k in "abcd" if k in cache._entradas} == set("abcd") - {removida}
+
+
+def test_limitado_expira_pelo_ttl(relogio):
+    cache = CacheLimitado()
+    cache.gravar("a", _bloco(), ttl=10)
+    relogio.agora += 9
+    assert cache.obter("a") is not None
+    relogio.agora += 2
+    assert cache.obter("a") is None
+    estatisticas = cache.estatisticas()
+    assert (estatisticas["expirados"], estatisticas["entradas"], estatisticas["bytes"]) == (1, 0, 0)
+
+
+def test_float32_reduz_so_dentro_da_tolerancia():
+    indice = pd.date_range("2024-01-01", periods=4, freq="h", name="time")
+    exatos = pd.DataFrame({"close": [1.0, 2.5, 0.0, 1024.0], "volume": [3.0, 4.0, 5.0, 6.0]}, index=indice)
+    cache = CacheLimitado(float32=True)
+    guardado = cache.gravar("a", exatos, ttl=60)
+    assert (guardado.dtypes == np.float32).all()
+    pd.testing.assert_frame_equal(guardado.astype(np.float64), exatos)
+    assert cache.estatisticas()["bytes"] < tamanho_em_bytes(exatos)
+
+    # Arredondar para float32 fica dentro da tolerância; valores subnormais e estouro não
+    assert (reduzir_precisao(exatos.assign(close=[1.1, 2.2, 3.3, 4.4])).dtypes == np.float32).all()
+    for close in ([1e-42, 1.0, 2.0, 3.0], [1e40, 1.0, 2.0, 3.0]):
+        fora = exatos.assign(close=close)
+        assert reduzir_precisao(fora) is fora
+        assert (cache.gravar("b", fora, ttl=60).dtypes == np.float64).all()
@@ -0,0 +1,36 @@
+"""Conversão de candles: valores malformados descartam só a própria linha"""
+import numpy as np
+
+from radar.candles import candles_de_json, candles_de_tuplas
+
+
+def _registro(t, close, **extra):
+    return {"time": t, "open": close, "high": close + 1, "low": close - 1, "close": close, "volumeto": 10.0, **extra}
+
+
+def test_valores_malformados_ou_nulos_descartam_a_linha():
+    linhas = [
+        (0, 1.0, 2.0, 0.5, 1.5, 10.0),
+        (60, "abc", 2.0, 0.5, 1.5, 10.0),
+        (120, 1.0, None, 0.5, 1.5, 10.0),
+        (180, "1.5", "2.5", "1", "2", "11"),
+        (240, 1.0, 2.0, 0.5, {"x": 1}, 10.0),
+        (None, 1.0, 2.0, 0.5, 1.5, 10.0),
+        (300, 1.0, 2.0, 0.5, 1.5, 12.0),
+    ]
+    df = candles_de_tuplas(linhas, 60)
+    assert list(df.index.asi8 // 1_000_000_000) == [0, 180, 300]
+    np.testing.assert_array_equal(df["close"].to_numpy(), [1.5, 2.0, 1.5])
+    assert df.dtypes.eq(np.float64).all()
+
+
+def test_json_da_api_com_campo_invalido():
+    registros = [_registro(0, 1.0), _registro(3600, 2.0), _registro(7200, 3.0)]
+    registros[1]["volumeto"] = "n/a"
+    df = candles_de_json(registros, 3600)
+    assert list(df["close"]) == [1.0, 3.0]
+
+
+def test_sem_linhas_validas():
+    assert candles_de_tuplas([(0, "x", 1, 1, 1, 1)]).empty
+    assert candles_de_tuplas([]).empty
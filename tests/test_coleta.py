@@ -0,0 +1,84 @@
+"""Limitador de taxa (token bucket) e coleta concorrente em ordem e com progresso"""
+import threading
+import time
+
+import pytest
+
+from radar import coleta
+from radar.coleta import LimitadorTaxa, buscar_concorrente
+
+
+class Relogio:
+    """Substitui o módulo `time` da coleta: `sleep` só avança o relógio"""
+
+    def __init__(self):
+        self.agora = 0.0
+        self.esperas = []
+
+    def monotonic(self):
+        return self.agora
+
+    def sleep(self, segundos):
+        self.esperas.append(segundos)
+        self.agora += segundos
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    r = Relogio()
+    monkeypatch.setattr(coleta, "time", r)
+    return r
+
+
+def test_rajada_sai_na_hora_e_o_resto_segue_a_taxa(relogio):
+    # Taxa potência de 2: os instantes do relógio falso ficam exatos em ponto flutuante
+    limitador = LimitadorTaxa(taxa=8, capacidade=5)
+    instantes = []
+    for _ in range(21):
+        limitador.adquirir()
+        instantes.append(relogio.agora)
+    assert instantes[:5] == [0.0] * 5
+    # Depois da rajada, um token a cada 1/taxa segundos
+    assert instantes[5:] == [i / 8 for i in range(1, 17)]
+
+
+def test_tokens_acumulam_ate_a_capacidade(relogio):
+    limitador = LimitadorTaxa(taxa=8, capacidade=5)
+    for _ in range(5):
+        limitador.adquirir()
+    relogio.agora += 60  # Ocioso por muito tempo: o balde enche só até a capacidade
+    for _ in range(5):
+        limitador.adquirir()
+    assert relogio.esperas == []
+    limitador.adquirir()
+    assert relogio.esperas == [1 / 8]
+
+
+def test_limitador_rejeita_parametros_invalidos():
+    with pytest.raises(ValueError):
+        LimitadorTaxa(taxa=0)
+    with pytest.raises(ValueError):
+        LimitadorTaxa(capacidade=0)
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_buscar_concorrente_mantem_a_ordem_e_informa_o_progresso(max_workers):
+    chamador = threading.get_ident()
+    progresso = []
+
+    def funcao(item):
+        time.sleep((10 - item) * 0.002)  # Os primeiros terminam por último
+        return item * item
+
+    def ao_progredir(feitos, total):
+        assert threading.get_ident() == chamador
+        progresso.append((feitos, total))
+
+    assert buscar_concorrente(range(10), funcao, max_workers, ao_progredir) == [i * i for i in range(10)]
+    assert progresso == [(i, 10) for i in range(1, 11)]
+
+
+def test_um_item_roda_na_propria_thread():
+    chamador = threading.get_ident()
+    assert buscar_concorrente(["a"], lambda item: (item, threading.get_ident())) == [("a", chamador)]
+    assert buscar_concorrente([], lambda item: item) == []
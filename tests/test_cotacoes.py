@@ -0,0 +1,92 @@
+"""Cotações em lote: parser do pricemultifull e varredura rápida sem histórico por moeda"""
+import json
+
+import numpy as np
+import pytest
+
+import radar.backfill
+import radar.dados
+from radar import cli
+from radar.cotacoes import SEM_INDICADOR, Cotacoes, lotes_de_simbolos, tabela_rapida
+from radar.dados import baixar_cotacoes
+
+
+def _bruto(preco, variacao, volume):
+    return {"TYPE": "5", "MARKET": "CCCAGG", "FROMSYMBOL": "X", "TOSYMBOL": "USD",
+            "PRICE": preco, "CHANGEPCT24HOUR": variacao, "TOTALVOLUME24HTO": volume, "LASTUPDATE": 1_700_000_000}
+
+
+def _pricemultifull(cotacoes):
+    """Payload no formato do pricemultifull: blocos RAW e DISPLAY por símbolo e moeda de cotação"""
+    return {
+        "RAW": {s: ({"USD": _bruto(*valores)} if valores else {}) for s, valores in cotacoes.items()},
+        "DISPLAY": {s: {"USD": {"PRICE": f"$ {v[0]}"}} for s, v in cotacoes.items() if v},
+    }
+
+
+class ClienteFalso:
+    """Responde ao pricemultifull com as cotações conhecidas dos símbolos pedidos"""
+
+    def __init__(self, cotacoes, erro=None):
+        self.cotacoes = cotacoes
+        self.erro = erro
+        self.pedidos = []
+
+    def obter_json(self, url, params=None):
+        self.pedidos.append((url, dict(params)))
+        if self.erro:
+            return {"Response": "Error", "Message": self.erro}
+        return _pricemultifull({s: self.cotacoes[s] for s in params["fsyms"].split(",") if s in self.cotacoes})
+
+
+def test_pricemultifull_vira_colunas_por_simbolo():
+    payload = _pricemultifull({"BTC": (43000.5, 2.5, 1.2e9), "ETH": (2300.0, -1.25, 6e8), "SEM": None})
+    cotacoes = Cotacoes.de_pricemultifull(payload, gerado_em=123.0)
+    assert len(cotacoes) == 2 and "SEM" not in cotacoes and cotacoes.gerado_em == 123.0
+    assert cotacoes.obter("BTC") == (43000.5, 2.5, 1.2e9)
+    assert cotacoes.obter("ETH") == (2300.0, -1.25, 6e8)
+    assert cotacoes.obter("XYZ") is None
+    preco, variacao = cotacoes.alinhar(["ETH", "XYZ", "BTC"])
+    np.testing.assert_array_equal(preco, [2300.0, np.nan, 43000.5])
+    np.testing.assert_array_equal(variacao, [-1.25, np.nan, 2.5])
+    assert len(Cotacoes.de_pricemultifull({})) == 0
+
+
+def test_baixar_cotacoes_em_lotes_que_cabem_no_fsyms():
+    simbolos = [f"M{i:03d}" for i in range(150)]  # 150 * 5 caracteres: mais de um lote
+    cliente = ClienteFalso({s: (float(i), 0.5, 10.0) for i, s in enumerate(simbolos)})
+    cotacoes = baixar_cotacoes.sem_cache(simbolos, cliente=cliente)
+    assert len(cliente.pedidos) == len(list(lotes_de_simbolos(simbolos))) > 1
+    assert all(len(params["fsyms"]) <= 300 and params["tsyms"] == "USD" for _, params in cliente.pedidos)
+    assert cliente.pedidos[0][0].endswith("/pricemultifull")
+    assert len(cotacoes) == 150 and cotacoes.obter("M149") == (149.0, 0.5, 10.0)
+
+
+def test_baixar_cotacoes_com_erro_da_api():
+    with pytest.raises(ValueError, match="limite"):
+        baixar_cotacoes.sem_cache(["BTC"], cliente=ClienteFalso({}, erro="limite de requisições"))
+
+
+def test_tabela_rapida_so_com_as_cotacoes():
+    cotacoes = Cotacoes.de_pricemultifull(_pricemultifull({"BTC": (43000.5, 2.5, 1e9), "ETH": (2300.0, -1.0, 1e8)}))
+    tabela = tabela_rapida(["Bitcoin (BTC)", "Ethereum (ETH)", "Sem Cotação (SEM)"], cotacoes, "1d")
+    assert tabela["Moeda"].tolist() == ["Bitcoin (BTC)", "Ethereum (ETH)"]
+    assert tabela["Preço"].tolist() == [43000.5, 2300.0]
+    assert tabela["Variação"].tolist() == [2.5, -1.0]
+    assert np.isnan(tabela["RSI"]).all() and set(tabela["Tendência"]) == {SEM_INDICADOR}
+
+
+def test_varredura_rapida_da_cli_nao_busca_historico(monkeypatch, tmp_path):
+    def proibido(*args, **kwargs):
+        raise AssertionError("a varredura rápida não pode buscar histórico por moeda")
+
+    for modulo, nome in ((radar.dados, "baixar_historico"), (radar.backfill, "baixar_historico"),
+                         (cli, "carregar_candles"), (cli, "carregar_intervalo"), (cli, "executar_screen")):
+        monkeypatch.setattr(modulo, nome, proibido)
+    cotacoes = Cotacoes.de_pricemultifull(_pricemultifull({"BTC": (43000.5, 2.5, 1e9), "ETH": (2300.0, -1.0, 1e8)}))
+    monkeypatch.setattr(cli, "baixar_universo", lambda limite: (["Bitcoin (BTC)", "Ethereum (ETH)"], cotacoes))
+
+    saida = tmp_path / "screen.json"
+    assert cli.main(["screen", "--rapido", "--saida", str(saida)]) == 0
+    linhas = json.loads(saida.read_text(encoding="utf-8"))["linhas"]
+    assert [(l["Símbolo"], l["Preço"], l["RSI"]) for l in linhas] == [("BTC", 43000.5, None), ("ETH", 2300.0, None)]
@@ -0,0 +1,22 @@
+"""Importação do núcleo e do app sem bibliotecas de gráfico (o tempo é medido em benchmarks.importacao)"""
+import os
+
+import pytest
+
+from benchmarks.importacao import BASE, PESADOS, RAIZ, importacoes_do_topo, medir, pesados_carregados
+
+
+@pytest.mark.parametrize("modulo", ["radar.analise", "radar.dados", "radar.cli"])
+def test_nucleo_sem_pesados(modulo):
+    _, carregados = medir(BASE + (modulo,), 1)
+    assert pesados_carregados(carregados) == []
+
+
+def test_topo_do_app_nao_importa_pesados():
+    assert not importacoes_do_topo(os.path.join(RAIZ, "app.py")) & set(PESADOS)
+
+
+def test_app_sem_pesados():
+    pytest.importorskip("streamlit")
+    _, carregados = medir(BASE + ("streamlit", "app"), 1)
+    assert pesados_carregados(carregados) == []
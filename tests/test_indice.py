@@ -0,0 +1,100 @@
+"""Índice de classificação: mesmas linhas de TabelaResultados.filtrar e leituras consistentes"""
+import itertools
+import random
+import threading
+
+from radar.indice import IndiceClassificacao
+from radar.resultados import TabelaResultados
+from radar.worker import Snapshot, TrabalhadorScreener
+
+TENDENCIAS = ["Alta consolidada", "Baixa consolidada", "Neutra/Transição"]
+RSI = ["Sobrevendido", "Neutro", "Sobrecomprado"]
+VOLUMES = ["Subindo (Alto)", "Normal", "Caindo (Baixo)"]
+RECOMENDACOES = ["Compra Forte", "Compra", "Aguardar correção", "Venda / Evitar", "Observar reversão", "Aguardar"]
+
+
+def _tabela(semente, moedas=200, timeframe="1d"):
+    rng = random.Random(semente)
+    linhas = [
+        (f"Moeda {i} (M{i})", f"M{i}", rng.random() * 100, rng.uniform(-5, 5), rng.uniform(0, 100),
+         rng.choice(RSI), rng.choice(TENDENCIAS), rng.choice(VOLUMES), rng.choice(RECOMENDACOES))
+        for i in range(moedas) if rng.random() > 0.1
+    ]
+    return TabelaResultados.de_tuplas(timeframe, linhas)
+
+
+def _filtros(rng):
+    return {
+        "trend": rng.sample(TENDENCIAS, rng.randint(0, 2)),
+        "rsi": rng.sample(RSI, rng.randint(0, 2)),
+        "volume": rng.sample(VOLUMES, rng.randint(0, 2)),
+        "recommendation": rng.sample(RECOMENDACOES, rng.randint(0, 3)),
+    }
+
+
+def test_selecionar_igual_a_filtrar_depois_de_sincronizacoes():
+    rng = random.Random(0)
+    indice = IndiceClassificacao("1d")
+    for semente in range(5):
+        tabela = _tabela(semente)
+        indice.sincronizar(tabela)
+        for _ in range(50):
+            filtros = _filtros(rng)
+            assert list(indice.selecionar(filtros)["Moeda"]) == list(tabela.filtrar(filtros)["Moeda"])
+
+
+def test_contagens_consideram_os_outros_filtros():
+    tabela = _tabela(1)
+    indice = IndiceClassificacao.de_tabela(tabela)
+    filtros = {"rsi": ["Sobrevendido"], "trend": ["Alta consolidada"]}
+    contagens = indice.contagens(filtros)
+    for valor in RSI:
+        esperado = len(tabela.filtrar({"rsi": [valor], "trend": ["Alta consolidada"]}))
+        assert contagens["rsi"].get(valor, 0) == esperado
+
+
+def test_leitura_durante_sincronizacao_ve_uma_tabela_inteira():
+    tabelas = [_tabela(10), _tabela(11)]
+    filtros = {"rsi": ["Sobrevendido", "Neutro"], "recommendation": ["Compra", "Aguardar"]}
+    esperados = {tuple(t.filtrar(filtros)["Moeda"]) for t in tabelas}
+    indice = IndiceClassificacao.de_tabela(tabelas[0])
+    parar = threading.Event()
+
+    def sincronizar():
+        for tabela in itertools.cycle(tabelas):
+            if parar.is_set():
+                return
+            indice.sincronizar(tabela)
+
+    escritor = threading.Thread(target=sincronizar)
+    escritor.start()
+    try:
+        for _ in range(2000):
+            assert tuple(indice.selecionar(filtros)["Moeda"]) in esperados
+    finally:
+        parar.set()
+        escritor.join()
+
+
+def test_trabalhador_publica_indice_junto_com_a_tabela():
+    tabelas = [_tabela(20), _tabela(21)]
+    filtros = {"trend": ["Baixa consolidada"], "volume": ["Normal", "Caindo (Baixo)"]}
+    trabalhador = TrabalhadorScreener(listar_moedas=list, buscar_candles=None, timeframes=("1d",))
+    trabalhador._publicar(Snapshot("1d", 0.0, tabelas[0]))
+    parar = threading.Event()
+
+    def publicar():
+        for i, tabela in enumerate(itertools.cycle(tabelas)):
+            if parar.is_set():
+                return
+            trabalhador._publicar(Snapshot("1d", float(i), tabela))
+
+    escritor = threading.Thread(target=publicar)
+    escritor.start()
+    try:
+        for _ in range(2000):
+            snapshot = trabalhador.snapshot("1d")
+            assert list(snapshot.indice.selecionar(filtros)["Moeda"]) == list(snapshot.tabela.filtrar(filtros)["Moeda"])
+    finally:
+        parar.set()
+        escritor.join()
@@ -0,0 +1,107 @@
+"""Métricas: tempos por etapa que somam certo e exportação Prometheus / JSON lines"""
+import json
+import re
+
+import pytest
+
+from radar import metricas
+
+# Linha de amostra do formato de exposição: nome{rótulos} valor
+AMOSTRA = re.compile(r'^(?P<nome>[a-zA-Z_:][a-zA-Z0-9_:]*)\{(?P<rotulos>[^}]*)\} (?P<valor>-?[0-9.e+-]+)$')
+
+
+class Relogio:
+    def __init__(self):
+        self.agora = 0.0
+
+    def perf_counter(self):
+        return self.agora
+
+    def time(self):
+        return 1_700_000_000.0
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    r = Relogio()
+    monkeypatch.setattr(metricas, "time", r)
+    ligadas = metricas.ATIVAS
+    metricas.ativar()
+    metricas.limpar()
+    yield r
+    metricas.ativar(ligadas)
+    metricas.limpar()
+
+
+def _rodada(relogio):
+    @metricas.cronometrado("indicadores")
+    def indicadores():
+        relogio.agora += 0.25
+
+    with metricas.cronometrar("screen"):
+        relogio.agora += 0.125  # Busca (fora das etapas internas)
+        indicadores()
+        with metricas.cronometrar("classificacao"):
+            relogio.agora += 0.5
+    metricas.contar("requisicoes_upstream", 3)
+
+
+def test_etapas_internas_somam_ao_total(relogio):
+    for _ in range(4):
+        _rodada(relogio)
+    etapas = metricas.resumo()["etapas"]
+    assert {e: m["n"] for e, m in etapas.items()} == {"classificacao": 4, "indicadores": 4, "screen": 4}
+    assert etapas["screen"]["total_ms"] == pytest.approx(4 * 875)
+    assert etapas["indicadores"]["total_ms"] + etapas["classificacao"]["total_ms"] == pytest.approx(4 * 750)
+    assert etapas["classificacao"]["p50_ms"] == etapas["classificacao"]["max_ms"] == pytest.approx(500)
+    assert metricas.resumo()["contadores"] == {"requisicoes_upstream": 12}
+
+
+def test_desligadas_nao_registram(relogio):
+    metricas.ativar(False)
+    assert metricas.cronometrar("screen") is metricas._NULO
+    _rodada(relogio)
+    assert metricas.resumo() == {"etapas": {}, "contadores": {}}
+
+
+def test_exportacao_prometheus(relogio):
+    _rodada(relogio)
+    _rodada(relogio)
+    texto = metricas.exportar_prometheus()
+    assert texto.endswith("\n")
+    tipos, amostras = {}, {}
+    for linha in texto.splitlines():
+        if linha.startswith("#"):
+            _, tipo, nome, especie = linha.split()
+            assert tipo == "TYPE"
+            tipos[nome] = especie
+            continue
+        m = AMOSTRA.match(linha)
+        assert m, linha
+        rotulos = dict(re.findall(r'(\w+)="([^"]*)"', m["rotulos"]))
+        amostras[(m["nome"], tuple(sorted(rotulos.items())))] = float(m["valor"])
+    assert tipos == {"radar_etapa_segundos": "summary", "radar_eventos_total": "counter"}
+
+    screen = (("etapa", "screen"),)
+    assert amostras[("radar_etapa_segundos_sum", screen)] == pytest.approx(1.75)
+    assert amostras[("radar_etapa_segundos_count", screen)] == 2
+    assert amostras[("radar_etapa_segundos", (("etapa", "screen"), ("quantile", "0.95")))] == pytest.approx(0.875)
+    assert amostras[("radar_eventos_total", (("nome", "requisicoes_upstream"),))] == 6
+    # Cada etapa tem as duas quantis, a soma e a contagem
+    assert len(amostras) == 3 * 4 + 1
+
+
+def test_gravar_prom_substitui_e_jsonl_acrescenta(relogio, tmp_path):
+    _rodada(relogio)
+    prom, jsonl = str(tmp_path / "radar.prom"), str(tmp_path / "radar.jsonl")
+    for _ in range(2):
+        metricas.gravar(prom)
+        metricas.gravar(jsonl)
+    with open(prom, encoding="utf-8") as f:
+        assert f.read() == metricas.exportar_prometheus()
+    assert not (tmp_path / "radar.prom.tmp").exists()
+    with open(jsonl, encoding="utf-8") as f:
+        linhas = [json.loads(linha) for linha in f]
+    assert len(linhas) == 2
+    assert linhas[0]["instante"] == 1_700_000_000.0
+    assert linhas[0]["etapas"]["screen"]["n"] == 1 and linhas[0]["contadores"] == {"requisicoes_upstream": 3}
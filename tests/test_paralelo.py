@@ -0,0 +1,75 @@
+"""Pool de processos: mesma tabela de classificar_universo e memória compartilhada sempre liberada"""
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from radar import paralelo
+from radar.paralelo import PainelCompartilhado, PoolScreener
+from radar.screener import classificar_universo
+
+
+def _candles(moedas=12, semente=0):
+    rng = np.random.default_rng(semente)
+    candles = {}
+    for i in range(moedas):
+        # Históricos de tamanhos diferentes para exercitar os deslocamentos no bloco
+        tamanho = int(rng.integers(60, 400))
+        indice = pd.date_range("2024-01-01", periods=tamanho, freq="D", name="time")
+        candles[f"Moeda {i} (M{i})"] = pd.DataFrame({
+            "close": 100 * np.exp(np.cumsum(rng.normal(0, 0.03, tamanho))),
+            "volume": rng.lognormal(10, 1, tamanho),
+        }, index=indice)
+    return candles
+
+
+@pytest.fixture
+def pool():
+    p = PoolScreener(2)
+    yield p
+    p.encerrar()
+
+
+def _liberado(nome):
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=nome)
+
+
+def test_pool_igual_a_classificar_universo(pool):
+    candles = _candles()
+    esperado = classificar_universo(candles, "1d").para_dataframe()
+    obtido = pool.classificar(candles, "1d").para_dataframe()
+    pd.testing.assert_frame_equal(obtido, esperado, rtol=1e-12)
+    assert pool.classificar({}, "1d").para_dataframe().empty
+
+
+def test_painel_compartilhado_guarda_cada_moeda_no_seu_trecho():
+    candles = _candles(5, semente=1)
+    with PainelCompartilhado(candles) as painel:
+        bloco = np.ndarray((2, painel.total), dtype=np.float64, buffer=painel._shm.buf)
+        for i, df in enumerate(candles.values()):
+            inicio, tamanho = painel.inicios[i], painel.tamanhos[i]
+            np.testing.assert_array_equal(bloco[0, inicio:inicio + tamanho], df["close"].to_numpy())
+            np.testing.assert_array_equal(bloco[1, inicio:inicio + tamanho], df["volume"].to_numpy())
+        del bloco
+        nome = painel.nome
+    _liberado(nome)
+
+
+def test_bloco_liberado_quando_um_lote_falha(pool, monkeypatch):
+    nomes = []
+
+    class Registrado(PainelCompartilhado):
+        def __init__(self, candles):
+            super().__init__(candles)
+            nomes.append(self.nome)
+
+    monkeypatch.setattr(paralelo, "PainelCompartilhado", Registrado)
+    candles = _candles(4, semente=2)
+    # Moeda sem candles: o processo filho falha ao ler o último fechamento
+    candles["Vazia (VZ)"] = pd.DataFrame({"close": [], "volume": []}, dtype=np.float64)
+    with pytest.raises(Exception):
+        pool.classificar(candles, "1d")
+    assert len(nomes) == 1
+    _liberado(nomes[0])
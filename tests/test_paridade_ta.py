@@ -0,0 +1,54 @@
+"""Painel vetorizado e estado incremental reproduzem a biblioteca `ta`"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from radar.painel import JANELA_RSI, MACD_LENTA, MACD_RAPIDA, MACD_SINAL, PERIODOS_EMA, PainelIndicadores
+from radar.streaming import EstadoIndicadores
+
+ta = pytest.importorskip("ta")
+
+TAMANHOS = (30, 199, 200, 201, 750)
+
+
+def _closes(semente, tamanho):
+    rng = np.random.default_rng(semente)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.02, tamanho)))
+
+
+def _referencia(closes):
+    close = pd.Series(closes)
+    macd = ta.trend.MACD(close, window_slow=MACD_LENTA, window_fast=MACD_RAPIDA, window_sign=MACD_SINAL)
+    series = {f"ema_{p}": ta.trend.EMAIndicator(close, window=p).ema_indicator() for p in PERIODOS_EMA}
+    series.update(
+        rsi=ta.momentum.RSIIndicator(close, window=JANELA_RSI).rsi(),
+        macd=macd.macd(), macd_signal=macd.macd_signal(), macd_diff=macd.macd_diff(),
+    )
+    return {nome: s.to_numpy(dtype=np.float64) for nome, s in series.items()}
+
+
+def _iguais(obtido, esperado):
+    np.testing.assert_allclose(np.asarray(obtido, dtype=np.float64), esperado, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+def test_painel_igual_a_ta_com_series_de_tamanhos_diferentes():
+    closes = {f"M{i}": _closes(i, tamanho) for i, tamanho in enumerate(TAMANHOS)}
+    painel = PainelIndicadores(closes)
+    for simbolo, serie in closes.items():
+        esperado = _referencia(serie)
+        for p in PERIODOS_EMA:
+            _iguais(painel.serie(simbolo, painel.emas[p]), esperado[f"ema_{p}"])
+        _iguais(painel.serie(simbolo, painel.rsi), esperado["rsi"])
+        _iguais(painel.serie(simbolo, painel.macd), esperado["macd"])
+        _iguais(painel.serie(simbolo, painel.macd_signal), esperado["macd_signal"])
+        _iguais(painel.serie(simbolo, painel.macd_diff), esperado["macd_diff"])
+
+
+@pytest.mark.parametrize("tamanho", TAMANHOS)
+def test_estado_incremental_igual_a_ta_candle_a_candle(tamanho):
+    closes = _closes(tamanho, tamanho)
+    esperado = _referencia(closes)
+    estado = EstadoIndicadores()
+    obtidos = [estado.avancar(close) for close in closes]
+    for nome, serie in esperado.items():
+        _iguais([np.nan if v[nome] is None else v[nome] for v in obtidos], serie)
@@ -0,0 +1,88 @@
+"""Planejador de filtros: mesmo resultado de classificar tudo e filtrar no final"""
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from radar.indicadores import CacheIndicadores
+from radar.planejador import filtrar_com_plano, planejar
+from radar.screener import classificar_universo
+
+TENDENCIAS = ["Alta consolidada", "Baixa consolidada", "Neutra/Transição", "Dados insuficientes"]
+RSI = ["Sobrevendido", "Neutro", "Sobrecomprado"]
+VOLUMES = ["Subindo (Alto)", "Normal", "Caindo (Baixo)", "Indefinido"]
+RECOMENDACOES = ["Compra Forte", "Compra", "Aguardar correção", "Venda / Evitar", "Observar reversão", "Aguardar"]
+
+
+def _universo(moedas=150, semente=0):
+    rng = np.random.default_rng(semente)
+    candles = {}
+    for i in range(moedas):
+        # Históricos curtos (sem EMA 200), tendências fortes e volume zerado aparecem no universo
+        tamanho = int(rng.choice([120, 260, 400]))
+        deriva = rng.normal(0, 0.004)
+        indice = pd.date_range(end="2024-06-01", periods=tamanho, freq="D", name="time")
+        volume = rng.lognormal(10, 0.6, tamanho) * (0 if i % 50 == 7 else 1)
+        candles[f"Moeda {i} (M{i})"] = pd.DataFrame({
+            "close": 100 * np.exp(np.cumsum(rng.normal(deriva, 0.03, tamanho))),
+            "volume": volume,
+        }, index=indice)
+    return candles
+
+
+def _com_candle_novo(candles, rng):
+    novos = {}
+    for moeda, df in candles.items():
+        proximo = pd.DataFrame({"close": [df["close"].iat[-1] * rng.uniform(0.95, 1.05)],
+                                "volume": [df["volume"].iat[-1]]},
+                               index=pd.DatetimeIndex([df.index[-1] + pd.Timedelta(days=1)], name="time"))
+        novos[moeda] = pd.concat([df, proximo])
+    return novos
+
+
+def _filtros(rng):
+    return {
+        "trend": rng.sample(TENDENCIAS, rng.randint(0, 2)),
+        "rsi": rng.sample(RSI, rng.randint(0, 2)),
+        "volume": rng.sample(VOLUMES, rng.randint(0, 2)),
+        "recommendation": rng.sample(RECOMENDACOES, rng.randint(0, 3)),
+    }
+
+
+def _iguais(obtido, esperado):
+    pd.testing.assert_frame_equal(obtido.para_dataframe(), esperado.para_dataframe(), rtol=1e-9)
+
+
+@pytest.mark.parametrize("com_cache", [False, True])
+def test_plano_igual_a_classificar_tudo_e_filtrar(com_cache):
+    rng = random.Random(0)
+    gerador = np.random.default_rng(1)
+    candles = _universo()
+    tabela = classificar_universo(candles, "1d")
+    cache = CacheIndicadores() if com_cache else None
+    for i in range(300):
+        if i and i % 100 == 0:
+            # Candle novo em todo o universo: o cache passa a servir entradas avançadas
+            candles = _com_candle_novo(candles, gerador)
+            tabela = classificar_universo(candles, "1d")
+        filtros = _filtros(rng)
+        _iguais(filtrar_com_plano(candles, "1d", filtros, cache), tabela.filtrar(filtros))
+
+
+def test_consulta_ao_cache_nao_avanca_as_entradas():
+    candles = _universo(5)
+    cache = CacheIndicadores()
+    classificar_universo(candles, "1d", cache)
+    antes = dict(cache._entradas)
+    novos = _com_candle_novo(candles, np.random.default_rng(2))
+    assert all(cache.disponivel(m.split("(")[-1][:-1], "1d", df) for m, df in novos.items())
+    assert cache._entradas == antes
+    filtrar_com_plano(novos, "1d", {"rsi": ["Neutro"]}, cache)
+    assert all(cache._entradas[chave] is not antes[chave] for chave in antes)  # Avançadas uma vez, no final
+
+
+def test_etapas_mais_baratas_e_seletivas_primeiro():
+    assert planejar({"trend": ["Alta consolidada"], "volume": ["Normal"], "rsi": ["Sobrevendido"]}) == \
+        ["volume", "rsi", "trend"]
+    assert planejar({"recommendation": ["Compra"]}) == []
@@ -0,0 +1,93 @@
+"""Reamostragem (direta e incremental) igual ao resample do pandas em 4h, 1w e 1M"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from radar.reamostragem import CacheReamostragem, SerieBase, epoch_segundos, reamostrar
+
+# Regras do pandas equivalentes: buckets alinhados à meia-noite UTC, semana começando na segunda
+REGRAS = {
+    "4h": dict(rule="4h", origin="start_day"),
+    "1w": dict(rule="W-MON", label="left", closed="left"),
+    "1M": dict(rule="MS"),
+}
+BASE = {"4h": "h", "1w": "D", "1M": "D"}
+AGREGACAO = {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+
+
+def _candles(rng, tamanho, freq, lacunas=0.0, inicio="2021-03-17 05:00"):
+    indice = pd.date_range(inicio, periods=tamanho, freq=freq, name="time")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, tamanho)))
+    abertura = np.r_[close[0], close[:-1]]
+    df = pd.DataFrame({
+        "open": abertura,
+        "high": np.maximum(abertura, close) * (1 + rng.uniform(0, 0.01, tamanho)),
+        "low": np.minimum(abertura, close) * (1 - rng.uniform(0, 0.01, tamanho)),
+        "close": close,
+        "volume": rng.lognormal(10, 1, tamanho),
+    }, index=indice)
+    if lacunas:
+        df = df[rng.random(tamanho) >= lacunas]
+    return df
+
+
+def _referencia(df, timeframe):
+    # Buckets sem candles (lacunas) não existem na reamostragem; no pandas têm volume 0 e o resto NaN
+    return df.resample(**REGRAS[timeframe]).agg(AGREGACAO).dropna(subset=["close"])
+
+
+def _iguais(obtido, esperado):
+    assert len(obtido) == len(esperado)
+    np.testing.assert_array_equal(epoch_segundos(obtido.index), epoch_segundos(esperado.index))
+    for coluna in AGREGACAO:
+        np.testing.assert_allclose(obtido[coluna].to_numpy(), esperado[coluna].to_numpy(), rtol=1e-12, err_msg=coluna)
+
+
+@pytest.mark.parametrize("timeframe", list(REGRAS))
+def test_reamostrar_igual_ao_pandas(timeframe):
+    rng = np.random.default_rng(0)
+    df = _candles(rng, 3000, BASE[timeframe])
+    _iguais(reamostrar(df, timeframe), _referencia(df, timeframe))
+
+
+@pytest.mark.parametrize("timeframe", list(REGRAS))
+def test_reamostrar_igual_ao_pandas_fuzz(timeframe):
+    rng = np.random.default_rng(sum(map(ord, timeframe)))
+    for _ in range(40):
+        inicio = pd.Timestamp("2018-01-01") + pd.Timedelta(hours=int(rng.integers(0, 24 * 365 * 4)))
+        df = _candles(rng, int(rng.integers(1, 1500)), BASE[timeframe], lacunas=rng.uniform(0, 0.3),
+                      inicio=inicio.floor(BASE[timeframe]))
+        if df.empty:
+            continue
+        _iguais(reamostrar(df, timeframe), _referencia(df, timeframe))
+
+
+@pytest.mark.parametrize("timeframe", list(REGRAS))
+def test_incremental_igual_ao_pandas_em_janelas_que_deslizam(timeframe):
+    rng = np.random.default_rng(42)
+    df = _candles(rng, 1200, BASE[timeframe], lacunas=0.05)
+    serie = SerieBase(df.iloc[:800])
+    serie.derivar(timeframe)
+    inicio, fim = 0, 800
+    while fim < len(df):
+        # Janela anda de 0 a 9 candles; às vezes o último (em formação) muda de preço
+        passo = int(rng.integers(0, 10))
+        inicio, fim = inicio + int(rng.integers(0, passo + 1)), min(len(df), fim + passo)
+        janela = df.iloc[inicio:fim].copy()
+        if rng.random() < 0.5:
+            ultimo = janela.iloc[-1]
+            novo = ultimo["close"] * rng.uniform(0.98, 1.02)
+            janela.iloc[-1, janela.columns.get_indexer(["close", "high", "low"])] = [
+                novo, max(ultimo["high"], novo), min(ultimo["low"], novo)]
+        assert serie.atualizar(janela)
+        _iguais(serie.derivar(timeframe), _referencia(janela, timeframe))
+
+
+def test_cache_serve_os_derivados_da_mesma_serie_base():
+    rng = np.random.default_rng(3)
+    df = _candles(rng, 3000, "D")
+    cache = CacheReamostragem()
+    for fim in range(2000, 3000, 37):
+        janela = df.iloc[fim - 2000:fim]
+        for timeframe in ("1w", "1M"):
+            _iguais(cache.obter("M", janela, timeframe), _referencia(janela, timeframe))
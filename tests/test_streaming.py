@@ -0,0 +1,83 @@
+"""Estado incremental e cache avançado candle a candle igualam o recálculo completo"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from radar.indicadores import CacheIndicadores, calcular_indicadores
+from radar.streaming import EstadoIndicadores
+
+CAMPOS = ("ema_8", "ema_21", "ema_50", "ema_200", "rsi", "macd", "macd_signal", "macd_diff")
+
+
+def _candles(semente, tamanho, inicio="2024-01-01"):
+    rng = np.random.default_rng(semente)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, tamanho)))
+    indice = pd.date_range(inicio, periods=tamanho, freq="h", name="time")
+    return pd.DataFrame({"close": close, "volume": rng.lognormal(10, 1, tamanho)}, index=indice)
+
+
+def _iguais(obtido, esperado, rtol=1e-10):
+    for campo in CAMPOS:
+        a, b = obtido[campo], esperado[campo]
+        if a is None or b is None:
+            assert a is None and b is None, campo
+        else:
+            np.testing.assert_allclose(a, b, rtol=rtol, atol=1e-10, equal_nan=True, err_msg=campo)
+
+
+@pytest.mark.parametrize("semente", range(3))
+def test_avancar_igual_ao_recalculo_em_cada_candle(semente):
+    df = _candles(semente, 260)
+    estado = EstadoIndicadores()
+    for i, close in enumerate(df["close"]):
+        valores = estado.avancar(close)
+        if i % 13 == 0 or i >= 195:
+            _iguais(valores, calcular_indicadores(df.iloc[:i + 1]).ultimos())
+
+
+def test_revisar_igual_ao_recalculo_com_o_fechamento_novo():
+    df = _candles(7, 300)
+    estado = EstadoIndicadores.a_partir_de(df["close"])
+    rng = np.random.default_rng(0)
+    for _ in range(10):
+        df.iloc[-1, df.columns.get_loc("close")] *= rng.uniform(0.95, 1.05)
+        _iguais(estado.revisar(df["close"].iat[-1]), calcular_indicadores(df).ultimos())
+
+
+def test_snapshot_restaurado_continua_igual():
+    df = _candles(8, 400)
+    estado = EstadoIndicadores.a_partir_de(df["close"].iloc[:350])
+    restaurado = EstadoIndicadores.restaurar(estado.snapshot())
+    for close in df["close"].iloc[350:]:
+        assert restaurado.avancar(close) == estado.avancar(close)
+    _iguais(restaurado.valores(), calcular_indicadores(df).ultimos())
+
+
+def test_cache_avancado_igual_ao_recalculo_com_janela_crescendo():
+    df = _candles(9, 600)
+    cache = CacheIndicadores()
+    cache.obter("M", "1h", df.iloc[:500])
+    rng = np.random.default_rng(1)
+    for fim in range(501, 601):
+        janela = df.iloc[:fim].copy()
+        # Candle em formação: o fechamento do último muda antes de o próximo chegar
+        janela.iloc[-1, janela.columns.get_loc("close")] *= rng.uniform(0.99, 1.01)
+        obtido, esperado = cache.obter("M", "1h", janela), calcular_indicadores(janela)
+        for campo, serie in (("rsi", obtido.rsi), ("macd", obtido.macd), ("macd_signal", obtido.macd_signal)):
+            np.testing.assert_allclose(serie.to_numpy(), getattr(esperado, campo).to_numpy(),
+                                       rtol=1e-10, atol=1e-10, equal_nan=True, err_msg=campo)
+        _iguais(obtido.ultimos(), esperado.ultimos())
+    assert cache._entradas[("M", "1h")].estado is not None  # Avançou em vez de recalcular
+
+
+@pytest.mark.parametrize("tamanho", [571, 731])  # Janelas ao vivo de 1w e 1d
+def test_janela_deslizante_e_recalculada_igual_ao_recalculo(tamanho):
+    # Sem o início da série, as EMAs longas do recálculo divergem das do estado
+    # avançado; o cache recalcula em vez de avançar
+    df = _candles(10, tamanho + 60)
+    cache = CacheIndicadores()
+    cache.obter("M", "1h", df.iloc[:tamanho])
+    for fim in range(tamanho + 1, tamanho + 60, 7):
+        janela = df.iloc[fim - tamanho:fim]
+        _iguais(cache.obter("M", "1h", janela).ultimos(), calcular_indicadores(janela).ultimos(), rtol=0)
+        assert not cache.disponivel("M", "1h", df.iloc[fim - tamanho + 1:fim + 1])
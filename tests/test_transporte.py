@@ -0,0 +1,185 @@
+"""ClienteHTTP contra um servidor local: retentativas com jitter e disjuntor meio-aberto"""
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from radar.transporte import CircuitoAberto, ClienteHTTP, ErroTransporte
+
+
+class Servidor:
+    """Servidor HTTP em thread com respostas roteirizadas: (status, corpo, cabeçalhos, atraso)"""
+
+    def __init__(self):
+        self.roteiro = deque()
+        self.pedidos = 0
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                servidor.pedidos += 1
+                status, corpo, cabecalhos, atraso = (servidor.roteiro.popleft() if servidor.roteiro
+                                                     else (200, {"ok": True}, {}, 0))
+                time.sleep(atraso)
+                dados = corpo.encode() if isinstance(corpo, str) else json.dumps(corpo).encode()
+                self.send_response(status)
+                for nome, valor in cabecalhos.items():
+                    self.send_header(nome, valor)
+                self.send_header("Content-Length", str(len(dados)))
+                self.end_headers()
+                self.wfile.write(dados)
+
+            def log_message(self, *args):
+                pass
+
+        self.http = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.http.server_address[1]}/dados"
+        self._thread = threading.Thread(target=self.http.serve_forever, daemon=True)
+        self._thread.start()
+
+    def responder(self, status, corpo=None, cabecalhos=None, atraso=0):
+        self.roteiro.append((status, {"ok": True} if corpo is None else corpo, cabecalhos or {}, atraso))
+
+    def fechar(self):
+        self.http.shutdown()
+        self.http.server_close()
+
+
+class ClienteRegistrado(ClienteHTTP):
+    """Registra as esperas entre tentativas em vez de dormir"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.esperas = []
+
+    def _espera(self, tentativa, resposta=None):
+        espera = super()._espera(tentativa, resposta)
+        self.esperas.append(espera)
+        return 0
+
+
+@pytest.fixture
+def servidor():
+    s = Servidor()
+    yield s
+    s.fechar()
+
+
+def test_429_e_5xx_sao_repetidos(servidor):
+    cliente = ClienteRegistrado(tentativas=4)
+    servidor.responder(429, cabecalhos={"Retry-After": "2"})
+    servidor.responder(503)
+    servidor.responder(502)
+    servidor.responder(200, {"valor": 1})
+    assert cliente.obter_json(servidor.url, {"a": 1}) == {"valor": 1}
+    assert servidor.pedidos == 4
+    assert cliente.esperas[0] == 2.0  # Retry-After respeitado
+    assert 0 <= cliente.esperas[1] <= cliente.backoff_base * 2
+    resumo = next(iter(cliente.estatisticas().values()))
+    assert (resumo["requisicoes"], resumo["erros"], resumo["retentativas"]) == (4, 3, 3)
+
+
+def test_espera_tem_jitter_sob_o_teto_exponencial():
+    cliente = ClienteHTTP(backoff_base=0.5, backoff_max=8.0)
+    for tentativa in range(6):
+        esperas = [cliente._espera(tentativa) for _ in range(200)]
+        teto = min(8.0, 0.5 * 2 ** tentativa)
+        assert all(0 <= e <= teto for e in esperas)
+        assert len(set(esperas)) > 1
+
+
+def test_4xx_nao_e_repetido(servidor):
+    cliente = ClienteRegistrado(tentativas=3)
+    servidor.responder(404)
+    with pytest.raises(ErroTransporte):
+        cliente.obter_json(servidor.url)
+    assert servidor.pedidos == 1
+
+
+def test_200_sem_json_e_falha_de_transporte(servidor):
+    cliente = ClienteRegistrado(tentativas=2, limite_falhas=1, resfriamento=60)
+    servidor.responder(200, "<html>proxy</html>")
+    servidor.responder(200, {"valor": 2})
+    assert cliente.obter_json(servidor.url) == {"valor": 2}  # Repetido como um 5xx
+
+    servidor.responder(200, "<html>proxy</html>")
+    servidor.responder(200, "<html>proxy</html>")
+    with pytest.raises(ErroTransporte):
+        cliente.obter_json(servidor.url, {"b": 1})
+    with pytest.raises(CircuitoAberto):  # E conta para o disjuntor
+        cliente.obter_json(servidor.url, {"b": 1})
+
+
+def test_disjuntor_abre_testa_uma_vez_e_fecha(servidor):
+    cliente = ClienteRegistrado(tentativas=1, limite_falhas=2, resfriamento=0.2)
+    for _ in range(2):
+        servidor.responder(500)
+        with pytest.raises(ErroTransporte):
+            cliente.obter_json(servidor.url, {"c": 1})
+    with pytest.raises(CircuitoAberto):
+        cliente.obter_json(servidor.url, {"c": 1})
+    assert servidor.pedidos == 2
+
+    time.sleep(0.25)
+    servidor.responder(200, {"valor": 3}, atraso=0.3)
+    teste = {}
+    sondagem = threading.Thread(target=lambda: teste.update(r=cliente.obter_json(servidor.url, {"c": 1})))
+    sondagem.start()
+    time.sleep(0.1)
+    # Com o teste em andamento, as outras requisições continuam barradas
+    for _ in range(5):
+        with pytest.raises(CircuitoAberto):
+            cliente.obter_json(servidor.url, {"c": 2})
+    sondagem.join()
+    assert teste["r"] == {"valor": 3}
+    assert servidor.pedidos == 3
+
+    assert cliente.obter_json(servidor.url, {"c": 2}) == {"ok": True}  # Fechado de novo
+
+
+def test_teste_que_falha_reabre_o_disjuntor(servidor):
+    cliente = ClienteRegistrado(tentativas=1, limite_falhas=1, resfriamento=0.2)
+    servidor.responder(500)
+    with pytest.raises(ErroTransporte):
+        cliente.obter_json(servidor.url)
+    time.sleep(0.25)
+    servidor.responder(503)
+    with pytest.raises(ErroTransporte):
+        cliente.obter_json(servidor.url)
+    with pytest.raises(CircuitoAberto):
+        cliente.obter_json(servidor.url)
+    assert servidor.pedidos == 2
+    time.sleep(0.25)
+    assert cliente.obter_json(servidor.url) == {"ok": True}
+
+
+def test_toda_requisicao_passa_pelo_limitador_do_host(servidor):
+    cliente = ClienteRegistrado(tentativas=2, taxa=20, rajada=1)
+    servidor.responder(503)  # A retentativa também consome um token
+    inicio = time.monotonic()
+    for i in range(4):
+        cliente.obter_json(servidor.url, {"d": i})
+    assert servidor.pedidos == 5
+    assert time.monotonic() - inicio >= 4 / 20
+
+
+def test_excecao_inesperada_no_teste_libera_o_disjuntor(servidor, monkeypatch):
+    cliente = ClienteRegistrado(tentativas=1, limite_falhas=1, resfriamento=0.2)
+    servidor.responder(500)
+    with pytest.raises(ErroTransporte):
+        cliente.obter_json(servidor.url)
+    time.sleep(0.25)
+
+    def quebrar(*args, **kwargs):
+        raise RuntimeError("bug")
+
+    get = cliente.sessao.get
+    monkeypatch.setattr(cliente.sessao, "get", quebrar)
+    with pytest.raises(RuntimeError):
+        cliente.obter_json(servidor.url)  # A requisição de teste morre fora dos erros tratados
+    monkeypatch.setattr(cliente.sessao, "get", get)
+    # Sem o teste preso, a próxima requisição pode testar o host de novo
+    assert cliente.obter_json(servidor.url) == {"ok": True}